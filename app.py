@@ -1,21 +1,40 @@
+import os
 import streamlit as st
-import pandas as pd
-import joblib
-import numpy as np
+from src.models.stats_index import PlayerStatsIndex
+from src.models.compiled_tree import load_model
+from src.models.features import H2H_SCHEMA, check_schema
+from src.models.prediction_cache import PredictionCache
+from src.utils.name_search import NameIndex
+from src.models.decayed_form import DecayedForm
 
 # Use caching to load the model and data only once
 @st.cache_resource
 def load_resources():
     """Load the trained model and player stats."""
     try:
-        model = joblib.load('h2h_model.joblib')
-        stats_df = pd.read_csv('player_avg_stats.csv')
-        return model, stats_df
+        model = load_model('h2h_model.joblib')
+        check_schema(model, H2H_SCHEMA)
+        # Index the stats once so each prediction is a couple of dict lookups
+        stats_index = PlayerStatsIndex.load('player_avg_stats.csv')
+        # Shared by all sessions: popular matchups are scored once, in either order
+        predictions = PredictionCache(model, stats_index, maxsize=10000, ttl=24 * 3600)
+        # Built once too; the player pickers search it as the user types
+        names = NameIndex(stats_index.players)
+        # Optional: recent form shown under the prediction (src/models/decayed_form.py)
+        form = DecayedForm.load('player_form.npz') if os.path.exists('player_form.npz') else None
+        return model, stats_index, predictions, names, form
     except FileNotFoundError:
-        return None, None
+        return None, None, None, None, None
 
 # Load the resources
-h2h_model, player_stats_df = load_resources()
+h2h_model, player_stats, prediction_cache, name_index, player_form = load_resources()
+
+def player_picker(label, key):
+    """A search box plus a dropdown of the closest matching players (prefix, then fuzzy)."""
+    query = st.text_input(f"Search {label}", key=f"{key}_query", placeholder="Type a name...")
+    options = name_index.search(query, 20) if query else []
+    return st.selectbox(label, options, index=0 if options else None, key=key,
+                        placeholder="Type a name above...")
 
 # --- Page Configuration ---
 st.set_page_config(page_title="Tennis Match Predictor", page_icon="🎾", layout="centered")
@@ -24,17 +43,14 @@ st.set_page_config(page_title="Tennis Match Predictor", page_icon="🎾", layout
 st.title("🎾 Tennis Match Predictor AI")
 st.write("Enter two player names and a surface to predict the winner based on historical data.")
 
-if h2h_model is None or player_stats_df is None:
+if h2h_model is None or player_stats is None:
     st.error("Error: Model or stats file not found! Please run the 'src/models/train_h2h.py' script first.")
 else:
-    # Get a sorted list of unique player names for the dropdowns
-    player_names = sorted(player_stats_df['player'].unique())
-    
     col1, col2 = st.columns(2)
     with col1:
-        player1 = st.selectbox("Select Player 1", player_names, index=None, placeholder="Choose a player...")
+        player1 = player_picker("Player 1", "player1")
     with col2:
-        player2 = st.selectbox("Select Player 2", player_names, index=None, placeholder="Choose a player...")
+        player2 = player_picker("Player 2", "player2")
 
     surface = st.selectbox("Select Surface", ["Hard", "Clay", "Grass"], index=None, placeholder="Choose a surface...")
 
@@ -46,30 +62,22 @@ else:
             st.error("Please select two different players.")
         else:
             try:
-                # Look up stats for both players on the selected surface
-                p1_stats = player_stats_df[(player_stats_df['player'] == player1) & (player_stats_df['surface'] == surface)].iloc[0]
-                p2_stats = player_stats_df[(player_stats_df['player'] == player2) & (player_stats_df['surface'] == surface)].iloc[0]
-
-                # Calculate the difference in their average stats
-                ace_diff = p1_stats['aces'] - p2_stats['aces']
-                df_diff = p1_stats['dfs'] - p2_stats['dfs']
-                serve_pts_diff = p1_stats['serve_pts'] - p2_stats['serve_pts']
-                first_serve_in_diff = p1_stats['first_in'] - p2_stats['first_in']
-                
-                # Prepare input for the model
-                surface_hard = 1 if surface == 'Hard' else 0
-                surface_grass = 1 if surface == 'Grass' else 0
-                
-                match_features = np.array([[ace_diff, df_diff, serve_pts_diff, first_serve_in_diff, surface_hard, surface_grass]])
-                
-                # Get prediction probability from the model
-                win_probability_p1 = h2h_model.predict_proba(match_features)[0][1]
+                # Get prediction probability from the model (or the cache), based on
+                # the difference in both players' average stats on the selected surface
+                win_probability_p1 = prediction_cache.predict(player1, player2, surface)
 
                 st.subheader("Prediction Result:")
                 if win_probability_p1 > 0.5:
                     st.success(f"🏆 Predicted Winner: {player1} ({win_probability_p1:.1%})")
                 else:
                     st.success(f"🏆 Predicted Winner: {player2} ({(1 - win_probability_p1):.1%})")
+                if player_form is not None:
+                    for line in filter(None, (player_form.describe(name, surface) for name in (player1, player2))):
+                        st.caption(f"📈 {line}")
+
+            except KeyError:
+                st.error(f"Prediction failed. Not enough data for one or both players on a {surface} court.")
 
-            except IndexError:
-                st.error(f"Prediction failed. Not enough data for one or both players on a {surface} court.")
\ No newline at end of file
+    cache_stats = prediction_cache.stats()
+    st.caption(f"Prediction cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+               f"({cache_stats['hit_rate']:.0%}), {cache_stats['size']} matchups stored.")
\ No newline at end of file
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+# The entry points are run from the project root, where they live
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = {
+    'predict_match': ('predict_match.py', 'load_resources', b'Enter Player 1'),
+    'run_predictor': ('run_predictor.py', 'load_real_model', b'Enter number of Aces'),
+    'desktop_app': ('desktop_app.py', 'load_resources', None),   # needs a display to time the window
+}
+
+
+def import_times(module, workdir):
+    """
+    (seconds to import `module`, [(cumulative seconds, name)] of what it
+    imports directly, heaviest first), from -X importtime.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=workdir,
+                            capture_output=True, text=True, check=True)
+    records = []
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            depth = (len(name) - len(name.lstrip())) // 2
+            records.append((depth, int(cumulative) / 1e6, name.strip()))
+    # Nested imports are reported before the module that triggered them
+    end = next(i for i, (depth, _, name) in enumerate(records) if depth == 0 and name == module)
+    start = max((i for i in range(end) if records[i][0] == 0), default=-1) + 1
+    direct = [(seconds, name) for depth, seconds, name in records[start:end] if depth == 1]
+    return records[end][1], sorted(direct, reverse=True)
+
+
+def time_to(command, workdir, marker=None):
+    """Wall-clock seconds from launching `command` until `marker` shows up on its stdout (or it exits)."""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=workdir, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    seen = b''
+    while marker is None or marker not in seen:
+        chunk = os.read(process.stdout.fileno(), 4096)
+        if not chunk:
+            break
+        seen += chunk
+    seconds = time.perf_counter() - start
+    process.kill()
+    process.wait()
+    if marker is not None and marker not in seen:
+        raise RuntimeError(f"{command[-1]} exited before its prompt:\n{seen.decode(errors='replace')}")
+    return seconds
+
+
+# --- Cold start: time to the first prompt vs. loading everything before it ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workdir', default=project_root, help="folder with the trained model and stats files")
+    parser.add_argument('--top', type=int, default=5, help="heaviest imports listed per entry point")
+    args = parser.parse_args()
+
+    rows = []
+    print("\n--------------------------")
+    for module, (script, loader, marker) in ENTRY_POINTS.items():
+        total, top = import_times(module, args.workdir)
+        print(f"{module}: imports take {total * 1000:.0f} ms; heaviest:")
+        for seconds, name in top[:args.top]:
+            print(f"    {seconds * 1000:8.1f} ms  {name}")
+        # The apps used to import and load everything before showing anything
+        eager = time_to([sys.executable, '-c', f'import {module}; {module}.{loader}(); print("ready")'],
+                        args.workdir, b'ready')
+        prompt = None
+        if marker is not None:
+            prompt = time_to([sys.executable, '-u', os.path.join(args.workdir, script)], args.workdir, marker)
+        rows.append((module, prompt, eager))
+    print("--------------------------")
+    print("                 first prompt    fully loaded")
+    for module, prompt, eager in rows:
+        shown = f"{prompt * 1000:9.0f} ms" if prompt is not None else "        n/a"
+        print(f"{module:<16} {shown}    {eager * 1000:9.0f} ms")
+    print("--------------------------")
@@ -0,0 +1,70 @@
+import os
+import sys
+import glob
+import time
+import datetime
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.match_cache import DATA_DIR
+from src.utils.dates import parse_yyyymmdd
+
+
+def parse_loop(t):
+    """The per-row parser examples.py used before (one datetime.date per value)."""
+    ret = []
+    for ts in t:
+        try:
+            string = str(ts)
+            tsdt = datetime.date(int(string[:4]), int(string[4:6]), int(string[6:]))
+        except TypeError:
+            tsdt = datetime.date(1900, 1, 1)
+        ret.append(tsdt)
+    return ret
+
+
+def ranking_dates(data_dir, rows):
+    """ranking_date of the ranking files in `data_dir`, or `rows` synthetic Mondays if there are none."""
+    files = sorted(glob.glob(os.path.join(data_dir, 'atp_rankings_*.csv')))
+    if files:
+        frames = [pd.read_csv(f, header=None, usecols=[0], skiprows=1) for f in files]
+        return pd.concat(frames, ignore_index=True)[0].to_numpy(), 'ranking files'
+    rng = np.random.default_rng(0)
+    days = np.datetime64('1973-08-27') + 7 * rng.integers(0, 2700, rows)
+    text = np.datetime_as_string(days, unit='D')
+    return np.char.replace(text, '-', '').astype('int64'), 'synthetic dates'
+
+
+# --- Per-row datetime.date loop vs. vectorized datetime64 parsing ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--rows', type=int, default=3_000_000, help="synthetic rows if there are no ranking files")
+    args = parser.parse_args()
+
+    values, source = ranking_dates(args.data_dir, args.rows)
+
+    start = time.perf_counter()
+    loop = parse_loop(values)
+    loop_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    fast = parse_yyyymmdd(values)
+    fast_seconds = time.perf_counter() - start
+
+    same = np.array_equal(np.array(loop, dtype='datetime64[D]'), fast)
+    bad = parse_yyyymmdd(pd.array([20230231, None, 19991301], dtype='Int32'))
+
+    print("\n--------------------------")
+    print(f"{len(values)} dates from {source}")
+    print(f"datetime.date loop:  {loop_seconds:6.2f}s ({len(values) / loop_seconds:12,.0f} dates/s)")
+    print(f"vectorized:          {fast_seconds:6.2f}s ({len(values) / fast_seconds:12,.0f} dates/s)")
+    print(f"speed-up:            x{loop_seconds / fast_seconds:.0f}")
+    print(f"identical results:   {'yes' if same else 'NO'}")
+    print(f"bad values:          {', '.join(str(d) for d in bad)}")
+    print("--------------------------")
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.download_data import fetch_tennis_data, tennis_data_files
+
+# --- Benchmark fetch_tennis_data against a local stand-in for the GitHub server ---
+# Every file is served with a fixed per-request latency so that the cost of
+# sequential round-trips shows up even on localhost.
+FILE_SIZE = 1 << 20
+LATENCY = 0.05
+
+
+class SlowHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(LATENCY)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory):
+    handler = functools.partial(SlowHandler, directory=directory)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    files = tennis_data_files()
+    source_dir = tempfile.mkdtemp(prefix='atp_src_')
+    for filename in files:
+        with open(os.path.join(source_dir, filename), 'wb') as f:
+            f.write(os.urandom(FILE_SIZE))
+
+    server = serve(source_dir)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    timings = {}
+    for workers in (1, 4, 8, 16):
+        target_dir = tempfile.mkdtemp(prefix='atp_dst_')
+        start = time.perf_counter()
+        fetch_tennis_data(target_dir=target_dir, base_url=base_url, files=files, max_workers=workers)
+        timings[workers] = time.perf_counter() - start
+        shutil.rmtree(target_dir)
+
+    # Nightly refresh: only the current season changed on the server, so only
+    # that file should be transferred (http.server answers If-Modified-Since)
+    target_dir = tempfile.mkdtemp(prefix='atp_dst_')
+    fetch_tennis_data(target_dir=target_dir, base_url=base_url, files=files)
+    changed = os.path.join(source_dir, "atp_matches_2025.csv")
+    with open(changed, 'ab') as f:
+        f.write(os.urandom(1024))
+    os.utime(changed, (time.time() + 60, time.time() + 60))
+    start = time.perf_counter()
+    results = fetch_tennis_data(target_dir=target_dir, base_url=base_url, files=files, refresh=True)
+    refresh_seconds = time.perf_counter() - start
+    refresh_bytes = sum(r.nbytes for r in results)
+    shutil.rmtree(target_dir)
+
+    server.shutdown()
+    shutil.rmtree(source_dir)
+
+    print("\n--------------------------")
+    print(f"{len(files)} files of {FILE_SIZE / 1e6:.1f} MB, {LATENCY * 1000:.0f} ms latency per request")
+    for workers, seconds in timings.items():
+        print(f"workers={workers:>2}: {seconds:6.2f}s  (x{timings[1] / seconds:.1f})")
+    print(f"refresh:    {refresh_seconds:6.2f}s, {refresh_bytes / 1e6:.2f} MB transferred")
+    print("--------------------------")
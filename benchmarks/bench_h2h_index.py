@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import argparse
+from operator import itemgetter
+
+import numpy as np
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.match_loader import load_matches
+from src.models.h2h_index import H2H_COLUMNS, H2HIndex
+
+
+def iterrows_h2h(matches, name):
+    """The old examples.py geth2hforplayer: filter the frame for the player, then walk it with iterrows."""
+    matches = matches[(matches['winner_name'] == name) | (matches['loser_name'] == name)]
+    h2hs = {}
+    for _, match in matches.iterrows():
+        if match['winner_name'] == name:
+            h2hs.setdefault(match['loser_name'], {'w': 0, 'l': 0})['w'] += 1
+        else:
+            h2hs.setdefault(match['winner_name'], {'w': 0, 'l': 0})['l'] += 1
+    return sorted([[k, v['w'], v['l']] for k, v in h2hs.items()], key=itemgetter(1, 2))
+
+
+def iterrows_never_met(matches, players):
+    """The old getwnonh2hs: every player's h2h list, then list membership scans over the top N."""
+    pairs = []
+    for i, player in enumerate(players):
+        h2hnames = [row[0] for row in iterrows_h2h(matches, player)]
+        pairs += [(player, other) for other in players[i + 1:] if other not in h2hnames]
+    return pairs
+
+
+def per_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+# --- Head-to-head queries: per-player iterrows scans vs. the sparse H2HIndex ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--top', type=int, default=50, help="players in the never-met query")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    matches = load_matches(columns=H2H_COLUMNS, workers=args.workers)
+    build_seconds, index = per_call(lambda: H2HIndex.from_matches(matches), 1)
+    played = np.diff(index.indptr)
+    top = [index.players[i] for i in np.argsort(-played, kind='stable')[:args.top]]
+    player, opponent = top[0], index.opponents_of(top[0])[0][0]
+
+    old_h2h, old_list = per_call(lambda: iterrows_h2h(matches, player), 3)
+    new_h2h, new_list = per_call(lambda: sorted([list(h2h) for h2h in index.opponents_of(player)],
+                                                key=itemgetter(1, 2)), 1000)
+    assert sorted(old_list) == sorted(new_list)
+    old_record, _ = per_call(lambda: iterrows_h2h(matches, player), 1)
+    new_record, record = per_call(lambda: index.record(player, opponent), 10000)
+    assert record == tuple(next(row[1:] for row in old_list if row[0] == opponent))
+    old_never, old_pairs = per_call(lambda: iterrows_never_met(matches, top), 1)
+    new_never, new_pairs = per_call(lambda: index.never_met(top), 100)
+    assert old_pairs == new_pairs
+
+    print("\n--------------------------")
+    print(f"{len(matches)} matches, {len(index)} players, {len(index.opponents) // 2} pairs; "
+          f"index built in {build_seconds:.2f} s")
+    print(f"A vs B record:         {old_record * 1e3:10.1f} ms -> {new_record * 1e6:8.1f} µs")
+    print(f"all opponents of A:    {old_h2h * 1e3:10.1f} ms -> {new_h2h * 1e6:8.1f} µs  ({len(new_list)} opponents)")
+    print(f"top-{args.top} never met:     {old_never:10.1f} s  -> {new_never * 1e6:8.1f} µs  "
+          f"({len(new_pairs)} pairs, x{old_never / new_never:,.0f})")
+    print("--------------------------")
@@ -0,0 +1,52 @@
+import os
+import sys
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+
+import pandas as pd
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.match_cache import DATA_DIR, read_csv_cached
+
+# --- Load time of the full 1968-2025 match set: CSV parsing vs. the columnar cache ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    all_files = sorted(glob.glob(os.path.join(args.data_dir, 'atp_matches_????.csv')))
+    if not all_files:
+        print(f"❌ No match files in {args.data_dir}. Run 'src/utils/download_data.py' first.")
+        sys.exit(1)
+    cache_dir = tempfile.mkdtemp(prefix='atp_cache_')
+
+    def best_of(load):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            df = pd.concat((load(f) for f in all_files), ignore_index=True)
+            timings.append(time.perf_counter() - start)
+        return min(timings), df
+
+    csv_seconds, csv_df = best_of(pd.read_csv)
+    start = time.perf_counter()
+    for f in all_files:
+        read_csv_cached(f, cache_dir)
+    build_seconds = time.perf_counter() - start
+    cached_seconds, cached_df = best_of(lambda f: read_csv_cached(f, cache_dir))
+    shutil.rmtree(cache_dir)
+
+    assert csv_df.shape == cached_df.shape
+    print("\n--------------------------")
+    print(f"{len(all_files)} files, {len(csv_df)} matches")
+    print(f"pd.read_csv:       {csv_seconds:6.2f}s")
+    print(f"cache build (once):{build_seconds:6.2f}s")
+    print(f"columnar cache:    {cached_seconds:6.2f}s  (x{csv_seconds / cached_seconds:.1f})")
+    print("--------------------------")
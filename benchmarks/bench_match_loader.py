@@ -0,0 +1,62 @@
+import os
+import sys
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.match_cache import DATA_DIR
+from src.utils.match_loader import DEFAULT_WORKERS, load_matches
+
+# --- Scaling of load_matches from 1 to N worker processes ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    if not glob.glob(os.path.join(args.data_dir, 'atp_matches_*.csv')):
+        print(f"❌ No match files in {args.data_dir}. Run 'src/utils/download_data.py' first.")
+        sys.exit(1)
+
+    worker_counts = sorted({1, 2, 4, 8, 16, 32, args.max_workers} & set(range(1, args.max_workers + 1)))
+    cache_dir = tempfile.mkdtemp(prefix='atp_cache_')
+    load_matches(args.data_dir, workers=args.max_workers, cache_dir=cache_dir)  # warm the cache
+
+    rows = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        df = load_matches(args.data_dir, workers=workers, cache_dir=None)
+        csv_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        load_matches(args.data_dir, workers=workers, cache_dir=cache_dir)
+        cached_seconds = time.perf_counter() - start
+        rows.append((workers, csv_seconds, cached_seconds))
+
+    # The 11 columns train_h2h.py actually uses, with incomplete rows dropped
+    cols_to_use = ['surface', 'winner_name', 'loser_name', 'w_ace', 'l_ace',
+                   'w_df', 'l_df', 'w_1stIn', 'l_1stIn', 'w_svpt', 'l_svpt']
+    projected = {}
+    for label, source in (('csv parse', None), ('columnar cache', cache_dir)):
+        start = time.perf_counter()
+        subset = load_matches(args.data_dir, columns=cols_to_use, dropna=True, workers=1, cache_dir=source)
+        projected[label] = time.perf_counter() - start
+    shutil.rmtree(cache_dir)
+
+    print("\n--------------------------")
+    print(f"{len(df)} matches, {df.shape[1]} columns")
+    print("workers    csv parse          columnar cache")
+    for workers, csv_seconds, cached_seconds in rows:
+        print(f"{workers:>7}  {csv_seconds:6.2f}s (x{rows[0][1] / csv_seconds:4.1f})"
+              f"   {cached_seconds:6.2f}s (x{rows[0][2] / cached_seconds:4.1f})")
+    print(f"projected to {len(cols_to_use)} columns, {len(subset)} complete rows, 1 worker:")
+    for label, seconds in projected.items():
+        print(f"  {label:<15} {seconds:6.2f}s")
+    print(f"  memory: {df.memory_usage(deep=True).sum() / 1e6:.1f} MB full vs "
+          f"{subset.memory_usage(deep=True).sum() / 1e6:.1f} MB projected")
+    print("--------------------------")
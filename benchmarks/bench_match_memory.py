@@ -0,0 +1,47 @@
+import os
+import sys
+import glob
+import time
+import argparse
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.match_cache import DATA_DIR
+from src.utils.match_loader import load_matches
+from src.utils.match_schema import memory_per_match
+
+# --- RAM per match with pandas' default inference vs. the declared MATCH_SCHEMA ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if not glob.glob(os.path.join(args.data_dir, 'atp_matches_*.csv')):
+        print(f"❌ No match files in {args.data_dir}. Run 'src/utils/download_data.py' first.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    inferred = load_matches(args.data_dir, workers=args.workers, dtypes=None)
+    inferred_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    typed = load_matches(args.data_dir, workers=args.workers)
+    typed_seconds = time.perf_counter() - start
+
+    before = inferred.memory_usage(deep=True, index=False)
+    after = typed.memory_usage(deep=True, index=False)
+    print("\n--------------------------")
+    print(f"{len(typed)} matches, {typed.shape[1]} columns")
+    print(f"default inference: {memory_per_match(inferred):7.1f} bytes/match, "
+          f"{before.sum() / 1e6:7.1f} MB, loaded in {inferred_seconds:.2f}s")
+    print(f"declared schema:   {memory_per_match(typed):7.1f} bytes/match, "
+          f"{after.sum() / 1e6:7.1f} MB, loaded in {typed_seconds:.2f}s")
+    print(f"reduction:         x{before.sum() / after.sum():.1f}")
+    print("\nLargest savings per column (bytes/match):")
+    savings = ((before - after) / len(typed)).sort_values(ascending=False)
+    for name in savings.index[:10]:
+        print(f"  {name:<20} {before[name] / len(typed):7.1f} -> {after[name] / len(typed):5.1f}"
+              f"  ({inferred[name].dtype} -> {typed[name].dtype})")
+    print("--------------------------")
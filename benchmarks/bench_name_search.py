@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.models.stats_index import PlayerStatsIndex
+from src.utils.name_search import NameIndex
+
+
+def synthetic_names(count):
+    rng = np.random.default_rng(0)
+    first = ['Novak', 'Carlos', 'Rafael', 'Roger', 'Andy', 'Stan', 'Jo-Wilfried', 'Gaël', 'Dominic', 'Daniil',
+             'Alexander', 'Stefanos', 'Félix', 'Juan Martín', 'Marin', 'Kei', 'Jannik', 'Taylor', 'Hubert', 'Casper']
+    last = ['Djokovic', 'Alcaraz', 'Nadal', 'Federer', 'Murray', 'Wawrinka', 'Tsonga', 'Monfils', 'Thiem',
+            'Medvedev', 'Zverev', 'Tsitsipas', 'Auger-Aliassime', 'del Potro', 'Cilic', 'Nishikori', 'Sinner',
+            'Fritz', 'Hurkacz', 'Ruud']
+    return list({f"{rng.choice(first)} {rng.choice(last)} {i}" for i in range(count)})
+
+
+def typo(name, rng):
+    """Drop, swap or replace one letter."""
+    i = int(rng.integers(1, len(name) - 1))
+    kind = rng.integers(3)
+    if kind == 0:
+        return name[:i] + name[i + 1:]
+    if kind == 1:
+        return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+    return name[:i] + 'x' + name[i + 1:]
+
+
+def per_call(function, queries):
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+# --- Per-keystroke latency: scanning the name list vs. NameIndex ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stats', default=os.path.join(project_root, 'player_avg_stats.csv'))
+    parser.add_argument('--players', type=int, default=50000, help="synthetic names if there is no stats file")
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    names = PlayerStatsIndex.load(args.stats).players if os.path.exists(args.stats) else synthetic_names(args.players)
+    start = time.perf_counter()
+    index = NameIndex(names)
+    build_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(1)
+    sample = [index.names[i] for i in rng.integers(len(index), size=args.queries)]
+    prefixes = [name[:int(rng.integers(3, len(name)))] for name in sample]
+    typos = [typo(name, rng) for name in sample]
+
+    def scan(query):
+        """What the pickers did before NameIndex: a case-insensitive substring check over every name."""
+        query = query.lower()
+        return [name for name in names if query in name.lower()]
+
+    scan_seconds = per_call(scan, prefixes[:100])
+    prefix_seconds = per_call(lambda query: index.prefix(query, args.k), prefixes)
+    fuzzy_seconds = per_call(lambda query: index.fuzzy(query, args.k), typos)
+    found = np.mean([name in index.search(query, args.k) for name, query in zip(sample, typos)])
+
+    print("\n--------------------------")
+    print(f"{len(index)} names, index built in {build_seconds * 1000:.0f} ms")
+    print(f"substring scan:     {scan_seconds * 1e6:9.1f} us")
+    print(f"prefix, NameIndex:  {prefix_seconds * 1e6:9.1f} us   (x{scan_seconds / prefix_seconds:.0f})")
+    print(f"fuzzy,  NameIndex:  {fuzzy_seconds * 1e6:9.1f} us")
+    print(f"misspelled name in the top {args.k}: {found:.1%}")
+    print("--------------------------")
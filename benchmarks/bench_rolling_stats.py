@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.match_loader import load_matches
+from src.models.elo import chronological
+from src.models.player_stats import STATS
+from src.models.rolling_stats import ROLLING_COLUMNS, rolling_stats
+
+
+def naive_career(matches, position, i):
+    """Career means going into match i by filtering every earlier match of the player: O(n) per match."""
+    row = matches.iloc[i]
+    means = []
+    for side in ('winner', 'loser'):
+        name = row[f'{side}_name']
+        prior = matches[((matches['winner_name'] == name) | (matches['loser_name'] == name))
+                        & (matches['surface'] == row['surface']) & (position < position[i])]
+        for w, l in STATS.values():
+            values = np.where(prior['winner_name'] == name, prior[w].astype('float64'), prior[l].astype('float64'))
+            means.append(np.nanmean(values) if np.isfinite(values).any() else np.nan)
+    return means
+
+
+# --- Pre-match career stats for every match: per-match filtering vs. one sorted pass ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sample', type=int, default=200, help="matches timed with the naive filter")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    matches = load_matches(columns=ROLLING_COLUMNS, workers=args.workers)
+    start = time.perf_counter()
+    rolling = rolling_stats(matches)
+    sorted_seconds = time.perf_counter() - start
+
+    position = np.empty(len(matches), dtype=np.int64)
+    position[chronological(matches)] = np.arange(len(matches))
+    sample = np.random.default_rng(0).choice(len(matches), min(args.sample, len(matches)), replace=False)
+    columns = [f'{side}_career_{stat}' for side in ('winner', 'loser') for stat in STATS]
+    start = time.perf_counter()
+    naive = np.array([naive_career(matches, position, i) for i in sample])
+    naive_seconds = (time.perf_counter() - start) / len(sample) * len(matches)
+    assert np.allclose(naive, rolling[columns].to_numpy()[sample], equal_nan=True)
+
+    print("\n--------------------------")
+    print(f"{len(matches)} matches, career + last-10 + 52-week windows for both players")
+    print(f"per-match filter:  {naive_seconds:10.1f} s  (estimated from {len(sample)} matches)")
+    print(f"one sorted pass:   {sorted_seconds:10.2f} s  (x{naive_seconds / sorted_seconds:,.0f})")
+    print("--------------------------")
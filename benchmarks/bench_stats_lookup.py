@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import argparse
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.models.features import h2h_features
+from src.models.stats_index import PlayerStatsIndex
+
+
+def mask_features(stats_df, p1_name, p2_name, surface):
+    """The front-ends' previous lookup: two boolean scans of the stats frame per player."""
+    p1_stats = stats_df[(stats_df['player'] == p1_name) & (stats_df['surface'] == surface)].iloc[0]
+    p2_stats = stats_df[(stats_df['player'] == p2_name) & (stats_df['surface'] == surface)].iloc[0]
+    return np.array([[
+        p1_stats['aces'] - p2_stats['aces'], p1_stats['dfs'] - p2_stats['dfs'],
+        p1_stats['serve_pts'] - p2_stats['serve_pts'], p1_stats['first_in'] - p2_stats['first_in'],
+        1 if surface == 'Hard' else 0, 1 if surface == 'Grass' else 0,
+    ]])
+
+
+def synthetic_stats(players):
+    rng = np.random.default_rng(0)
+    names = [f"Player {i}" for i in range(players)]
+    frame = pd.DataFrame([(name, surface) for name in names for surface in ('Hard', 'Clay', 'Grass')],
+                         columns=['player', 'surface'])
+    for stat, scale in (('aces', 6), ('dfs', 3), ('first_in', 50), ('serve_pts', 80)):
+        frame[stat] = rng.gamma(4, scale / 4, len(frame))
+    return frame
+
+
+def per_call(function, pairs, *args):
+    start = time.perf_counter()
+    for p1, p2, surface in pairs:
+        function(*args, p1, p2, surface)
+    return (time.perf_counter() - start) / len(pairs)
+
+
+# --- Per-prediction latency: mask filter on the stats frame vs. PlayerStatsIndex ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stats', default=os.path.join(project_root, 'player_avg_stats.csv'))
+    parser.add_argument('--model', default=os.path.join(project_root, 'h2h_model.joblib'))
+    parser.add_argument('--players', type=int, default=5000, help="synthetic players if there is no stats file")
+    parser.add_argument('--predictions', type=int, default=2000)
+    args = parser.parse_args()
+
+    stats_df = pd.read_csv(args.stats) if os.path.exists(args.stats) else synthetic_stats(args.players)
+    start = time.perf_counter()
+    index = PlayerStatsIndex.from_frame(stats_df)
+    build_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(1)
+    keys = list(index.rows)
+    pairs = []
+    while len(pairs) < args.predictions:
+        (p1, surface), (p2, _) = keys[rng.integers(len(keys))], keys[rng.integers(len(keys))]
+        if (p2, surface) in index:
+            pairs.append((p1, p2, surface))
+    for p1, p2, surface in pairs[:100]:
+        assert np.array_equal(mask_features(stats_df, p1, p2, surface), h2h_features(index, p1, p2, surface))
+
+    mask_lookup = per_call(mask_features, pairs, stats_df)
+    index_lookup = per_call(h2h_features, pairs, index)
+
+    def predict(lookup, source, model):
+        return lambda _, p1, p2, surface: model.predict_proba(lookup(source, p1, p2, surface))
+
+    rows = [('features only', mask_lookup, index_lookup)]
+    if os.path.exists(args.model):
+        model = joblib.load(args.model)
+        sample = pairs[:200]
+        rows.append(('with predict_proba', per_call(predict(mask_features, stats_df, model), sample, None),
+                     per_call(predict(h2h_features, index, model), sample, None)))
+
+    print("\n--------------------------")
+    print(f"{len(stats_df)} (player, surface) rows, index built in {build_seconds * 1000:.1f} ms")
+    print("                      mask filter      stats index")
+    for label, mask_seconds, index_seconds in rows:
+        print(f"{label:<20} {mask_seconds * 1e6:9.1f} us   {index_seconds * 1e6:9.1f} us"
+              f"   (x{mask_seconds / index_seconds:.0f})")
+    print("--------------------------")
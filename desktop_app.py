@@ -1,25 +1,77 @@
+import os
+import csv
+import queue
 import tkinter as tk
-from tkinter import ttk  # For better-looking widgets
-import pandas as pd
-import joblib
-import numpy as np
+from tkinter import ttk, filedialog  # For better-looking widgets
+# numpy, the model and the stats are loaded on a background thread once the
+# window is up, so nothing heavy is imported here.
+from src.utils.startup import BackgroundLoad, missing_files
+
+MODEL_FILE = 'h2h_model.joblib'
+STATS_FILE = 'player_avg_stats.csv'
+FORM_FILE = 'player_form.npz'   # optional, from src/models/decayed_form.py
+POLL_MS = 50            # how often the UI checks on background work
+BATCH_CHUNK = 2000      # fixtures scored per model call in the batch view
+ROWS_PER_POLL = 500     # result rows added to the table per UI tick
+SUGGESTIONS = 20        # names offered in a player dropdown as the user types
+h2h_model = player_stats = player_names = player_form = None
+
+# Tk may only be touched from the main thread. Work runs on a background
+# thread and the UI polls it with root.after, so the window never freezes.
+def when_done(task, callback):
+    if task.done():
+        callback(task)
+    else:
+        root.after(POLL_MS, when_done, task, callback)
 
 # --- Load Model and Data ---
 # This part is crucial and assumes the files are in the same folder.
-try:
-    h2h_model = joblib.load('h2h_model.joblib')
-    player_stats_df = pd.read_csv('player_avg_stats.csv')
-    PLAYER_NAMES = sorted(player_stats_df['player'].unique())
-except FileNotFoundError:
-    # This will show an error in the terminal if the files are missing.
-    print("Error: Model or stats file not found! Run 'src/models/train_h2h.py' first.")
-    exit()
+def load_resources():
+    from src.models.stats_index import PlayerStatsIndex
+    from src.models.compiled_tree import load_model
+    from src.models.features import H2H_SCHEMA, check_schema
+    from src.utils.name_search import NameIndex
+    from src.models.decayed_form import DecayedForm
+    model = load_model(MODEL_FILE)
+    # Refuse a model trained on different features than we build below
+    check_schema(model, H2H_SCHEMA)
+    # Index the stats once so each prediction is a couple of dict lookups
+    stats_index = PlayerStatsIndex.load(STATS_FILE)
+    # The dropdowns offer matches for what's typed instead of every player
+    names = NameIndex(stats_index.players)
+    # Recent form is shown under the prediction when its state file is there
+    form = DecayedForm.load(FORM_FILE) if os.path.exists(FORM_FILE) else None
+    return model, stats_index, names, form
+
+# Runs once the background load has finished: fill the dropdowns and enable the buttons.
+def finish_loading(loader):
+    global h2h_model, player_stats, player_names, player_form
+    loading_bar.stop()
+    loading_bar.grid_remove()
+    try:
+        h2h_model, player_stats, player_names, player_form = loader.result()
+    except Exception as e:
+        result_label.config(text=f"Could not load the model: {e}", foreground="red")
+        return
+    for combo in (p1_combo, p2_combo):
+        combo.bind("<KeyRelease>", suggest_players)
+    for button in (predict_button, batch_button, open_button):
+        button.config(state=tk.NORMAL)
+    result_label.config(text="")
+
+# Type-ahead: as the user types a name, the dropdown lists the closest players
+def suggest_players(event):
+    if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+        return
+    combo = event.widget
+    combo.config(values=player_names.search(combo.get(), SUGGESTIONS))
 
 # --- Prediction Function ---
 # This function runs when the user clicks the 'Predict' button.
 def predict():
-    player1 = p1_combo.get()
-    player2 = p2_combo.get()
+    # Accept a name typed with different case or accents, or a unique prefix match
+    player1 = resolve_player(p1_combo)
+    player2 = resolve_player(p2_combo)
     surface = surface_combo.get()
 
     if not player1 or not player2 or not surface:
@@ -29,66 +81,212 @@ def predict():
         result_label.config(text="Select two different players.", foreground="red")
         return
 
+    predict_button.config(state=tk.DISABLED)
+    result_label.config(text="Predicting...", foreground="black")
+    when_done(BackgroundLoad(predict_matchup, player1, player2, surface), show_prediction)
+
+def resolve_player(combo):
+    typed = combo.get()
+    name = player_names.lookup(typed)
+    if name is None:
+        candidates = player_names.search(typed, 2)
+        name = candidates[0] if len(candidates) == 1 else typed
+    if name != typed:
+        combo.set(name)
+    return name
+
+# Runs on the worker thread
+def predict_matchup(player1, player2, surface):
+    from src.models.features import h2h_features
+    # Look up stats for both players and take the difference in their average stats
+    features = h2h_features(player_stats, player1, player2, surface)
+    win_prob_p1 = h2h_model.predict_proba(features)[0][1]
+
+    form_lines = []
+    if player_form is not None:
+        form_lines = list(filter(None, (player_form.describe(name, surface) for name in (player1, player2))))
+
+    # Determine the winner
+    if win_prob_p1 > 0.5:
+        return player1, win_prob_p1, form_lines
+    return player2, 1 - win_prob_p1, form_lines
+
+def show_prediction(task):
+    predict_button.config(state=tk.NORMAL)
     try:
-        # Look up stats for both players
-        p1_stats = player_stats_df[(player_stats_df['player'] == player1) & (player_stats_df['surface'] == surface)].iloc[0]
-        p2_stats = player_stats_df[(player_stats_df['player'] == player2) & (player_stats_df['surface'] == surface)].iloc[0]
-
-        # Calculate the difference in their average stats
-        ace_diff = p1_stats['aces'] - p2_stats['aces']
-        df_diff = p1_stats['dfs'] - p2_stats['dfs']
-        serve_pts_diff = p1_stats['serve_pts'] - p2_stats['serve_pts']
-        first_serve_in_diff = p1_stats['first_in'] - p2_stats['first_in']
-        
-        # Prepare input for the model
-        surface_hard = 1 if surface == 'Hard' else 0
-        surface_grass = 1 if surface == 'Grass' else 0
-        
-        features = np.array([[ace_diff, df_diff, serve_pts_diff, first_serve_in_diff, surface_hard, surface_grass]])
-        win_prob_p1 = h2h_model.predict_proba(features)[0][1]
-
-        # Determine the winner and display the result
-        if win_prob_p1 > 0.5:
-            winner, prob = player1, win_prob_p1
-        else:
-            winner, prob = player2, 1 - win_prob_p1
-            
+        winner, prob, form_lines = task.result()
         result_label.config(text=f"Predicted Winner: {winner} ({prob:.1%})", foreground="green")
-
-    except IndexError:
+        form_label.config(text="\n".join(form_lines))
+    except KeyError:
         result_label.config(text="Not enough data for this matchup.", foreground="red")
+        form_label.config(text="")
+
+# --- Batch Predictions ---
+# Many matchups at once: typed one per line, or from a fixtures CSV with
+# player1, player2 and surface columns.
+def parse_matchups(text):
+    rows = [[field.strip() for field in row] for row in csv.reader(text.splitlines()) if any(row)]
+    bad = [i + 1 for i, row in enumerate(rows) if len(row) != 3]
+    if bad:
+        raise ValueError(f"Line {bad[0]} isn't 'Player 1, Player 2, Surface'")
+    return [(p1, p2, surface.title()) for p1, p2, surface in rows]
+
+def predict_batch():
+    try:
+        fixtures = parse_matchups(batch_text.get("1.0", tk.END))
+    except ValueError as e:
+        batch_status.config(text=str(e), foreground="red")
+        return
+    if fixtures:
+        start_batch(fixtures)
+
+def open_fixtures():
+    path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+    if path:
+        start_batch(path)
+
+def start_batch(fixtures):
+    for button in (batch_button, open_button):
+        button.config(state=tk.DISABLED)
+    results_table.delete(*results_table.get_children())
+    batch_progress.config(value=0)
+    batch_status.config(text="Scoring...", foreground="black")
+    results = queue.Queue()
+    worker = BackgroundLoad(score_batch, fixtures, results)
+    root.after(POLL_MS, show_batch, worker, results, [])
+
+# Runs on the worker thread. Scores `fixtures` (tuples, or a CSV path) in
+# chunks and hands each scored chunk to the UI through `results`.
+def score_batch(fixtures, results):
+    import pandas as pd
+    from src.models.predict import FIXTURE_COLUMNS, predict_fixtures
+    if isinstance(fixtures, str):
+        fixtures = pd.read_csv(fixtures, dtype=str, keep_default_na=False)
+    else:
+        fixtures = pd.DataFrame(fixtures, columns=FIXTURE_COLUMNS)
+    results.put(len(fixtures))
+    for start in range(0, len(fixtures), BATCH_CHUNK):
+        results.put(predict_fixtures(h2h_model, player_stats, fixtures.iloc[start:start + BATCH_CHUNK]))
+
+# Moves scored rows into the table a few hundred at a time, so the window
+# stays responsive however large the batch is.
+def show_batch(worker, results, pending):
+    while len(pending) < ROWS_PER_POLL:
+        try:
+            item = results.get_nowait()
+        except queue.Empty:
+            break
+        if isinstance(item, int):
+            batch_progress.config(maximum=max(item, 1))
+        else:
+            pending.extend(item.itertuples(index=False))
+    shown = pending[:ROWS_PER_POLL]
+    for row in shown:
+        if isinstance(row.error, str):
+            outcome = ("", row.error)
+        else:
+            outcome = (row.winner, f"{row.win_prob:.1%}")
+        results_table.insert("", tk.END, values=(row.player1, row.player2, row.surface) + outcome)
+    del pending[:ROWS_PER_POLL]
+    batch_progress.config(value=batch_progress["value"] + len(shown))
+
+    if pending or not results.empty() or not worker.done():
+        root.after(POLL_MS, show_batch, worker, results, pending)
+        return
+    for button in (batch_button, open_button):
+        button.config(state=tk.NORMAL)
+    try:
+        worker.result()
+    except (OSError, KeyError, ValueError) as e:
+        batch_status.config(text=f"Could not score the fixtures: {e}", foreground="red")
+        return
+    batch_status.config(text=f"Scored {int(batch_progress['value'])} matchups.", foreground="green")
 
 # --- GUI Setup ---
 # This part builds the actual window and its widgets.
-root = tk.Tk()
-root.title("Tennis Predictor")
-root.geometry("400x250")
-
-frame = ttk.Frame(root, padding="10")
-frame.pack(fill=tk.BOTH, expand=True)
-
-# Player 1 dropdown
-ttk.Label(frame, text="Player 1:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-p1_combo = ttk.Combobox(frame, values=PLAYER_NAMES, width=30)
-p1_combo.grid(row=0, column=1, padx=5, pady=5)
-
-# Player 2 dropdown
-ttk.Label(frame, text="Player 2:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
-p2_combo = ttk.Combobox(frame, values=PLAYER_NAMES, width=30)
-p2_combo.grid(row=1, column=1, padx=5, pady=5)
-
-# Surface dropdown
-ttk.Label(frame, text="Surface:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
-surface_combo = ttk.Combobox(frame, values=["Hard", "Clay", "Grass"], width=30)
-surface_combo.grid(row=2, column=1, padx=5, pady=5)
-
-# Predict Button
-predict_button = ttk.Button(frame, text="Predict Winner", command=predict)
-predict_button.grid(row=3, column=0, columnspan=2, pady=15)
-
-# Result Label
-result_label = ttk.Label(frame, text="", font=("Helvetica", 12))
-result_label.grid(row=4, column=0, columnspan=2)
-
-# Start the app's main event loop
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    if missing_files(MODEL_FILE, STATS_FILE):
+        # This will show an error in the terminal if the files are missing.
+        print("Error: Model or stats file not found! Run 'src/models/train_h2h.py' first.")
+        exit()
+
+    root = tk.Tk()
+    root.title("Tennis Predictor")
+    root.geometry("640x480")
+
+    tabs = ttk.Notebook(root)
+    tabs.pack(fill=tk.BOTH, expand=True)
+    frame = ttk.Frame(tabs, padding="10")
+    tabs.add(frame, text="Single Match")
+
+    # Player 1 dropdown
+    ttk.Label(frame, text="Player 1:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+    p1_combo = ttk.Combobox(frame, width=30)
+    p1_combo.grid(row=0, column=1, padx=5, pady=5)
+
+    # Player 2 dropdown
+    ttk.Label(frame, text="Player 2:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+    p2_combo = ttk.Combobox(frame, width=30)
+    p2_combo.grid(row=1, column=1, padx=5, pady=5)
+
+    # Surface dropdown
+    ttk.Label(frame, text="Surface:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+    surface_combo = ttk.Combobox(frame, values=["Hard", "Clay", "Grass"], width=30)
+    surface_combo.grid(row=2, column=1, padx=5, pady=5)
+
+    # Predict Button
+    predict_button = ttk.Button(frame, text="Predict Winner", command=predict, state=tk.DISABLED)
+    predict_button.grid(row=3, column=0, columnspan=2, pady=15)
+
+    # Result Label
+    result_label = ttk.Label(frame, text="Loading model...", font=("Helvetica", 12))
+    result_label.grid(row=4, column=0, columnspan=2)
+
+    # Recent form of both players, when player_form.npz is available
+    form_label = ttk.Label(frame, text="", wraplength=560, justify=tk.LEFT)
+    form_label.grid(row=6, column=0, columnspan=2, pady=5)
+
+    # Loading indicator, shown until the model and stats are ready
+    loading_bar = ttk.Progressbar(frame, mode="indeterminate", length=250)
+    loading_bar.grid(row=5, column=0, columnspan=2, pady=10)
+    loading_bar.start(10)
+
+    # Batch tab: matchups typed one per line, or opened from a CSV
+    batch_frame = ttk.Frame(tabs, padding="10")
+    tabs.add(batch_frame, text="Batch")
+    batch_frame.columnconfigure(0, weight=1)
+    batch_frame.rowconfigure(4, weight=1)
+    ttk.Label(batch_frame, text="One matchup per line: Player 1, Player 2, Surface").grid(row=0, column=0, sticky="w")
+    batch_text = tk.Text(batch_frame, height=6)
+    batch_text.grid(row=1, column=0, sticky="ew", pady=5)
+
+    buttons = ttk.Frame(batch_frame)
+    buttons.grid(row=2, column=0, sticky="w")
+    batch_button = ttk.Button(buttons, text="Predict All", command=predict_batch, state=tk.DISABLED)
+    batch_button.pack(side=tk.LEFT, padx=(0, 5))
+    open_button = ttk.Button(buttons, text="Open Fixtures CSV...", command=open_fixtures, state=tk.DISABLED)
+    open_button.pack(side=tk.LEFT)
+
+    batch_progress = ttk.Progressbar(batch_frame, mode="determinate")
+    batch_progress.grid(row=3, column=0, sticky="ew", pady=5)
+
+    # Results table
+    columns = ("player1", "player2", "surface", "winner", "win_prob")
+    results_table = ttk.Treeview(batch_frame, columns=columns, show="headings")
+    for column, heading, width in zip(columns, ("Player 1", "Player 2", "Surface", "Predicted Winner", "Chance"),
+                                      (130, 130, 60, 130, 90)):
+        results_table.heading(column, text=heading)
+        results_table.column(column, width=width)
+    scrollbar = ttk.Scrollbar(batch_frame, orient=tk.VERTICAL, command=results_table.yview)
+    results_table.configure(yscrollcommand=scrollbar.set)
+    results_table.grid(row=4, column=0, sticky="nsew")
+    scrollbar.grid(row=4, column=1, sticky="ns")
+
+    batch_status = ttk.Label(batch_frame, text="")
+    batch_status.grid(row=5, column=0, sticky="w", pady=5)
+
+    # The window is up; load the model and stats behind it
+    when_done(BackgroundLoad(load_resources), finish_loading)
+
+    # Start the app's main event loop
+    root.mainloop()
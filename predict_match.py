@@ -1,32 +1,61 @@
-import pandas as pd
-import joblib
-import numpy as np
+# Only the standard library is imported up front so the first prompt appears
+# straight away; numpy, the model and the stats load on a background thread.
+import os
+from src.utils.startup import BackgroundLoad, missing_files
+
+MODEL_FILE = 'h2h_model.joblib'
+STATS_FILE = 'player_avg_stats.csv'
+FORM_FILE = 'player_form.npz'   # optional, from src/models/decayed_form.py
+
+# --- Load the model and stats (runs in the background) ---
+def load_resources():
+    from src.models.stats_index import PlayerStatsIndex
+    from src.models.compiled_tree import load_model
+    from src.models.features import H2H_SCHEMA, check_schema
+    from src.utils.name_search import NameIndex
+    from src.models.decayed_form import DecayedForm
+    # The compiled .npz model and binary stats are used when present (no sklearn or pandas)
+    h2h_model = load_model(MODEL_FILE)
+    # Refuse a model trained on different features than we build below
+    check_schema(h2h_model, H2H_SCHEMA)
+    # Index the stats once so each prediction is a couple of dict lookups
+    player_stats = PlayerStatsIndex.load(STATS_FILE)
+    # Lets a misspelled or partial name still find the right player
+    names = NameIndex(player_stats.players)
+    # Recent form is shown alongside the prediction when its state file is there
+    form = DecayedForm.load(FORM_FILE) if os.path.exists(FORM_FILE) else None
+    return h2h_model, player_stats, names, form
+
+# --- Turn what the user typed into a known player name ---
+def resolve_player(typed, names):
+    name = names.lookup(typed)
+    if name is not None:
+        return name
+    candidates = names.search(typed, 5)
+    if not candidates:
+        print(f"Error: No player found matching '{typed}'.")
+        return None
+    print(f"\n'{typed}' not found. Did you mean:")
+    for number, candidate in enumerate(candidates, 1):
+        print(f"  {number}. {candidate}")
+    choice = input("Pick a number (Enter for 1, anything else to skip): ").strip()
+    if not choice:
+        return candidates[0]
+    if choice.isdigit() and 1 <= int(choice) <= len(candidates):
+        return candidates[int(choice) - 1]
+    return None
 
 # --- Main function to run the prediction ---
-def predict_winner(p1_name, p2_name, surface, model, stats_df):
+def predict_winner(p1_name, p2_name, surface, model, stats_index, form=None):
+    from src.models.features import h2h_features
     try:
-        # Look up average stats for both players on the given surface
-        p1_stats = stats_df[(stats_df['player'] == p1_name) & (stats_df['surface'] == surface)].iloc[0]
-        p2_stats = stats_df[(stats_df['player'] == p2_name) & (stats_df['surface'] == surface)].iloc[0]
-    except IndexError:
+        # Look up average stats for both players on the given surface and
+        # take the difference, in the exact same order as the training features
+        match_features = h2h_features(stats_index, p1_name, p2_name, surface)
+    except KeyError:
         # Handle cases where a player is not found or has no data on that surface
         print("Error: One or both players not found, or no match data available on this surface.")
         return
-
-    # Calculate the difference in their average historical stats
-    ace_diff = p1_stats['aces'] - p2_stats['aces']
-    df_diff = p1_stats['dfs'] - p2_stats['dfs']
-    serve_pts_diff = p1_stats['serve_pts'] - p2_stats['serve_pts']
-    first_serve_in_diff = p1_stats['first_in'] - p2_stats['first_in']
-    
-    # Prepare the input for the model
-    surface_hard = 1 if surface == 'Hard' else 0
-    surface_grass = 1 if surface == 'Grass' else 0
-    
-    # The input must be in the exact same order as the training features
-    match_features = np.array([[
-        ace_diff, df_diff, serve_pts_diff, first_serve_in_diff, surface_hard, surface_grass
-    ]])
     
     # Get the prediction probability from the model
     win_probability_p1 = model.predict_proba(match_features)[0][1] * 100
@@ -38,19 +67,18 @@ def predict_winner(p1_name, p2_name, surface, model, stats_df):
         print(f"🏆 Predicted Winner: {p1_name} ({win_probability_p1:.1f}% chance)")
     else:
         print(f"🏆 Predicted Winner: {p2_name} ({(100 - win_probability_p1):.1f}% chance)")
+    if form is not None:
+        for line in filter(None, (form.describe(name, surface) for name in (p1_name, p2_name))):
+            print(f"📈 {line}")
     print("--------------------------")
 
 # --- Main part of the program ---
 if __name__ == "__main__":
-    try:
-        # Load the trained model and the player stats file
-        h2h_model = joblib.load('h2h_model.joblib')
-        player_stats_df = pd.read_csv('player_avg_stats.csv')
-        print("✅ AI model and player stats loaded successfully.")
-    except FileNotFoundError:
+    if missing_files(MODEL_FILE, STATS_FILE):
         print("❌ Error: Model or stats file not found.")
         print("Please run the 'src/models/train_h2h.py' script first.")
         exit()
+    resources = BackgroundLoad(load_resources)
 
     while True:
         # Get user input
@@ -58,7 +86,12 @@ if __name__ == "__main__":
         player2 = input("Enter Player 2 Name (e.g., Carlos Alcaraz): ").strip()
         court_surface = input("Enter Surface (Hard, Clay, or Grass): ").strip().title()
 
-        predict_winner(player1, player2, court_surface, h2h_model, player_stats_df)
+        # Usually finished long before the user has typed the first matchup
+        h2h_model, player_stats, player_names, form = resources.result()
+        player1 = resolve_player(player1, player_names)
+        player2 = player1 and resolve_player(player2, player_names)
+        if player1 and player2:
+            predict_winner(player1, player2, court_surface, h2h_model, player_stats, form)
         
         again = input("\nMake another prediction? (yes/no): ").strip().lower()
         if again != 'yes':
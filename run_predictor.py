@@ -1,8 +1,20 @@
-import joblib
-import numpy as np
+# Only the standard library is imported up front so the first prompt appears
+# straight away; numpy and the model load on a background thread.
+from src.utils.startup import BackgroundLoad, missing_files
+
+MODEL_FILE = 'real_tennis_model.joblib'
+
+# --- Load the model (runs in the background) ---
+def load_real_model():
+    from src.models.compiled_tree import load_model
+    from src.models.features import REAL_SCHEMA, check_schema
+    # The compiled .npz model is used when present, so scikit-learn isn't imported
+    model = load_model(MODEL_FILE)
+    check_schema(model, REAL_SCHEMA)
+    return model
 
 # --- Function to get user input and prepare it for the model ---
-def get_user_input_and_predict(model):
+def get_user_input_and_predict(model_loader):
     print("\n🎾 Enter Player Stats to Predict Match Outcome 🎾")
     
     # Get stats from the user
@@ -11,23 +23,13 @@ def get_user_input_and_predict(model):
     first_serve_perc = float(input("Enter First Serve Percentage (e.g., 65.4): "))
     surface = input("Enter court surface (Hard, Clay, or Grass): ").strip().title()
     
-    # Calculate the "smart stat" (feature) that the model was trained on
-    ace_to_df_ratio = aces / (double_faults + 1)
-    
-    # Process the surface input into the numerical format the model understands
-    surface_hard = 1 if surface == 'Hard' else 0
-    surface_grass = 1 if surface == 'Grass' else 0
-        
-    # Put all the data into a single list, in the exact same order as the training features
-    # Note the double brackets [[...]] because the model expects a 2D array (a list of matches)
-    user_data = np.array([[
-        aces, 
-        double_faults, 
-        first_serve_perc, 
-        ace_to_df_ratio, 
-        surface_hard, 
-        surface_grass
-    ]])
+    # Usually finished long before the user has typed the stats
+    model = model_loader.result()
+    from src.models.features import real_matrix
+
+    # Build the model input: the "smart stat" (ace to double fault ratio) and the
+    # surface are computed exactly as in training, in the same feature order
+    user_data = real_matrix([aces], [double_faults], [first_serve_perc], [surface])
     
     # Use the loaded model to make a prediction
     prediction = model.predict(user_data)
@@ -47,16 +49,12 @@ def get_user_input_and_predict(model):
 
 # --- Main part of the program ---
 if __name__ == "__main__":
-    MODEL_FILE = 'real_tennis_model.joblib'
-    
-    # Load the saved model from the file
-    try:
-        loaded_model = joblib.load(MODEL_FILE)
-        print(f"✅ AI Model '{MODEL_FILE}' loaded successfully.")
-    except FileNotFoundError:
+    if missing_files(MODEL_FILE):
         print(f"❌ Error: '{MODEL_FILE}' not found.")
         print("Please run the 'src/models/train_real_model.py' script first to create the model file.")
         exit()
+    # Start loading the saved model while the user types
+    loaded_model = BackgroundLoad(load_real_model)
 
     # Loop to allow for multiple predictions
     while True:
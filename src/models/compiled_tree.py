@@ -0,0 +1,183 @@
+import os
+import sys
+import json
+import pickle
+import hashlib
+import argparse
+
+import numpy as np
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+from src.utils.digest import file_digest
+
+# A fitted DecisionTreeClassifier flattened into plain arrays, so the apps can
+# score it with NumPy alone: exporting needs scikit-learn, loading and
+# predicting don't.
+TREE_ARRAYS = ('feature', 'threshold', 'left', 'right', 'proba', 'classes')
+
+
+def model_version(model):
+    """
+    Content hash of a trained model, for keying cached predictions. For a
+    decision tree this hashes the fitted tree itself, so the same model
+    loaded twice (or its compiled form) gets the same version; pickle bytes
+    aren't stable.
+    """
+    version = getattr(model, 'version', None)
+    if version is not None:
+        return version
+    tree = getattr(model, 'tree_', None)
+    if tree is None:
+        return hashlib.sha1(pickle.dumps(model, protocol=4)).hexdigest()
+    digest = hashlib.sha1(getattr(model, 'feature_schema_', {}).get('hash', '').encode('utf-8'))
+    for array in (model.classes_, tree.feature, tree.threshold, tree.children_left, tree.children_right, tree.value):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+class CompiledTree:
+    """
+    Array form of a fitted DecisionTreeClassifier with the same predict_proba
+    and predict. Matches scikit-learn bit for bit: inputs are cast to
+    float32 as sklearn does, each split sends a row left when
+    x[feature] <= threshold (float64), and leaves hold the class
+    probabilities sklearn computes (value normalised by its sum).
+    """
+
+    def __init__(self, feature, threshold, left, right, proba, classes, n_features, feature_schema=None,
+                 feature_names=None, version=None, source_digest=None):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.proba = np.asarray(proba, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = int(n_features)
+        if feature_schema is not None:
+            self.feature_schema_ = feature_schema
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.version = version
+        self.source_digest = source_digest
+        # Leaves point at themselves, so every row can take the same number of steps
+        nodes = np.arange(len(self.feature))
+        leaf = self.left < 0
+        self.left = np.where(leaf, nodes, self.left)
+        self.right = np.where(leaf, nodes, self.right)
+        self.feature = np.where(leaf, 0, self.feature)
+        self.depth = self._depth(leaf)
+
+    def _depth(self, leaf):
+        depth, frontier = 0, np.zeros(1, dtype=np.intp)
+        while not leaf[frontier].all():
+            frontier = np.concatenate([self.left[frontier[~leaf[frontier]]], self.right[frontier[~leaf[frontier]]]])
+            depth += 1
+        return depth
+
+    @classmethod
+    def from_sklearn(cls, model):
+        tree = model.tree_
+        value = tree.value[:, 0, :].astype(np.float64)
+        # Same arithmetic as DecisionTreeClassifier.predict_proba
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        names = getattr(model, 'feature_names_in_', None)
+        return cls(tree.feature, tree.threshold, tree.children_left, tree.children_right, value / normalizer,
+                   model.classes_, model.n_features_in_, getattr(model, 'feature_schema_', None),
+                   None if names is None else list(names), model_version(model))
+
+    def save(self, path):
+        """Write the tree to a .npz file; metadata is stored as JSON so loading never unpickles."""
+        leaf = self.left == np.arange(len(self.left))
+        meta = {'n_features': self.n_features_in_, 'version': self.version, 'source_digest': self.source_digest,
+                'feature_schema': getattr(self, 'feature_schema_', None),
+                'feature_names': None if getattr(self, 'feature_names_in_', None) is None
+                else list(self.feature_names_in_)}
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, feature=np.where(leaf, -2, self.feature), threshold=self.threshold,
+                 left=np.where(leaf, -1, self.left), right=np.where(leaf, -1, self.right),
+                 proba=self.proba, classes=self.classes_, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in TREE_ARRAYS}
+            meta = json.loads(str(data['meta']))
+        return cls(**arrays, n_features=meta['n_features'], feature_schema=meta['feature_schema'],
+                   feature_names=meta['feature_names'], version=meta['version'],
+                   source_digest=meta['source_digest'])
+
+    def apply(self, X):
+        """Leaf index of every row of X."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the tree expects {self.n_features_in_}")
+        if not np.isfinite(X).all():
+            raise ValueError("Input X contains NaN or infinity")
+        rows = np.arange(len(X))
+        node = np.zeros(len(X), dtype=np.intp)
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X):
+        return self.proba[self.apply(X)]
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def compiled_path(model_path):
+    """Where the compiled form of a .joblib model lives: same name, .npz."""
+    return os.path.splitext(model_path)[0] + '.npz'
+
+
+def export_tree(model, path, source_path=None):
+    """
+    Compile a fitted DecisionTreeClassifier and save it to `path` (.npz).
+    `source_path` is the .joblib it was saved to; its hash is recorded so a
+    stale compiled copy is never used for a retrained model.
+    """
+    compiled = CompiledTree.from_sklearn(model)
+    if source_path is not None:
+        compiled.source_digest = file_digest(source_path)
+    compiled.save(path)
+    return compiled
+
+
+def load_model(model_path):
+    """
+    Load a model for prediction. If there is a compiled .npz made from this
+    exact .joblib it is used and scikit-learn is never imported; otherwise
+    the pickled model is loaded with joblib.
+    """
+    npz_path = compiled_path(model_path)
+    if os.path.exists(npz_path):
+        compiled = CompiledTree.load(npz_path)
+        if not os.path.exists(model_path) or compiled.source_digest == file_digest(model_path):
+            return compiled
+    import joblib
+    return joblib.load(model_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile .joblib decision trees to .npz for sklearn-free prediction.")
+    parser.add_argument('models', nargs='+', help="e.g. h2h_model.joblib real_tennis_model.joblib")
+    args = parser.parse_args()
+
+    import joblib
+    for model_path in args.models:
+        try:
+            model = joblib.load(model_path)
+        except FileNotFoundError:
+            print(f"❌ Error: '{model_path}' not found.")
+            sys.exit(1)
+        compiled = export_tree(model, compiled_path(model_path), model_path)
+        print(f"✅ {model_path} -> {compiled_path(model_path)} "
+              f"({len(compiled.feature)} nodes, depth {compiled.depth})")
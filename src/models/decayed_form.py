@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Get the project root directory (two levels up from this script)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, project_root)
+from src.models.stats_index import INDEX_STATS, PlayerStatsIndex
+
+# numpy only at import time: the prediction apps load the state file at
+# startup; pandas is only needed to feed in matches.
+FORM_PATH = os.path.join(project_root, 'player_form.npz')
+HALF_LIFE_DAYS = 180
+# (winner column, loser column) of each stat, in PlayerStatsIndex order
+FORM_STATS = {'aces': ('w_ace', 'l_ace'), 'dfs': ('w_df', 'l_df'),
+              'serve_pts': ('w_svpt', 'l_svpt'), 'first_in': ('w_1stIn', 'l_1stIn')}
+FORM_COLUMNS = ['tourney_id', 'tourney_date', 'match_num', 'surface', 'winner_name', 'loser_name'] + \
+    [column for columns in FORM_STATS.values() for column in columns]
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def _day(date):
+    """Days since 1970-01-01 of one YYYYMMDD date."""
+    date = int(date)
+    return int((np.datetime64(f'{date // 10000:04d}-{date // 100 % 100:02d}-{date % 100:02d}', 'D') - EPOCH)
+               .astype(np.int64))
+
+
+class DecayedForm:
+    """
+    Exponentially time-decayed per-player, per-surface stat averages: a
+    match `half_life` days old counts half as much as one played today.
+
+    The state per (player, surface) is O(1): the decayed sum of each stat,
+    the decayed weight of the matches that had it, the decayed match count
+    and the day they were last brought up to date. Averages are sum /
+    weight; decaying both by the same factor leaves them unchanged, so they
+    only move when a player plays. The decayed match count says how much
+    recent evidence is behind them.
+
+    Matches are applied one tourney_date at a time: the players of that date
+    are decayed to it, then all of its matches are added with np.add.at.
+    The state saves to a small .npz, so a new week's results update it
+    without a rebuild. Like the Elo state it keeps the hashes of the match
+    keys it has applied, and update() skips those. A decayed sum doesn't
+    depend on the order matches are added in, so a result that arrives
+    after later dates were applied is added with the weight it has at the
+    player's current day, the same as a rebuild would give it.
+    """
+
+    def __init__(self, half_life=HALF_LIFE_DAYS):
+        self.half_life = float(half_life)
+        self.keys = []
+        self.rows = {}
+        self.sums = np.empty((0, len(FORM_STATS)))
+        self.weights = np.empty((0, len(FORM_STATS)))
+        self.matches = np.empty(0)
+        self.days = np.empty(0, dtype=np.int64)
+        self.last_date = 0
+        self.applied = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _decay(self, elapsed_days):
+        return 0.5 ** (np.asarray(elapsed_days, dtype=np.float64) / self.half_life)
+
+    def _intern(self, players, surfaces):
+        ids = np.empty(len(players), dtype=np.int64)
+        rows = self.rows
+        for i, key in enumerate(zip(players, surfaces)):
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = len(self.keys)
+                self.keys.append(key)
+            ids[i] = row
+        grow = len(self.keys) - len(self.matches)
+        if grow:
+            self.sums = np.vstack([self.sums, np.zeros((grow, len(FORM_STATS)))])
+            self.weights = np.vstack([self.weights, np.zeros((grow, len(FORM_STATS)))])
+            self.matches = np.concatenate([self.matches, np.zeros(grow)])
+            self.days = np.concatenate([self.days, np.zeros(grow, dtype=np.int64)])
+        return ids
+
+    def update(self, matches):
+        """
+        Add the results in `matches` (FORM_COLUMNS, any order) this state
+        hasn't applied yet, including late ones dated before the last date
+        applied. Returns how many matches were applied.
+        """
+        from src.utils.dates import day_numbers
+        from src.models.elo import key_hashes, unapplied
+
+        if self.applied is None:
+            raise ValueError("this form state doesn't record which matches it applied; rebuild it")
+        dates = matches['tourney_date'].fillna(0).to_numpy(dtype=np.int64)
+        hashes = key_hashes(matches)
+        new = unapplied(hashes, self.applied)
+        for column in ('winner_name', 'loser_name', 'surface', 'tourney_date'):
+            new &= matches[column].notna().to_numpy()
+        positions = np.flatnonzero(new)
+        if len(positions) == 0:
+            return 0
+        positions = positions[np.argsort(dates[positions], kind='stable')]
+        batch = matches.iloc[positions]
+        surfaces = batch['surface'].to_numpy(dtype=object)
+        rows = self._intern(np.concatenate([batch['winner_name'].to_numpy(dtype=object),
+                                            batch['loser_name'].to_numpy(dtype=object)]),
+                            np.concatenate([surfaces, surfaces]))
+        days = np.tile(day_numbers(batch['tourney_date']).astype(np.int64), 2)
+        values = np.column_stack([np.concatenate([batch[w].to_numpy(dtype=np.float64, na_value=np.nan),
+                                                  batch[l].to_numpy(dtype=np.float64, na_value=np.nan)])
+                                  for w, l in FORM_STATS.values()])
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+
+        order = np.argsort(days, kind='stable')
+        rows, days, values, present = rows[order], days[order], values[order], present[order]
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], len(days)]):
+            day = days[start]
+            touched = np.unique(rows[start:end])
+            # Bring these players up to this date (rows already past it, from
+            # a late result, stay where they are), then add the date's matches
+            # with their weight at each row's day: 1 unless the result is late
+            target = np.where(self.matches[touched] > 0, np.maximum(self.days[touched], day), day)
+            factor = self._decay(target - self.days[touched])
+            self.sums[touched] *= factor[:, None]
+            self.weights[touched] *= factor[:, None]
+            self.matches[touched] *= factor
+            self.days[touched] = target
+            weight = self._decay(self.days[rows[start:end]] - day)
+            np.add.at(self.sums, rows[start:end], values[start:end] * weight[:, None])
+            np.add.at(self.weights, rows[start:end], present[start:end] * weight[:, None])
+            np.add.at(self.matches, rows[start:end], weight)
+
+        self.last_date = max(self.last_date, int(dates[positions[-1]]))
+        self.applied = np.union1d(self.applied, hashes[positions])
+        return len(batch)
+
+    def averages(self):
+        """Decayed average of each stat per (player, surface) row; NaN where no match had the stat."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.weights > 0, self.sums / self.weights, np.nan)
+
+    def recent_matches(self, date=None):
+        """Decayed match count of every row as of YYYYMMDD `date` (default: the last date applied)."""
+        if not self.last_date:
+            return self.matches.copy()
+        day = _day(date or self.last_date)
+        return self.matches * self._decay(np.maximum(day - self.days, 0))
+
+    def lookup(self, player, surface, date=None):
+        """A player's decayed form on a surface as a dict of stat averages plus `matches`; KeyError if unseen."""
+        row = self.rows[(player, surface)]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = np.where(self.weights[row] > 0, self.sums[row] / self.weights[row], np.nan)
+        form = dict(zip(FORM_STATS, averages.tolist()))
+        elapsed = max(_day(date or self.last_date) - self.days[row], 0)
+        form['matches'] = float(self.matches[row] * self._decay(elapsed))
+        return form
+
+    def describe(self, player, surface):
+        """One line of a player's current form on a surface for the apps, or None if they haven't played on it."""
+        try:
+            form = self.lookup(player, surface)
+        except KeyError:
+            return None
+        return (f"{player} on {surface}: {form['aces']:.1f} aces, {form['dfs']:.1f} double faults per match "
+                f"(weighted over {form['matches']:.1f} recent matches, half-life {self.half_life:g} days)")
+
+    def stats_index(self):
+        """
+        The decayed averages as a PlayerStatsIndex, a drop-in for the career
+        averages of player_avg_stats.csv (rows missing a stat are left out).
+        """
+        values = self.averages()[:, [list(FORM_STATS).index(stat) for stat in INDEX_STATS]]
+        complete = np.flatnonzero(~np.isnan(values).any(axis=1))
+        return PlayerStatsIndex([self.keys[i][0] for i in complete], [self.keys[i][1] for i in complete],
+                                values[complete])
+
+    def save(self, path=FORM_PATH):
+        """Write the state to a .npz (metadata as JSON, so loading never unpickles)."""
+        meta = {'half_life': self.half_life, 'last_date': self.last_date, 'stats': list(FORM_STATS)}
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, players=np.array([player for player, _ in self.keys], dtype=str),
+                 surfaces=np.array([surface for _, surface in self.keys], dtype=str), sums=self.sums,
+                 weights=self.weights, matches=self.matches, days=self.days,
+                 applied=self.applied, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=FORM_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['stats'] != list(FORM_STATS):
+                raise ValueError(f"{path} holds stats {meta['stats']}; rebuild it")
+            form = cls(meta['half_life'])
+            form.keys = list(zip(data['players'].tolist(), data['surfaces'].tolist()))
+            form.sums, form.weights = data['sums'], data['weights']
+            form.matches, form.days = data['matches'], data['days']
+            # Older states can still be read, but not updated
+            form.applied = data['applied'] if 'applied' in data else None
+        form.rows = {key: i for i, key in enumerate(form.keys)}
+        form.last_date = meta['last_date']
+        return form
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the players' time-decayed form.")
+    parser.add_argument('--state', default=FORM_PATH)
+    parser.add_argument('--half-life', type=float, default=None,
+                        help=f"days for a match's weight to halve (default {HALF_LIFE_DAYS}; changing it rebuilds)")
+    parser.add_argument('--rebuild', action='store_true', help="ignore the saved state and replay every match")
+    parser.add_argument('--player', help="print this player's current form")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    from src.utils.match_loader import load_matches
+    form = None
+    if os.path.exists(args.state) and not args.rebuild:
+        form = DecayedForm.load(args.state)
+        if args.half_life is not None and args.half_life != form.half_life:
+            print(f"Half-life changed from {form.half_life:g} to {args.half_life:g} days; rebuilding.")
+            form = None
+    if form is None:
+        form = DecayedForm(args.half_life or HALF_LIFE_DAYS)
+    matches = load_matches(columns=FORM_COLUMNS, workers=args.workers)
+    start = time.perf_counter()
+    try:
+        applied = form.update(matches)
+    except ValueError as error:
+        print(f"❌ {error} (run again with --rebuild).")
+        sys.exit(1)
+    seconds = time.perf_counter() - start
+    form.save(args.state)
+    print(f"✅ Applied {applied} new matches in {seconds:.2f}s ({applied / max(seconds, 1e-9):,.0f} matches/sec); "
+          f"saved {args.state} ({len(form)} player/surface rows, half-life {form.half_life:g} days).")
+
+    if args.player:
+        for player, surface in form.keys:
+            if player == args.player:
+                recent = form.lookup(player, surface)
+                print(f"  {surface:<7} " + ", ".join(f"{stat} {value:.1f}" for stat, value in recent.items()))
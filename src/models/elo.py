@@ -0,0 +1,251 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Get the project root directory (two levels up from this script)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, project_root)
+from src.utils.match_loader import load_matches
+
+ELO_PATH = os.path.join(project_root, 'elo_ratings.npz')
+ELO_COLUMNS = ['tourney_id', 'tourney_date', 'round', 'match_num', 'surface', 'winner_name', 'loser_name']
+SURFACES = ['Hard', 'Clay', 'Grass', 'Carpet']
+# Pre-match ratings added to each match, see EloRatings.update
+RATING_COLUMNS = ['winner_elo', 'loser_elo', 'winner_surface_elo', 'loser_surface_elo']
+# Order of play within a tournament; rounds not listed go first
+ROUND_ORDER = {name: i for i, name in enumerate(
+    ['Q1', 'Q2', 'Q3', 'Q4', 'RR', 'R128', 'R64', 'R32', 'R16', 'QF', 'SF', 'BR', 'F'], start=1)}
+
+
+def chronological(matches):
+    """Positions of `matches` in order of play: tourney_date, then tournament, round and match_num."""
+    rounds = matches['round'].astype(object).map(ROUND_ORDER).fillna(0).to_numpy(dtype=np.int64)
+    tourneys = pd.factorize(matches['tourney_id'].astype(object), sort=True)[0]
+    return np.lexsort((matches['match_num'].fillna(0).to_numpy(dtype=np.int64), rounds, tourneys,
+                       matches['tourney_date'].fillna(0).to_numpy(dtype=np.int64)))
+
+
+def match_keys(matches):
+    """A key per match: tournament, match number and both players (match_num alone is not always unique)."""
+    return (matches['tourney_id'].astype(str) + '/' + matches['match_num'].astype(str) + '/'
+            + matches['winner_name'].astype(str) + '/' + matches['loser_name'].astype(str)).to_numpy(dtype=object)
+
+
+def key_hashes(matches):
+    """64-bit hashes of the match_keys, which a state keeps (sorted) to know what it has applied."""
+    return pd.util.hash_array(match_keys(matches))
+
+
+def unapplied(hashes, applied):
+    """Mask of the key `hashes` that are not in the sorted array `applied`."""
+    if len(applied) == 0:
+        return np.ones(len(hashes), dtype=bool)
+    at = np.minimum(np.searchsorted(applied, hashes), len(applied) - 1)
+    return applied[at] != hashes
+
+
+class EloRatings:
+    """
+    Overall and per-surface Elo ratings for every player, updated in one
+    pass over matches in order of play.
+
+    Players are interned to integer ids on first sight; ratings and match
+    counts live in arrays indexed by id (surface ratings as an id x SURFACES
+    matrix). The K-factor shrinks with experience, k / (matches + offset) ** shape
+    (FiveThirtyEight's tennis Elo), counted separately for each surface.
+
+    The state can be saved and loaded, so new results are applied in
+    O(new matches): it keeps the hash of every match key it has applied,
+    and update() skips those. Results that turn up later for a date before
+    the last one processed can't be applied in order: update() raises
+    ValueError on them, and the ratings need a rebuild.
+    """
+
+    def __init__(self, k=250.0, offset=5.0, shape=0.4, initial=1500.0):
+        self.k, self.offset, self.shape, self.initial = k, offset, shape, initial
+        self.players = []
+        self.ids = {}
+        self.ratings = np.empty(0)
+        self.surface_ratings = np.empty((0, len(SURFACES)))
+        self.played = np.empty(0, dtype=np.int32)
+        self.surface_played = np.empty((0, len(SURFACES)), dtype=np.int32)
+        self.last_date = 0
+        self.applied = np.empty(0, dtype=np.uint64)
+        self.matches_processed = 0
+
+    def __len__(self):
+        return len(self.players)
+
+    def _intern(self, names):
+        """Ids for an array of player names, adding players seen for the first time."""
+        codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+        ids = self.ids
+        for name in uniques:
+            if name not in ids:
+                ids[name] = len(self.players)
+                self.players.append(name)
+        grow = len(self.players) - len(self.ratings)
+        if grow:
+            self.ratings = np.concatenate([self.ratings, np.full(grow, self.initial)])
+            self.surface_ratings = np.vstack([self.surface_ratings, np.full((grow, len(SURFACES)), self.initial)])
+            self.played = np.concatenate([self.played, np.zeros(grow, dtype=np.int32)])
+            self.surface_played = np.vstack([self.surface_played, np.zeros((grow, len(SURFACES)), dtype=np.int32)])
+        return np.fromiter((ids[name] for name in uniques), dtype=np.int64, count=len(uniques))[codes]
+
+    def update(self, matches):
+        """
+        Apply the results in `matches` (ELO_COLUMNS, any order) and return
+        each match's pre-match ratings as a DataFrame with RATING_COLUMNS on
+        the same index. Matches this state has already applied, or with a
+        missing player, are skipped and get NaN; so does the surface rating
+        of a match on a surface outside SURFACES. Raises ValueError, before
+        applying anything, if `matches` has results this state never applied
+        dated before the last date it processed.
+        """
+        pre = pd.DataFrame(np.nan, index=matches.index, columns=RATING_COLUMNS)
+        dates = matches['tourney_date'].fillna(0).to_numpy(dtype=np.int64)
+        hashes = key_hashes(matches)
+        new = unapplied(hashes, self.applied)
+        new &= matches['winner_name'].notna().to_numpy() & matches['loser_name'].notna().to_numpy()
+        late = np.count_nonzero(new & (dates < self.last_date))
+        if late:
+            raise ValueError(f"{late} matches dated before {self.last_date}, the last date these ratings processed, "
+                             f"were never applied; rebuild the ratings from scratch")
+        positions = np.flatnonzero(new)
+        if len(positions) == 0:
+            return pre
+        positions = positions[chronological(matches.iloc[positions])]
+        batch = matches.iloc[positions]
+
+        players = self._intern(np.concatenate([batch['winner_name'].to_numpy(dtype=object),
+                                               batch['loser_name'].to_numpy(dtype=object)]))
+        surface_codes = {name: i for i, name in enumerate(SURFACES)}
+        surfaces = batch['surface'].astype(object).map(surface_codes).fillna(-1).to_numpy(dtype=np.int64)
+        pre.iloc[positions] = self._run(players[:len(batch)], players[len(batch):], surfaces)
+
+        self.last_date = int(dates[positions[-1]])
+        self.applied = np.union1d(self.applied, hashes[positions])
+        self.matches_processed += len(batch)
+        return pre
+
+    def _run(self, winners, losers, surfaces):
+        """
+        The sequential pass; returns the pre-match ratings as an (n, 4)
+        array. Plain Python lists are much faster than NumPy one element at
+        a time.
+        """
+        k, offset, shape, nan = self.k, self.offset, self.shape, float('nan')
+        ratings, played = self.ratings.tolist(), self.played.tolist()
+        surface_ratings, surface_played = self.surface_ratings.tolist(), self.surface_played.tolist()
+        out = []
+        for w, l, s in zip(winners.tolist(), losers.tolist(), surfaces.tolist()):
+            rw, rl = ratings[w], ratings[l]
+            expected = 1.0 / (1.0 + 10.0 ** ((rl - rw) / 400.0))
+            ratings[w] = rw + k / (played[w] + offset) ** shape * (1.0 - expected)
+            ratings[l] = rl - k / (played[l] + offset) ** shape * (1.0 - expected)
+            played[w] += 1
+            played[l] += 1
+            if s < 0:
+                out.append((rw, rl, nan, nan))
+                continue
+            sw, sl = surface_ratings[w], surface_ratings[l]
+            out.append((rw, rl, sw[s], sl[s]))
+            expected = 1.0 / (1.0 + 10.0 ** ((sl[s] - sw[s]) / 400.0))
+            sw[s] += k / (surface_played[w][s] + offset) ** shape * (1.0 - expected)
+            sl[s] -= k / (surface_played[l][s] + offset) ** shape * (1.0 - expected)
+            surface_played[w][s] += 1
+            surface_played[l][s] += 1
+        self.ratings, self.played = np.array(ratings), np.array(played, dtype=np.int32)
+        self.surface_ratings = np.array(surface_ratings).reshape(-1, len(SURFACES))
+        self.surface_played = np.array(surface_played, dtype=np.int32).reshape(-1, len(SURFACES))
+        return np.array(out, dtype=np.float64).reshape(-1, len(RATING_COLUMNS))
+
+    def lookup(self, names, surfaces):
+        """
+        Current (overall, surface) ratings for arrays of names and surfaces,
+        as an (n, 2) array. Players and surfaces without a rating get `initial`.
+        """
+        ids = np.fromiter((self.ids.get(name, -1) for name in names), dtype=np.int64, count=len(names))
+        columns = np.fromiter((SURFACES.index(s) if s in SURFACES else -1 for s in surfaces), dtype=np.int64,
+                              count=len(surfaces))
+        known = ids >= 0
+        result = np.full((len(ids), 2), self.initial)
+        result[known, 0] = self.ratings[ids[known]]
+        on_surface = known & (columns >= 0)
+        result[on_surface, 1] = self.surface_ratings[ids[on_surface], columns[on_surface]]
+        return result
+
+    def table(self, surface=None):
+        """Every player's current rating and matches played (overall, or on `surface`), best first."""
+        if surface is None:
+            ratings, played = self.ratings, self.played
+        else:
+            ratings = self.surface_ratings[:, SURFACES.index(surface)]
+            played = self.surface_played[:, SURFACES.index(surface)]
+        table = pd.DataFrame({'player': self.players, 'elo': ratings, 'matches': played})
+        return table[table['matches'] > 0].sort_values('elo', ascending=False, ignore_index=True)
+
+    def save(self, path=ELO_PATH):
+        """Checkpoint the full state to a .npz (metadata as JSON, so loading never unpickles)."""
+        meta = {'k': self.k, 'offset': self.offset, 'shape': self.shape, 'initial': self.initial,
+                'last_date': self.last_date, 'matches_processed': self.matches_processed, 'surfaces': SURFACES}
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, players=np.array(self.players, dtype=str), ratings=self.ratings,
+                 surface_ratings=self.surface_ratings, played=self.played, surface_played=self.surface_played,
+                 applied=self.applied, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=ELO_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['surfaces'] != SURFACES:
+                raise ValueError(f"{path} was built for surfaces {meta['surfaces']}; rebuild it")
+            if 'applied' not in data:
+                raise ValueError(f"{path} doesn't record which matches it applied; rebuild it")
+            elo = cls(meta['k'], meta['offset'], meta['shape'], meta['initial'])
+            elo.players = data['players'].tolist()
+            elo.ratings, elo.surface_ratings = data['ratings'], data['surface_ratings']
+            elo.played, elo.surface_played = data['played'], data['surface_played']
+            elo.applied = data['applied']
+        elo.ids = {name: i for i, name in enumerate(elo.players)}
+        elo.last_date, elo.matches_processed = meta['last_date'], meta['matches_processed']
+        return elo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the Elo ratings from the match files.")
+    parser.add_argument('--checkpoint', default=ELO_PATH)
+    parser.add_argument('--rebuild', action='store_true', help="ignore the checkpoint and replay every match")
+    parser.add_argument('--surface', choices=SURFACES, help="show this surface's ratings")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        if os.path.exists(args.checkpoint) and not args.rebuild:
+            elo = EloRatings.load(args.checkpoint)
+            print(f"Loaded {args.checkpoint}: {elo.matches_processed} matches up to {elo.last_date}.")
+        else:
+            elo = EloRatings()
+        matches = load_matches(columns=ELO_COLUMNS, workers=args.workers)
+        before = elo.matches_processed
+        start = time.perf_counter()
+        elo.update(matches)
+        seconds = time.perf_counter() - start
+    except ValueError as error:
+        # A checkpoint that can't take these results in order (or from older code)
+        print(f"❌ {error} (run again with --rebuild).")
+        sys.exit(1)
+    elo.save(args.checkpoint)
+
+    new = elo.matches_processed - before
+    print(elo.table(args.surface).head(args.top).to_string(float_format=lambda r: f"{r:.0f}"))
+    print(f"\n✅ Applied {new} new matches in {seconds:.2f}s ({new / max(seconds, 1e-9):,.0f} matches/sec); "
+          f"saved {args.checkpoint}.")
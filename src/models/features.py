@@ -0,0 +1,239 @@
+import json
+import hashlib
+
+import numpy as np
+
+# The one definition of each model's input matrix, shared by training and
+# every serving path. Each schema lists its columns in model order and what
+# they are computed from; its hash is stored on the trained model
+# (feature_schema_) and checked when the model is loaded for serving.
+#
+# H2H model: player-1-minus-player-2 differences of four average stats, plus
+# surface flags (Carpet and Clay are both all-zero rows, as get_dummies with
+# drop_first=True used to produce).
+H2H_SCHEMA = {
+    'name': 'h2h',
+    'features': ['ace_diff', 'df_diff', 'serve_pts_diff', 'first_serve_in_diff', 'surface_Hard', 'surface_Grass'],
+    # (winner column, loser column, player_avg_stats column) behind each difference
+    'diffs': [('w_ace', 'l_ace', 'aces'), ('w_df', 'l_df', 'dfs'),
+              ('w_svpt', 'l_svpt', 'serve_pts'), ('w_1stIn', 'l_1stIn', 'first_in')],
+    'surfaces': ['Hard', 'Grass'],
+}
+
+# Real-match model: one player's own stats in one match. first_serve_percentage
+# is 100 * first serves in / serve points and ace_to_df_ratio is
+# aces / (double faults + 1); undefined ratios are 0.
+REAL_SCHEMA = {
+    'name': 'real',
+    'features': ['aces', 'double_faults', 'first_serve_percentage', 'ace_to_df_ratio', 'surface_Hard', 'surface_Grass'],
+    # (winner column, loser column) behind the raw stats
+    'stats': [('w_ace', 'l_ace'), ('w_df', 'l_df'), ('w_1stIn', 'l_1stIn'), ('w_svpt', 'l_svpt')],
+    'surfaces': ['Hard', 'Grass'],
+}
+
+# Opt-in variant (train_h2h.py --elo): the H2H features plus the players'
+# pre-match overall and surface Elo differences, from src/models/elo.py.
+H2H_ELO_SCHEMA = dict(
+    H2H_SCHEMA, name='h2h_elo', features=H2H_SCHEMA['features'] + ['elo_diff', 'surface_elo_diff'],
+    # (winner column, loser column) of the pre-match ratings behind each difference
+    ratings=[('winner_elo', 'loser_elo'), ('winner_surface_elo', 'loser_surface_elo')],
+)
+
+# Opt-in variant (train_h2h.py --as-of): the same columns, trained on the
+# players' career averages going into each match (src/models/rolling_stats.py)
+# instead of their stats in it, so training sees what serving sees and
+# nothing from the future. Served with h2h_matrix like the plain model.
+H2H_ASOF_SCHEMA = dict(
+    H2H_SCHEMA, name='h2h_asof',
+    diffs=[(f'winner_career_{stat}', f'loser_career_{stat}', stat) for _, _, stat in H2H_SCHEMA['diffs']],
+)
+
+# Opt-in variant (train_h2h.py --h2h-record): the H2H features plus the
+# players' head-to-head record, p1's wins over p2 minus p2's wins over p1,
+# before the match in training (src/models/h2h_index.py).
+H2H_RECORD_SCHEMA = dict(
+    H2H_SCHEMA, name='h2h_record', features=H2H_SCHEMA['features'] + ['h2h_diff'],
+    # (winner column, loser column) of the pre-match head-to-head wins behind the difference
+    records=[('winner_h2h_wins', 'loser_h2h_wins')],
+)
+
+H2H_FEATURES = H2H_SCHEMA['features']
+REAL_FEATURES = REAL_SCHEMA['features']
+
+
+def schema_hash(schema):
+    """Stable hash of a feature schema; changes whenever a column or its definition does."""
+    return hashlib.sha1(json.dumps(schema, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def attach_schema(model, schema):
+    """Record the feature schema and its hash on a trained model, so it travels inside the joblib artifact."""
+    model.feature_schema_ = dict(schema, hash=schema_hash(schema))
+    return model
+
+
+def check_schema(model, schema):
+    """
+    Raise ValueError if `model` was trained on a different feature schema
+    than the one this code builds. Models saved before schemas were
+    recorded are accepted as long as their column names agree.
+    """
+    recorded = getattr(model, 'feature_schema_', None)
+    if recorded is None:
+        names = getattr(model, 'feature_names_in_', None)
+        if names is not None and list(names) != schema['features']:
+            raise ValueError(f"Model was trained on features {list(names)}, expected {schema['features']}. "
+                             f"Retrain it with the current code.")
+        return
+    if recorded.get('hash') != schema_hash(schema):
+        raise ValueError(f"Model was trained with feature schema {recorded.get('hash', '?')[:12]} "
+                         f"({recorded.get('features')}), this code builds {schema_hash(schema)[:12]}. "
+                         f"Retrain it with the current code.")
+
+
+def h2h_variant(as_of=False, elo=False, record=False):
+    """The H2H schema for train_h2h.py's --as-of, --elo and --h2h-record options (any combination)."""
+    schema = H2H_ASOF_SCHEMA if as_of else H2H_SCHEMA
+    if elo:
+        schema = dict(schema, name=schema['name'] + '_elo', features=H2H_ELO_SCHEMA['features'],
+                      ratings=H2H_ELO_SCHEMA['ratings'])
+    if record:
+        schema = dict(schema, name=schema['name'] + '_record', features=schema['features'] + ['h2h_diff'],
+                      records=H2H_RECORD_SCHEMA['records'])
+    return schema
+
+
+def schema_columns(schema):
+    """The match columns a training set for `schema` is built from."""
+    columns = [column for winner, loser, _ in schema['diffs'] for column in (winner, loser)]
+    extra = schema.get('ratings', []) + schema.get('records', [])
+    return columns + [column for pair in extra for column in pair] + ['surface']
+
+
+def surface_flags(surfaces, out, schema):
+    """Write the schema's surface indicator columns for an array of surface names into `out`."""
+    surfaces = np.asarray(surfaces, dtype=object)
+    for j, name in enumerate(schema['surfaces']):
+        out[:, j] = surfaces == name
+
+
+def h2h_training_set(matches, schema=H2H_SCHEMA):
+    """
+    The mirrored H2H training set: row i is match i seen from the winner
+    (outcome 1), row n + i the same match from the loser (differences
+    negated, outcome 0). Written straight into one preallocated float32
+    (2n, features) array, so no copies of the match frame are made. Returns
+    (X, y); `matches` must have no missing stats (or ratings and records,
+    for a schema with them).
+    """
+    n = len(matches)
+    diffs = len(schema['diffs'])
+    flags = diffs + len(schema['surfaces'])
+    X = np.empty((2 * n, len(schema['features'])), dtype=np.float32)
+    pairs = [(j, winner, loser) for j, (winner, loser, _) in enumerate(schema['diffs'])]
+    extra = schema.get('ratings', []) + schema.get('records', [])
+    pairs += [(flags + j, winner, loser) for j, (winner, loser) in enumerate(extra)]
+    for j, winner, loser in pairs:
+        np.subtract(matches[winner].to_numpy(dtype=np.float32), matches[loser].to_numpy(dtype=np.float32),
+                    out=X[:n, j])
+        np.negative(X[:n, j], out=X[n:, j])
+    surface_flags(matches['surface'].to_numpy(dtype=object), X[:n, diffs:flags], schema)
+    X[n:, diffs:flags] = X[:n, diffs:flags]
+    y = np.zeros(2 * n, dtype=np.int8)
+    y[:n] = 1
+    return X, y
+
+
+def h2h_matrix(stats_index, p1_names, p2_names, surfaces):
+    """
+    H2H model input for arrays of (player 1, player 2, surface), one row per
+    fixture, from the players' average stats in a PlayerStatsIndex. KeyError
+    if any player has no stats on the fixture's surface.
+    """
+    p1_names, p2_names = np.asarray(p1_names, dtype=object), np.asarray(p2_names, dtype=object)
+    surfaces = np.asarray(surfaces, dtype=object)
+    p1_rows = stats_index.row_ids(p1_names, surfaces)
+    p2_rows = stats_index.row_ids(p2_names, surfaces)
+    missing = (p1_rows < 0) | (p2_rows < 0)
+    if missing.any():
+        i = int(np.flatnonzero(missing)[0])
+        raise KeyError((p1_names[i] if p1_rows[i] < 0 else p2_names[i], surfaces[i]))
+    return h2h_from_rows(stats_index, p1_rows, p2_rows, surfaces)
+
+
+def h2h_from_rows(stats_index, p1_rows, p2_rows, surfaces):
+    """H2H model input from PlayerStatsIndex row numbers (all valid) of both players."""
+    diffs = len(H2H_SCHEMA['diffs'])
+    X = np.empty((len(p1_rows), len(H2H_FEATURES)))
+    np.subtract(stats_index.values[p1_rows], stats_index.values[p2_rows], out=X[:, :diffs])
+    surface_flags(surfaces, X[:, diffs:], H2H_SCHEMA)
+    return X
+
+
+def h2h_features(stats_index, p1_name, p2_name, surface):
+    """
+    One (1, 6) row of H2H features for a single fixture; the same values as
+    h2h_matrix, without its array setup for a single interactive request.
+    """
+    diffs = len(H2H_SCHEMA['diffs'])
+    row = np.empty((1, len(H2H_FEATURES)))
+    np.subtract(stats_index.lookup(p1_name, surface), stats_index.lookup(p2_name, surface), out=row[0, :diffs])
+    for j, name in enumerate(H2H_SCHEMA['surfaces'], start=diffs):
+        row[0, j] = surface == name
+    return row
+
+
+def h2h_elo_matrix(stats_index, elo, p1_names, p2_names, surfaces):
+    """
+    H2H_ELO_SCHEMA input for arrays of fixtures: h2h_matrix plus the
+    players' current Elo differences from an EloRatings state.
+    """
+    X = np.empty((len(surfaces), len(H2H_ELO_SCHEMA['features'])))
+    X[:, :len(H2H_FEATURES)] = h2h_matrix(stats_index, p1_names, p2_names, surfaces)
+    np.subtract(elo.lookup(p1_names, surfaces), elo.lookup(p2_names, surfaces), out=X[:, len(H2H_FEATURES):])
+    return X
+
+
+def h2h_record_matrix(stats_index, h2h_index, p1_names, p2_names, surfaces):
+    """
+    H2H_RECORD_SCHEMA input for arrays of fixtures: h2h_matrix plus the
+    players' head-to-head difference (all surfaces) from an H2HIndex.
+    """
+    X = np.empty((len(surfaces), len(H2H_RECORD_SCHEMA['features'])))
+    X[:, :len(H2H_FEATURES)] = h2h_matrix(stats_index, p1_names, p2_names, surfaces)
+    records = h2h_index.records(p1_names, p2_names)
+    np.subtract(records[:, 0], records[:, 1], out=X[:, len(H2H_FEATURES)])
+    return X
+
+
+def real_matrix(aces, double_faults, first_serve_percentage, surfaces):
+    """Real-match model input for arrays of one player's match stats."""
+    aces = np.asarray(aces, dtype=np.float64)
+    double_faults = np.asarray(double_faults, dtype=np.float64)
+    X = np.empty((len(aces), len(REAL_FEATURES)))
+    X[:, 0] = aces
+    X[:, 1] = double_faults
+    X[:, 2] = first_serve_percentage
+    np.divide(aces, double_faults + 1, out=X[:, 3])
+    X[:, :4][~np.isfinite(X[:, :4])] = 0
+    surface_flags(surfaces, X[:, 4:], REAL_SCHEMA)
+    return X
+
+
+def real_training_set(matches):
+    """
+    The real-match training set: one row per player per match, winners
+    first (result 1) then losers (result 0), computed straight from the
+    match columns. Returns (X, y).
+    """
+    stats = {}
+    for name, (winner, loser) in zip(('aces', 'dfs', 'first_in', 'serve_pts'), REAL_SCHEMA['stats']):
+        stats[name] = np.concatenate([matches[winner].to_numpy(dtype=np.float64),
+                                      matches[loser].to_numpy(dtype=np.float64)])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first_serve_percentage = stats['first_in'] / stats['serve_pts'] * 100
+    surfaces = matches['surface'].to_numpy(dtype=object)
+    X = real_matrix(stats['aces'], stats['dfs'], first_serve_percentage, np.concatenate([surfaces, surfaces]))
+    y = np.zeros(len(X), dtype=np.int8)
+    y[:len(matches)] = 1
+    return X.astype(np.float32), y
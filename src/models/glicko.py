@@ -0,0 +1,311 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Get the project root directory (two levels up from this script)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, project_root)
+from src.utils.dates import day_numbers
+from src.utils.match_loader import load_matches
+from src.models.elo import key_hashes, unapplied
+
+GLICKO_PATH = os.path.join(project_root, 'glicko_ratings.npz')
+GLICKO_COLUMNS = ['tourney_id', 'tourney_date', 'match_num', 'winner_name', 'loser_name']
+# Pre-period rating and deviation of both players, see Glicko2.update
+RATING_COLUMNS = ['winner_glicko', 'winner_rd', 'loser_glicko', 'loser_rd']
+SCALE = 173.7178            # Glicko-2 works on (rating - 1500) / SCALE
+EPSILON = 1e-6              # convergence of the volatility iteration
+
+
+def rating_period(dates):
+    """
+    Weekly rating period of YYYYMMDD dates: weeks since Monday 1900-01-01,
+    so every real match (from 1968 on) gets a positive period and missing
+    dates (day_numbers' 1900-01-01) get period 0.
+    """
+    return (day_numbers(dates).astype(np.int64) + 25567) // 7
+
+
+def _g(phi):
+    return 1.0 / np.sqrt(1.0 + 3.0 * phi ** 2 / np.pi ** 2)
+
+
+def new_volatility(phi, sigma, v, delta, tau):
+    """
+    Step 5 of Glickman's Glicko-2: solve for each player's new volatility
+    with the Illinois method, run on all players of the period at once
+    (each element stops moving once it has converged).
+    """
+    a = np.log(sigma ** 2)
+    phi2 = phi ** 2
+
+    def f(x):
+        ex = np.exp(x)
+        return ex * (delta ** 2 - phi2 - v - ex) / (2.0 * (phi2 + v + ex) ** 2) - (x - a) / tau ** 2
+
+    A = a.copy()
+    big = delta ** 2 > phi2 + v
+    B = np.where(big, np.log(np.where(big, delta ** 2 - phi2 - v, 1.0)), a - tau)
+    k = np.ones_like(a)
+    todo = ~big & (f(a - k * tau) < 0)
+    while todo.any():
+        k[todo] += 1
+        todo &= f(a - k * tau) < 0
+    B = np.where(big, B, a - k * tau)
+    fA, fB = f(A), f(B)
+    active = np.abs(B - A) > EPSILON
+    while active.any():
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        flip = active & (fC * fB <= 0)
+        halve = active & ~flip
+        A = np.where(flip, B, A)
+        fA = np.where(flip, fB, np.where(halve, fA / 2.0, fA))
+        B = np.where(active, C, B)
+        fB = np.where(active, fC, fB)
+        active &= np.abs(B - A) > EPSILON
+    return np.exp(A / 2.0)
+
+
+def period_update(mu, phi, sigma, player, opponent, score, tau):
+    """
+    One Glicko-2 rating period for every player who played in it. `mu`,
+    `phi` and `sigma` are the pre-period values (Glicko-2 scale) indexed by
+    player id; `player`, `opponent` and `score` list each game from each
+    side. Returns (ids, new mu, new phi, new sigma) for the players who
+    played; sums over their games are np.bincount, so there is no
+    per-player loop.
+    """
+    ids, slot = np.unique(player, return_inverse=True)
+    g = _g(phi[opponent])
+    expected = 1.0 / (1.0 + np.exp(-g * (mu[player] - mu[opponent])))
+    v = 1.0 / np.bincount(slot, weights=g ** 2 * expected * (1.0 - expected), minlength=len(ids))
+    improvement = np.bincount(slot, weights=g * (score - expected), minlength=len(ids))
+    new_sigma = new_volatility(phi[ids], sigma[ids], v, v * improvement, tau)
+    phi_star = np.sqrt(phi[ids] ** 2 + new_sigma ** 2)
+    new_phi = 1.0 / np.sqrt(1.0 / phi_star ** 2 + 1.0 / v)
+    return ids, mu[ids] + new_phi ** 2 * improvement, new_phi, new_sigma
+
+
+class Glicko2:
+    """
+    Glicko-2 ratings with weekly rating periods keyed on tourney_date.
+
+    Each period updates all of its players together with array operations
+    (period_update). A player who sits out periods isn't touched: their
+    deviation is widened by the idle periods when they next play or are
+    looked up, which is what updating them every week would give.
+
+    Every player's rating, deviation and volatility after each period they
+    played is kept as history (float32, sorted by player and period), so
+    as_of() answers "what was the rating before this date" with one binary
+    search per query. The hashes of the applied matches' keys are kept too
+    (see elo.key_hashes); update() applies only periods after the last one
+    seen, and raises ValueError on results it never applied that belong to
+    an already processed week: those need a rebuild.
+    """
+
+    def __init__(self, tau=0.5, initial=1500.0, rd=350.0, volatility=0.06, max_rd=350.0):
+        self.tau, self.initial, self.rd, self.volatility, self.max_rd = tau, initial, rd, volatility, max_rd
+        self.players = []
+        self.ids = {}
+        self.mu = np.empty(0)
+        self.phi = np.empty(0)
+        self.sigma = np.empty(0)
+        self.last_played = np.empty(0, dtype=np.int64)
+        self.last_period = -1
+        self.matches_processed = 0
+        self.applied = np.empty(0, dtype=np.uint64)
+        self._history = []
+        self._index = None
+
+    def __len__(self):
+        return len(self.players)
+
+    def _intern(self, names):
+        codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+        for name in uniques:
+            if name not in self.ids:
+                self.ids[name] = len(self.players)
+                self.players.append(name)
+        grow = len(self.players) - len(self.mu)
+        if grow:
+            self.mu = np.concatenate([self.mu, np.zeros(grow)])
+            self.phi = np.concatenate([self.phi, np.full(grow, self.rd / SCALE)])
+            self.sigma = np.concatenate([self.sigma, np.full(grow, self.volatility)])
+            self.last_played = np.concatenate([self.last_played, np.full(grow, -1, dtype=np.int64)])
+        return np.fromiter((self.ids[name] for name in uniques), dtype=np.int64, count=len(uniques))[codes]
+
+    def _idle_phi(self, phi, sigma, idle):
+        """Deviation after `idle` periods without a match (each adds sigma^2 to phi^2), capped at max_rd."""
+        return np.minimum(np.sqrt(phi ** 2 + np.maximum(idle, 0) * sigma ** 2), self.max_rd / SCALE)
+
+    def update(self, matches):
+        """
+        Apply the results in `matches` (GLICKO_COLUMNS, any order), one
+        rating period per week, and return the players' pre-period rating
+        and deviation for each match as a DataFrame with RATING_COLUMNS on
+        the same index. Matches already applied, or with a missing player or
+        date, are skipped and get NaN. Raises ValueError, before applying
+        anything, if `matches` has results this state never applied in a
+        period it has already processed.
+        """
+        pre = pd.DataFrame(np.nan, index=matches.index, columns=RATING_COLUMNS)
+        periods = rating_period(matches['tourney_date'])
+        hashes = key_hashes(matches)
+        new = unapplied(hashes, self.applied) & (periods > 0)
+        new &= matches['winner_name'].notna().to_numpy() & matches['loser_name'].notna().to_numpy()
+        late = np.count_nonzero(new & (periods <= self.last_period))
+        if late:
+            raise ValueError(f"{late} matches fall in rating periods these ratings already processed but were "
+                             f"never applied; rebuild the ratings from scratch")
+        positions = np.flatnonzero(new)
+        if len(positions) == 0:
+            return pre
+        positions = positions[np.argsort(periods[positions], kind='stable')]
+        periods = periods[positions]
+        batch = matches.iloc[positions]
+        players = self._intern(np.concatenate([batch['winner_name'].to_numpy(dtype=object),
+                                               batch['loser_name'].to_numpy(dtype=object)]))
+        winners, losers = players[:len(batch)], players[len(batch):]
+
+        out = np.empty((len(batch), len(RATING_COLUMNS)))
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], len(batch)]):
+            period = periods[start]
+            w, l = winners[start:end], losers[start:end]
+            played = np.unique(np.concatenate([w, l]))
+            # Catch the deviation up on the weeks these players sat out
+            idle = np.where(self.last_played[played] < 0, 0, period - self.last_played[played] - 1)
+            self.phi[played] = self._idle_phi(self.phi[played], self.sigma[played], idle)
+            out[start:end, 0], out[start:end, 1] = self.mu[w], self.phi[w]
+            out[start:end, 2], out[start:end, 3] = self.mu[l], self.phi[l]
+
+            ids, mu, phi, sigma = period_update(self.mu, self.phi, self.sigma, np.concatenate([w, l]),
+                                                np.concatenate([l, w]), np.r_[np.ones(len(w)), np.zeros(len(l))],
+                                                self.tau)
+            self.mu[ids], self.phi[ids], self.sigma[ids] = mu, phi, sigma
+            self.last_played[ids] = period
+            self._history.append((ids.astype(np.int32), np.full(len(ids), period, dtype=np.int32),
+                                  mu.astype(np.float32), phi.astype(np.float32), sigma.astype(np.float32)))
+
+        out[:, [0, 2]] = out[:, [0, 2]] * SCALE + self.initial
+        out[:, [1, 3]] *= SCALE
+        pre.iloc[positions] = out
+        self.last_period = int(periods[-1])
+        self.matches_processed += len(batch)
+        self.applied = np.union1d(self.applied, hashes[positions])
+        self._index = None
+        return pre
+
+    def history(self):
+        """(player, period, mu, phi, sigma) arrays of every update, sorted by player then period."""
+        if self._index is None:
+            if self._history:
+                columns = [np.concatenate(column) for column in zip(*self._history)]
+                order = np.lexsort((columns[1], columns[0]))
+                columns = [column[order] for column in columns]
+            else:
+                columns = [np.empty(0, dtype=np.int32)] * 2 + [np.empty(0, dtype=np.float32)] * 3
+            self._history = [tuple(columns)]
+            self._index = tuple(columns)
+        return self._index
+
+    def as_of(self, names, dates):
+        """
+        Rating and deviation of each player going into `dates` (YYYYMMDD):
+        after the last rating period before that date's week, with the
+        deviation widened for the idle weeks since. An (n, 2) array;
+        players unrated by then get the initial rating and deviation.
+        """
+        player, period, mu, phi, sigma = self.history()
+        ids = np.fromiter((self.ids.get(name, -1) for name in names), dtype=np.int64, count=len(names))
+        when = rating_period(dates)
+        keys = player.astype(np.int64) << 32 | period.astype(np.int64)
+        found = np.searchsorted(keys, ids << 32 | when, side='left') - 1
+        known = (ids >= 0) & (found >= 0)
+        known[known] = player[found[known]] == ids[known]
+        result = np.empty((len(ids), 2))
+        result[:, 0], result[:, 1] = self.initial, self.rd
+        at = found[known]
+        idle = when[known] - period[at] - 1
+        result[known, 0] = mu[at] * SCALE + self.initial
+        result[known, 1] = self._idle_phi(phi[at].astype(np.float64), sigma[at].astype(np.float64), idle) * SCALE
+        return result
+
+    def table(self, date=None):
+        """Every rated player's rating and deviation now (or going into `date`), best rated first."""
+        ids = np.flatnonzero(self.last_played >= 0)
+        names = [self.players[i] for i in ids]
+        if date is None:
+            idle = self.last_period - self.last_played[ids]
+            values = np.column_stack([self.mu[ids] * SCALE + self.initial,
+                                      self._idle_phi(self.phi[ids], self.sigma[ids], idle) * SCALE])
+        else:
+            values = self.as_of(names, np.full(len(names), date))
+        table = pd.DataFrame({'player': names, 'glicko': values[:, 0], 'rd': values[:, 1]})
+        return table.sort_values('glicko', ascending=False, ignore_index=True)
+
+    def save(self, path=GLICKO_PATH):
+        """Checkpoint the state and history to a .npz (metadata as JSON, so loading never unpickles)."""
+        player, period, mu, phi, sigma = self.history()
+        meta = {'tau': self.tau, 'initial': self.initial, 'rd': self.rd, 'volatility': self.volatility,
+                'max_rd': self.max_rd, 'last_period': self.last_period, 'matches_processed': self.matches_processed}
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, players=np.array(self.players, dtype=str), mu=self.mu, phi=self.phi, sigma=self.sigma,
+                 last_played=self.last_played, history_player=player, history_period=period, history_mu=mu,
+                 history_phi=phi, history_sigma=sigma, applied=self.applied, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=GLICKO_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if 'applied' not in data:
+                raise ValueError(f"{path} doesn't record which matches it applied; rebuild it")
+            glicko = cls(meta['tau'], meta['initial'], meta['rd'], meta['volatility'], meta['max_rd'])
+            glicko.players = data['players'].tolist()
+            glicko.mu, glicko.phi, glicko.sigma = data['mu'], data['phi'], data['sigma']
+            glicko.last_played, glicko.applied = data['last_played'], data['applied']
+            glicko._history = [tuple(data[f'history_{name}'] for name in ('player', 'period', 'mu', 'phi', 'sigma'))]
+        glicko.ids = {name: i for i, name in enumerate(glicko.players)}
+        glicko.last_period, glicko.matches_processed = meta['last_period'], meta['matches_processed']
+        return glicko
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the Glicko-2 ratings from the match files.")
+    parser.add_argument('--checkpoint', default=GLICKO_PATH)
+    parser.add_argument('--rebuild', action='store_true', help="ignore the checkpoint and replay every week")
+    parser.add_argument('--as-of', type=int, help="show the ratings going into this YYYYMMDD date")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        if os.path.exists(args.checkpoint) and not args.rebuild:
+            glicko = Glicko2.load(args.checkpoint)
+            print(f"Loaded {args.checkpoint}: {glicko.matches_processed} matches.")
+        else:
+            glicko = Glicko2()
+        matches = load_matches(columns=GLICKO_COLUMNS, workers=args.workers)
+        before = glicko.matches_processed
+        start = time.perf_counter()
+        glicko.update(matches)
+        seconds = time.perf_counter() - start
+    except ValueError as error:
+        # A checkpoint that can't take these results in order (or from older code)
+        print(f"❌ {error} (run again with --rebuild).")
+        sys.exit(1)
+    glicko.save(args.checkpoint)
+
+    new = glicko.matches_processed - before
+    print(glicko.table(args.as_of).head(args.top).to_string(float_format=lambda r: f"{r:.0f}"))
+    print(f"\n✅ Applied {new} new matches in {seconds:.2f}s ({new / max(seconds, 1e-9):,.0f} matches/sec); "
+          f"saved {args.checkpoint}.")
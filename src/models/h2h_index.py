@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Get the project root directory (two levels up from this script)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, project_root)
+from src.utils.match_loader import load_matches
+from src.models.elo import SURFACES, chronological
+
+H2H_PATH = os.path.join(project_root, 'h2h_index.npz')
+H2H_COLUMNS = ['surface', 'winner_name', 'loser_name']
+# Head-to-head wins of each player over the other before the match, see pre_match_h2h
+RECORD_COLUMNS = ['winner_h2h_wins', 'loser_h2h_wins']
+
+
+def pre_match_h2h(matches):
+    """
+    How many times each match's winner had beaten the loser, and the loser
+    the winner, before it (all surfaces), from ELO_COLUMNS in any order.
+
+    Each match gets a key (winner id, loser id, position in order of play);
+    with the keys sorted once, a player's earlier wins over the opponent are
+    the keys between (winner, loser, 0) and this match, two searchsorted
+    calls for all matches at once. Returns a DataFrame with RECORD_COLUMNS
+    on the index of `matches`; matches with a missing player get NaN.
+    """
+    n = len(matches)
+    play_order = np.empty(n, dtype=np.int64)
+    play_order[chronological(matches)] = np.arange(n)
+    codes, players = pd.factorize(np.concatenate([matches['winner_name'].to_numpy(dtype=object),
+                                                  matches['loser_name'].to_numpy(dtype=object)]))
+    winners, losers = codes[:n].astype(np.int64), codes[n:].astype(np.int64)
+    known = (winners >= 0) & (losers >= 0)
+    p = max(len(players), 1)
+    ordered = np.sort(((winners * p + losers) * n + play_order)[known])
+
+    records = np.full((n, len(RECORD_COLUMNS)), np.nan)
+    for column, (player, opponent) in enumerate([(winners, losers), (losers, winners)]):
+        start = (player * p + opponent) * n
+        wins = np.searchsorted(ordered, start + play_order) - np.searchsorted(ordered, start)
+        records[known, column] = wins[known]
+    return pd.DataFrame(records, index=matches.index, columns=RECORD_COLUMNS)
+
+
+class H2HIndex:
+    """
+    Every player's head-to-head record against every opponent, as a sparse
+    player x player matrix in CSR layout (NumPy only).
+
+    Players are numbered in name order. Row a holds a's opponents, sorted,
+    in opponents[indptr[a]:indptr[a + 1]], and the matching rows of
+    `counts` hold (wins, losses) x (all surfaces, then each of SURFACES).
+    Every pair is stored in both players' rows, so any query reads one row:
+    a record is a searchsorted inside a row, a player's opponents are the
+    row itself, and batches of pairs use one searchsorted on the global
+    row * players + opponent keys (sorted, since the rows are).
+
+    Built in one vectorized pass: np.unique over the directed pair keys of
+    all matches, then np.bincount of the results per pair and surface.
+    """
+
+    def __init__(self, players, indptr, opponents, counts, matches=0):
+        self.players = list(players)
+        self.ids = {name: i for i, name in enumerate(self.players)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.opponents = np.asarray(opponents, dtype=np.int32)
+        self.counts = np.asarray(counts, dtype=np.int32)
+        self.matches = matches
+        rows = np.repeat(np.arange(len(self.players), dtype=np.int64), np.diff(self.indptr))
+        self.keys = rows * len(self.players) + self.opponents
+
+    def __len__(self):
+        return len(self.players)
+
+    @classmethod
+    def from_matches(cls, matches):
+        """Build the index from H2H_COLUMNS (matches with a missing player are left out)."""
+        known = (matches['winner_name'].notna() & matches['loser_name'].notna()).to_numpy()
+        n = int(known.sum())
+        codes, players = pd.factorize(np.concatenate([matches['winner_name'].to_numpy(dtype=object)[known],
+                                                      matches['loser_name'].to_numpy(dtype=object)[known]]),
+                                      sort=True)
+        p = len(players)
+        winners, losers = codes[:n].astype(np.int64), codes[n:].astype(np.int64)
+        surface_codes = {name: i for i, name in enumerate(SURFACES, start=1)}
+        surfaces = matches['surface'].astype(object).map(surface_codes).fillna(0).to_numpy(dtype=np.int64)[known]
+
+        # Each match once from the winner's row (a win) and once from the loser's (a loss)
+        pairs, inverse = np.unique(np.concatenate([winners * p + losers, losers * p + winners]),
+                                   return_inverse=True)
+        width = len(SURFACES) + 1
+        cells = (inverse * 2 + np.repeat([0, 1], n)) * width
+        surfaces = np.tile(surfaces, 2)
+        on_surface = surfaces > 0
+        counts = np.bincount(cells, minlength=len(pairs) * 2 * width)
+        counts += np.bincount(cells[on_surface] + surfaces[on_surface], minlength=len(pairs) * 2 * width)
+
+        indptr = np.zeros(p + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs // max(p, 1), minlength=p), out=indptr[1:])
+        return cls(players, indptr, pairs % max(p, 1), counts.reshape(len(pairs), 2, width), n)
+
+    def _column(self, surface):
+        return 0 if surface is None else SURFACES.index(surface) + 1
+
+    def record(self, player, opponent, surface=None):
+        """(wins, losses) of `player` against `opponent`, overall or on `surface`; (0, 0) if they never met."""
+        a, b = self.ids.get(player), self.ids.get(opponent)
+        if a is None or b is None:
+            return 0, 0
+        lo, hi = self.indptr[a:a + 2].tolist()
+        k = lo + int(self.opponents[lo:hi].searchsorted(b))
+        if k == hi or self.opponents[k] != b:
+            return 0, 0
+        wins, losses = self.counts[k, :, self._column(surface)].tolist()
+        return wins, losses
+
+    def _ids(self, names):
+        return np.fromiter((self.ids.get(name, -1) for name in names), dtype=np.int64, count=len(names))
+
+    def _records(self, a, b, surface):
+        """(n, 2) wins and losses of player ids `a` against ids `b` (-1 for unknown players)."""
+        result = np.zeros((len(a), 2), dtype=np.int64)
+        if len(self.keys) == 0:
+            return result
+        keys = a * len(self.players) + b
+        k = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = (a >= 0) & (b >= 0) & (self.keys[k] == keys)
+        result[found] = self.counts[k[found], :, self._column(surface)]
+        return result
+
+    def records(self, players, opponents, surface=None):
+        """
+        Head-to-head records for arrays of (player, opponent) pairs as an
+        (n, 2) int array of wins and losses; pairs that never met get zeros.
+        """
+        return self._records(self._ids(players), self._ids(opponents), surface)
+
+    def opponents_of(self, player, surface=None):
+        """Every opponent of `player` (overall or on `surface`) as (name, wins, losses), in name order."""
+        a = self.ids.get(player)
+        if a is None:
+            return []
+        lo, hi = self.indptr[a], self.indptr[a + 1]
+        record = self.counts[lo:hi, :, self._column(surface)]
+        met = np.flatnonzero(record.sum(axis=1) > 0)
+        players = self.players
+        return [(players[b], wins, losses)
+                for b, (wins, losses) in zip(self.opponents[lo:hi][met].tolist(), record[met].tolist())]
+
+    def never_met(self, players, surface=None):
+        """
+        Pairs of `players` (e.g. the current top N) that have never played
+        each other, overall or on `surface`, as (player, opponent) in the
+        order given. Players the index has never seen meet nobody.
+        """
+        players = list(players)
+        ids = self._ids(players)
+        first, second = np.triu_indices(len(players), k=1)
+        met = self._records(ids[first], ids[second], surface).sum(axis=1) > 0
+        return [(players[i], players[j]) for i, j in zip(first[~met].tolist(), second[~met].tolist())]
+
+    def save(self, path=H2H_PATH):
+        """Write the index to a .npz (metadata as JSON, so loading never unpickles)."""
+        meta = {'surfaces': SURFACES, 'matches': self.matches}
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, players=np.array(self.players, dtype=str), indptr=self.indptr,
+                 opponents=self.opponents, counts=self.counts, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=H2H_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['surfaces'] != SURFACES:
+                raise ValueError(f"{path} was built for surfaces {meta['surfaces']}; rebuild it")
+            return cls(data['players'].tolist(), data['indptr'], data['opponents'], data['counts'],
+                       meta['matches'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the head-to-head index from the match files.")
+    parser.add_argument('--output', default=H2H_PATH)
+    parser.add_argument('--player', help="show this player's record against every opponent")
+    parser.add_argument('--versus', nargs=2, metavar=('PLAYER', 'OPPONENT'), help="show one head-to-head")
+    parser.add_argument('--never-met', type=int, metavar='N',
+                        help="list the pairs among the N players with the most matches that never met")
+    parser.add_argument('--surface', choices=SURFACES, help="only count matches on this surface")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    matches = load_matches(columns=H2H_COLUMNS, workers=args.workers)
+    start = time.perf_counter()
+    index = H2HIndex.from_matches(matches)
+    seconds = time.perf_counter() - start
+    index.save(args.output)
+    print(f"✅ Indexed {index.matches} matches in {seconds:.2f}s: {len(index)} players, "
+          f"{len(index.opponents) // 2} pairs; saved {args.output}.")
+
+    if args.versus:
+        wins, losses = index.record(*args.versus, surface=args.surface)
+        print(f"{args.versus[0]} vs {args.versus[1]}: {wins}-{losses}")
+    if args.player:
+        for opponent, wins, losses in sorted(index.opponents_of(args.player, args.surface),
+                                             key=lambda row: (-row[1] - row[2], row[0])):
+            print(f"  {opponent:<30} {wins:>3}-{losses:<3}")
+    if args.never_met:
+        played = index.counts[:, :, index._column(args.surface)].sum(axis=1)
+        per_player = np.bincount(np.repeat(np.arange(len(index)), np.diff(index.indptr)), weights=played,
+                                 minlength=len(index))
+        top = [index.players[i] for i in np.argsort(-per_player, kind='stable')[:args.never_met]]
+        for player, opponent in index.never_met(top, args.surface):
+            print(f"  {player} - {opponent}")
@@ -0,0 +1,132 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.utils.digest import file_digest
+from src.utils.match_cache import CACHE_DIR, DATA_DIR, read_csv_cached, source_digest
+from src.utils.match_loader import DEFAULT_WORKERS, match_files
+from src.utils.match_schema import MATCH_SCHEMA
+
+# Per-player serve stats kept in player_avg_stats.csv, and the winner/loser
+# columns they come from
+STATS = {
+    'aces': ('w_ace', 'l_ace'),
+    'dfs': ('w_df', 'l_df'),
+    'first_in': ('w_1stIn', 'l_1stIn'),
+    'serve_pts': ('w_svpt', 'l_svpt'),
+}
+STAT_COLUMNS = ['surface', 'winner_name', 'loser_name', 'w_ace', 'l_ace',
+                'w_df', 'l_df', 'w_1stIn', 'l_1stIn', 'w_svpt', 'l_svpt']
+KEYS = ['player', 'surface']
+
+
+def season_contribution(args):
+    """
+    Per (player, surface) sums of each stat plus a match count for one season
+    file. Sums are integers, so adding and later subtracting a season's
+    contribution is exact.
+    """
+    filename, cache_dir = args
+    df = read_csv_cached(filename, cache_dir, columns=STAT_COLUMNS, dtypes=MATCH_SCHEMA).dropna()
+    sides = []
+    for side, index in (('winner', 0), ('loser', 1)):
+        frame = pd.DataFrame({'player': df[f'{side}_name'].astype(object), 'surface': df['surface'].astype(object)})
+        for stat, columns in STATS.items():
+            frame[stat] = df[columns[index]].astype('int64')
+        sides.append(frame)
+    both = pd.concat(sides, ignore_index=True)
+    both['matches'] = 1
+    return both.groupby(KEYS).sum()
+
+
+def _read_frame(path):
+    return pd.read_csv(path, index_col=KEYS, keep_default_na=False)
+
+
+def averages(totals):
+    """Turn running sums into the per-player, per-surface means of player_avg_stats.csv."""
+    means = totals[list(STATS)].div(totals['matches'], axis=0)
+    return means.reset_index()
+
+
+def update_player_stats(data_dir=DATA_DIR, cache_dir=CACHE_DIR, workers=None):
+    """
+    Incrementally maintain per-player, per-surface stat sums and counts.
+
+    A manifest records the content hash of every season file that has been
+    ingested. Only new or modified seasons are re-read: their old
+    contribution is subtracted from the running totals and the new one added,
+    and removed seasons are subtracted. A daily update therefore costs one
+    season, not the whole history. Returns the player averages.
+    """
+    agg_dir = os.path.join(cache_dir, 'aggregates')
+    os.makedirs(agg_dir, exist_ok=True)
+    manifest_path = os.path.join(agg_dir, 'manifest.json')
+    totals_path = os.path.join(agg_dir, 'totals.csv')
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {'files': {}, 'totals': None}
+
+    def contribution_path(name, digest):
+        return os.path.join(agg_dir, f"{os.path.splitext(name)[0]}-{digest[:16]}.csv")
+
+    all_files = match_files(data_dir)
+    if not all_files:
+        raise FileNotFoundError(f"No match files found in {data_dir}")
+    current = {os.path.basename(f): source_digest(f, cache_dir) for f in all_files}
+    previous = manifest['files']
+    changed = [f for f in all_files
+               if previous.get(os.path.basename(f)) != current[os.path.basename(f)]
+               or not os.path.exists(contribution_path(os.path.basename(f), current[os.path.basename(f)]))]
+    removed = [name for name in previous if name not in current]
+
+    # Re-ingest the changed seasons in parallel
+    jobs = [(f, cache_dir) for f in changed]
+    workers = min(workers or DEFAULT_WORKERS, len(jobs)) or 1
+    if workers == 1:
+        contributions = [season_contribution(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            contributions = list(pool.map(season_contribution, jobs))
+    for filename, contribution in zip(changed, contributions):
+        name = os.path.basename(filename)
+        contribution.to_csv(contribution_path(name, current[name]))
+
+    totals = None
+    if manifest['totals'] and os.path.exists(totals_path) and file_digest(totals_path) == manifest['totals']:
+        totals = _read_frame(totals_path)
+        # Swap the stale contributions for the fresh ones
+        for name in [os.path.basename(f) for f in changed] + removed:
+            old_path = contribution_path(name, previous[name]) if name in previous else None
+            if old_path and os.path.exists(old_path):
+                totals = totals.sub(_read_frame(old_path), fill_value=0)
+            elif name in previous:
+                totals = None  # can't undo a contribution we no longer have
+                break
+        if totals is not None:
+            for contribution in contributions:
+                totals = totals.add(contribution, fill_value=0)
+    if totals is None:
+        # First run, or the running totals can't be trusted: sum every season
+        totals = pd.concat([_read_frame(contribution_path(name, digest)) for name, digest in current.items()])
+        totals = totals.groupby(level=KEYS).sum()
+
+    totals = totals[totals['matches'] > 0].astype('int64').sort_index()
+    totals.to_csv(totals_path)
+    for name in removed + [os.path.basename(f) for f in changed]:
+        if name in previous and previous[name] != current.get(name):
+            stale = contribution_path(name, previous[name])
+            if os.path.exists(stale):
+                os.remove(stale)
+    manifest = {'files': current, 'totals': file_digest(totals_path)}
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    print(f"✅ Re-ingested {len(changed)} of {len(all_files)} season files"
+          f"{f', dropped {len(removed)}' if removed else ''}.")
+    return averages(totals)
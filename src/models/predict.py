@@ -0,0 +1,161 @@
+import os
+import sys
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Get the project root directory (two levels up from this script)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, project_root)
+from src.models.compiled_tree import load_model, model_version
+from src.models.features import H2H_FEATURES, H2H_SCHEMA, check_schema, h2h_from_rows, surface_flags
+from src.models.stats_index import PlayerStatsIndex
+
+MODEL_PATH = os.path.join(project_root, 'h2h_model.joblib')
+STATS_PATH = os.path.join(project_root, 'player_avg_stats.csv')
+FIXTURE_COLUMNS = ['player1', 'player2', 'surface']
+CHUNK_SIZE = 10000
+MATRIX_CACHE_DIR = os.path.join(project_root, 'data', 'cache', 'matrices')
+
+
+def load_h2h(model_path=MODEL_PATH, stats_path=STATS_PATH):
+    """
+    Load the H2H model (its compiled .npz form when there is one) and index
+    the player stats; ValueError if the model's features don't match.
+    """
+    model = load_model(model_path)
+    check_schema(model, H2H_SCHEMA)
+    return model, PlayerStatsIndex.load(stats_path)
+
+
+def win_probability(model, X):
+    """P(player 1 wins) for each row of an H2H feature matrix, in one predict_proba call."""
+    if len(X) == 0:
+        return np.empty(0)
+    column = list(model.classes_).index(1)
+    return model.predict_proba(X)[:, column]
+
+
+def predict_fixtures(model, stats_index, fixtures):
+    """
+    Predict many fixtures at once. `fixtures` is a DataFrame with player1,
+    player2 and surface columns, or a list of (player1, player2, surface)
+    tuples. Features are built for all rows together and scored in a single
+    predict_proba call.
+
+    Returns a DataFrame with the fixture columns plus p1_win_prob, winner and
+    win_prob. Fixtures where a player has no stats on that surface get NaN
+    probabilities and the reason in `error`, instead of failing the batch.
+    """
+    if not isinstance(fixtures, pd.DataFrame):
+        fixtures = pd.DataFrame(list(fixtures), columns=FIXTURE_COLUMNS)
+    result = fixtures[FIXTURE_COLUMNS].reset_index(drop=True)
+    p1 = result['player1'].to_numpy(dtype=object)
+    p2 = result['player2'].to_numpy(dtype=object)
+    surfaces = result['surface'].to_numpy(dtype=object)
+    p1_rows = stats_index.row_ids(p1, surfaces)
+    p2_rows = stats_index.row_ids(p2, surfaces)
+    known = (p1_rows >= 0) & (p2_rows >= 0)
+
+    probability = np.full(len(result), np.nan)
+    X = h2h_from_rows(stats_index, p1_rows[known], p2_rows[known], surfaces[known])
+    probability[known] = win_probability(model, X)
+
+    result['p1_win_prob'] = probability
+    p1_favoured = probability > 0.5
+    result['winner'] = np.where(known, np.where(p1_favoured, p1, p2), None)
+    result['win_prob'] = np.where(p1_favoured, probability, 1 - probability)
+    error = np.full(len(result), None, dtype=object)
+    for i in np.flatnonzero(~known):
+        unknown = [name for name, row in ((p1[i], p1_rows[i]), (p2[i], p2_rows[i])) if row < 0]
+        error[i] = f"no {surfaces[i]} stats for {' and '.join(map(str, unknown))}"
+    result['error'] = error
+    return result
+
+
+def _matrix_path(cache_dir, model, stats_index, players, surface):
+    key = hashlib.sha1('\n'.join(map(str, players)).encode('utf-8')).hexdigest()
+    name = f"{surface}-{len(players)}-{key[:12]}-m{model_version(model)[:12]}-s{stats_index.version[:12]}.npy"
+    return os.path.join(cache_dir, name)
+
+
+def probability_matrix(model, stats_index, players, surface, cache_dir=MATRIX_CACHE_DIR):
+    """
+    P(players[i] beats players[j]) on `surface` for every ordered pair, as an
+    N x N float64 array. The H2H features are differences of per-player
+    averages, so the N^2 feature rows are one broadcast subtraction and the
+    model scores them in a single predict_proba call. The diagonal is 0.5.
+
+    With a `cache_dir` the matrix is saved there as .npy, keyed by the
+    player list, surface, model version and stats version, and later calls
+    return it memory-mapped (read-only) instead of recomputing. KeyError
+    lists the players without stats on `surface`.
+    """
+    players = list(players)
+    path = None
+    if cache_dir is not None:
+        path = _matrix_path(cache_dir, model, stats_index, players, surface)
+        if os.path.exists(path):
+            return np.load(path, mmap_mode='r')
+
+    rows = stats_index.row_ids(players, [surface] * len(players))
+    if (rows < 0).any():
+        raise KeyError([player for player, row in zip(players, rows) if row < 0])
+    n = len(players)
+    stats = stats_index.values[rows]
+    diffs = stats.shape[1]
+    X = np.empty((n, n, len(H2H_FEATURES)))
+    np.subtract(stats[:, None, :], stats[None, :, :], out=X[:, :, :diffs])
+    flags = np.empty((1, len(H2H_FEATURES) - diffs))
+    surface_flags([surface], flags, H2H_SCHEMA)
+    X[:, :, diffs:] = flags[0]
+    matrix = win_probability(model, X.reshape(n * n, -1)).reshape(n, n)
+    np.fill_diagonal(matrix, 0.5)
+
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, matrix)
+        os.replace(tmp_path, path)
+    return matrix
+
+
+def predict_csv(fixtures_path, output_path, model, stats_index, chunksize=CHUNK_SIZE):
+    """
+    Stream a fixtures CSV (player1, player2, surface columns) through
+    predict_fixtures `chunksize` rows at a time and write the predictions
+    CSV as it goes. Returns (rows, rows with an error).
+    """
+    rows = failed = 0
+    with open(output_path, 'w', newline='', encoding='utf-8') as out:
+        for chunk in pd.read_csv(fixtures_path, chunksize=chunksize, dtype=str, keep_default_na=False):
+            predictions = predict_fixtures(model, stats_index, chunk)
+            predictions.to_csv(out, index=False, header=rows == 0, float_format='%.6f')
+            rows += len(predictions)
+            failed += int(predictions['error'].notna().sum())
+        if rows == 0:
+            out.write(','.join(FIXTURE_COLUMNS + ['p1_win_prob', 'winner', 'win_prob', 'error']) + '\n')
+    return rows, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Predict every fixture in a CSV with the H2H model.")
+    parser.add_argument('fixtures', help="CSV with player1, player2 and surface columns")
+    parser.add_argument('-o', '--output', default='predictions.csv')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--stats', default=STATS_PATH)
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help="fixtures scored per model call")
+    args = parser.parse_args()
+
+    try:
+        h2h_model, player_stats = load_h2h(args.model, args.stats)
+    except FileNotFoundError:
+        print("❌ Error: Model or stats file not found.")
+        print("Please run the 'src/models/train_h2h.py' script first.")
+        sys.exit(1)
+    rows, failed = predict_csv(args.fixtures, args.output, h2h_model, player_stats, args.chunksize)
+    print(f"✅ Wrote {rows} predictions to {args.output}"
+          f"{f' ({failed} with unknown players)' if failed else ''}.")
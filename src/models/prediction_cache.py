@@ -0,0 +1,96 @@
+import time
+import threading
+from collections import OrderedDict
+
+from src.models.compiled_tree import model_version
+from src.models.features import h2h_features, h2h_matrix
+from src.models.predict import win_probability
+
+MODES = ('oriented', 'average')
+
+
+class PredictionCache:
+    """
+    Memoised H2H win probabilities in front of the model.
+
+    Entries are keyed on the canonical (sorted) player pair, the surface and
+    the model and stats versions, so p(A, B) and p(B, A) share one entry and
+    a retrained model or refreshed stats never serves stale values. The
+    stored value is P(first player of the sorted pair wins); the other
+    orientation is 1 minus it.
+
+    The tree model isn't exactly antisymmetric (p(A, B) + p(B, A) != 1), so
+    `mode` picks what gets stored:
+
+    - 'oriented': the model's answer for the sorted orientation
+    - 'average': both orientations scored once, in one model call, and
+      averaged as (p(A, B) + 1 - p(B, A)) / 2
+
+    Eviction is least-recently-used beyond `maxsize` entries, plus an
+    optional `ttl` in seconds. Unknown players raise KeyError and are not
+    cached. Safe to share between threads (e.g. Streamlit sessions).
+    """
+
+    def __init__(self, model, stats_index, maxsize=4096, ttl=None, mode='average', clock=time.monotonic):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode {mode!r}; expected one of {MODES}")
+        self.model = model
+        self.stats_index = stats_index
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.mode = mode
+        self.clock = clock
+        self.version = (model_version(model), stats_index.version)
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _compute(self, first, second, surface):
+        if self.mode == 'oriented':
+            return float(win_probability(self.model, h2h_features(self.stats_index, first, second, surface))[0])
+        both = win_probability(self.model, h2h_matrix(self.stats_index, [first, second], [second, first],
+                                                      [surface, surface]))
+        return float((both[0] + 1 - both[1]) / 2)
+
+    def predict(self, p1_name, p2_name, surface):
+        """P(p1_name beats p2_name on `surface`), from the cache when possible."""
+        first, second = sorted((p1_name, p2_name))
+        key = (first, second, surface) + self.version
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and entry[1] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                probability = entry[0]
+            else:
+                self.misses += 1
+        if entry is None:
+            probability = self._compute(first, second, surface)
+            expires = None if self.ttl is None else now + self.ttl
+            with self._lock:
+                self._entries[key] = (probability, expires)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return probability if p1_name == first else 1 - probability
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters for monitoring: hits, misses, hit rate, evictions, expirations and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0,
+                    'evictions': self.evictions, 'expirations': self.expirations, 'size': len(self._entries),
+                    'maxsize': self.maxsize}
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Get the project root directory (two levels up from this script)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, project_root)
+from src.utils.dates import day_numbers
+from src.utils.match_loader import load_matches
+from src.models.elo import ELO_COLUMNS, chronological
+from src.models.player_stats import STATS
+
+ROLLING_COLUMNS = ELO_COLUMNS + [column for columns in STATS.values() for column in columns]
+SIDES = ('winner', 'loser')
+
+
+def window_names(last_n=10, weeks=52):
+    return ['career', f'last{last_n}', f'{weeks}w']
+
+
+def rolling_columns(last_n=10, weeks=52):
+    """Columns added by rolling_stats: per side and window, the prior match count then each stat's mean."""
+    return [f'{side}_{window}_{stat}' for side in SIDES for window in window_names(last_n, weeks)
+            for stat in ['matches'] + list(STATS)]
+
+
+def rolling_stats(matches, last_n=10, weeks=52):
+    """
+    Both players' surface-specific stats going into each match, using only
+    the matches they played before it: career means, means over their last
+    `last_n` matches on the surface, and means over the `weeks` weeks up to
+    the match date. Each window also gets the number of prior matches in it.
+
+    All 2n player-match rows are sorted once, by player, surface and order
+    of play (elo.chronological), so every player/surface history is one
+    contiguous run. Window sums are differences of running totals: the run
+    start for career, n rows back for last-N, and a searchsorted on the
+    dates for the weeks window. Means skip missing stats; a window with no
+    stats is NaN. Returns a DataFrame with rolling_columns() on the index of
+    `matches`; matches without a player or surface get NaN.
+    """
+    n = len(matches)
+    if n == 0:
+        return pd.DataFrame(index=matches.index, columns=rolling_columns(last_n, weeks), dtype=np.float64)
+    play_order = np.empty(n, dtype=np.int64)
+    play_order[chronological(matches)] = np.arange(n)
+    players = pd.factorize(np.concatenate([matches['winner_name'].to_numpy(dtype=object),
+                                           matches['loser_name'].to_numpy(dtype=object)]))[0]
+    surfaces = np.tile(pd.factorize(matches['surface'].astype(object))[0], 2)
+    days = np.tile(day_numbers(matches['tourney_date']).astype(np.int64), 2)
+    values = np.column_stack([np.concatenate([matches[w].to_numpy(dtype=np.float64, na_value=np.nan),
+                                              matches[l].to_numpy(dtype=np.float64, na_value=np.nan)])
+                              for w, l in STATS.values()])
+
+    # One sort: each (player, surface) history in order of play
+    rows = np.lexsort((np.tile(play_order, 2), surfaces, players))
+    group = (players[rows] * (surfaces.max() + 2) + surfaces[rows] + 1).astype(np.int64)
+    values, days = values[rows], days[rows]
+    present = ~np.isnan(values)
+    sums = np.zeros((2 * n + 1, len(STATS)))
+    np.cumsum(np.where(present, values, 0.0), axis=0, out=sums[1:])
+    counts = np.zeros((2 * n + 1, len(STATS)), dtype=np.int64)
+    np.cumsum(present, axis=0, out=counts[1:])
+
+    here = np.arange(2 * n)
+    new_group = np.r_[True, group[1:] != group[:-1]]
+    start = np.maximum.accumulate(np.where(new_group, here, 0))
+    keys = group * (days.max() - days.min() + 1) + (days - days.min())
+    window_starts = [start, np.maximum(start, here - last_n),
+                     np.maximum(start, np.searchsorted(keys, keys - (7 * weeks - 1), side='left'))]
+
+    sorted_out = np.empty((2 * n, len(window_starts), len(STATS) + 1))
+    for w, lo in enumerate(window_starts):
+        sorted_out[:, w, 0] = here - lo
+        total, seen = sums[here] - sums[lo], counts[here] - counts[lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sorted_out[:, w, 1:] = np.where(seen > 0, total / seen, np.nan)
+    unknown = (players[rows] < 0) | (surfaces[rows] < 0)
+    sorted_out[unknown] = np.nan
+
+    out = np.empty_like(sorted_out)
+    out[rows] = sorted_out
+    out = np.concatenate([out[:n].reshape(n, -1), out[n:].reshape(n, -1)], axis=1)
+    return pd.DataFrame(out, index=matches.index, columns=rolling_columns(last_n, weeks))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Annotate every match with both players' pre-match rolling stats.")
+    parser.add_argument('--last-n', type=int, default=10)
+    parser.add_argument('--weeks', type=int, default=52)
+    parser.add_argument('-o', '--output', help="write the annotated matches to this CSV")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    matches = load_matches(columns=ROLLING_COLUMNS, workers=args.workers)
+    start = time.perf_counter()
+    rolling = rolling_stats(matches, args.last_n, args.weeks)
+    seconds = time.perf_counter() - start
+    print(f"✅ Annotated {len(matches)} matches in {seconds:.2f}s ({len(matches) / seconds:,.0f} matches/sec).")
+    if args.output:
+        matches.join(rolling).to_csv(args.output, index=False, float_format='%.4f')
+        print(f"✅ Wrote {args.output}")
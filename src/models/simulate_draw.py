@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Get the project root directory (two levels up from this script)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, project_root)
+from src.models.predict import MODEL_PATH, STATS_PATH, load_h2h, probability_matrix
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+BATCH_SIZE = 100000       # simulations per array op; bounds memory per worker
+BYE = 'BYE'
+ROUND_NAMES = {2: 'F', 4: 'SF', 8: 'QF'}   # larger rounds are named R16, R32, ...
+
+
+def round_names(size):
+    """Column names for a draw of `size` slots: the round each player reaches, then W for the title."""
+    names = []
+    while size > 1:
+        names.append(ROUND_NAMES.get(size, f'R{size}'))
+        size //= 2
+    return names + ['W']
+
+
+def read_draw(path):
+    """Draw order from a text file, one entrant per line (blank line or BYE for a bye)."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() or BYE for line in f.read().splitlines()]
+
+
+def bracket_matrix(probabilities):
+    """
+    The match matrix of a bracket: entrant ids index `probabilities`, and id
+    n is the bye, which loses to everyone (a bye-vs-bye slot stays a bye).
+
+    The tree model isn't exactly antisymmetric (P[a, b] + P[b, a] != 1), so
+    each pair is averaged over both orientations, (P[a, b] + 1 - P[b, a]) / 2,
+    as PredictionCache does; otherwise a player's odds would depend on which
+    side of each pairing the draw put them.
+    """
+    probabilities = np.asarray(probabilities)
+    n = len(probabilities)
+    matrix = np.zeros((n + 1, n + 1))
+    matrix[:n, :n] = (probabilities + 1 - probabilities.T) / 2
+    matrix[:n, n] = 1.0
+    return matrix
+
+
+def simulate_shard(args):
+    """
+    Play `sims` copies of the bracket, one array op per round across a whole
+    batch of simulations. Returns counts[round, entrant]: how often each
+    entrant reached each round (round 0 is the draw itself).
+    """
+    matrix, slots, sims, seed = args
+    rng = np.random.default_rng(seed)
+    rounds = int(np.log2(len(slots)))
+    counts = np.zeros((rounds + 1, len(matrix)), dtype=np.int64)
+    dtype = np.int16 if len(matrix) < 2 ** 15 else np.int32
+    done = 0
+    while done < sims:
+        batch = min(BATCH_SIZE, sims - done)
+        alive = np.broadcast_to(slots.astype(dtype), (batch, len(slots)))
+        counts[0] += batch * np.bincount(slots, minlength=len(matrix))
+        for r in range(1, rounds + 1):
+            top, bottom = alive[:, 0::2], alive[:, 1::2]
+            top_wins = rng.random(top.shape) < matrix[top, bottom]
+            alive = np.where(top_wins, top, bottom)
+            counts[r] += np.bincount(alive.ravel(), minlength=len(matrix))
+        done += batch
+    return counts
+
+
+def simulate_draw(draw, surface, sims=1000000, workers=None, seed=None,
+                  model_path=MODEL_PATH, stats_path=STATS_PATH, model=None, stats_index=None):
+    """
+    Monte Carlo the draw `draw` (entrant names in bracket order, BYE for
+    byes; length a power of two) on `surface` with the H2H model.
+
+    The pairwise win-probability matrix is built once (predict.probability_matrix,
+    averaged over both orientations by bracket_matrix), then `sims` brackets
+    are played across `workers` processes (default: all cores; never more
+    than `sims`), each in batches of up to BATCH_SIZE. Returns (DataFrame of
+    per-entrant round-reach probabilities, simulations/sec).
+    """
+    size = len(draw)
+    if size < 2 or size & (size - 1):
+        raise ValueError(f"A draw needs a power-of-two number of slots, got {size}")
+    if sims < 1:
+        raise ValueError(f"Need at least one simulation, got {sims}")
+    if model is None or stats_index is None:
+        model, stats_index = load_h2h(model_path, stats_path)
+    entrants = list(dict.fromkeys(name for name in draw if name != BYE))
+    if len(entrants) != sum(name != BYE for name in draw):
+        raise ValueError("An entrant appears more than once in the draw")
+    matrix = bracket_matrix(probability_matrix(model, stats_index, entrants, surface))
+    ids = {name: i for i, name in enumerate(entrants)}
+    slots = np.array([ids.get(name, len(entrants)) for name in draw])
+
+    workers = max(1, min(workers or DEFAULT_WORKERS, sims))
+    shard_seeds = np.random.SeedSequence(seed).spawn(workers)
+    jobs = [(matrix, slots, sims // workers + (i < sims % workers), shard_seeds[i]) for i in range(workers)]
+    start = time.perf_counter()
+    if workers == 1:
+        counts = simulate_shard(jobs[0])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = sum(pool.map(simulate_shard, jobs))
+    seconds = time.perf_counter() - start
+
+    reach = pd.DataFrame(counts[:, :len(entrants)].T / sims, columns=round_names(size), index=entrants)
+    reach.index.name = 'player'
+    return reach.sort_values('W', ascending=False), sims / seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a draw and print each entrant's round-reach odds.")
+    parser.add_argument('draw', help="text file with one entrant per line in bracket order (BYE for byes)")
+    parser.add_argument('--surface', required=True, choices=['Hard', 'Clay', 'Grass', 'Carpet'])
+    parser.add_argument('--sims', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('-o', '--output', help="also write the table to this CSV")
+    args = parser.parse_args()
+
+    try:
+        reach, rate = simulate_draw(read_draw(args.draw), args.surface, args.sims, args.workers, args.seed)
+    except FileNotFoundError:
+        print("❌ Error: Model or stats file not found.")
+        print("Please run the 'src/models/train_h2h.py' script first.")
+        sys.exit(1)
+    except KeyError as e:
+        print(f"❌ No {args.surface} stats for: {', '.join(e.args[0])}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(reach.to_string(float_format=lambda p: f"{p:.3f}"))
+    print(f"\n✅ {args.sims:,} simulations at {rate:,.0f} simulations/sec.")
+    if args.output:
+        reach.to_csv(args.output)
@@ -0,0 +1,100 @@
+import os
+import sys
+import hashlib
+import argparse
+
+import numpy as np
+
+# Make the project root importable when run as a script
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+from src.utils.digest import file_digest
+
+# Stat columns of player_avg_stats.csv, in the order of the H2H difference features
+INDEX_STATS = ['aces', 'dfs', 'serve_pts', 'first_in']
+
+
+def binary_path(csv_path):
+    """Where the binary copy of a stats CSV lives: same name, .npz."""
+    return os.path.splitext(csv_path)[0] + '.npz'
+
+
+class PlayerStatsIndex:
+    """
+    player_avg_stats.csv indexed by (player, surface).
+
+    Built once at load time: the stats live in one contiguous float64 array
+    and a dict maps each (player, surface) pair to its row, so a lookup is a
+    hash probe and a row view, with no pandas on the request path.
+    """
+
+    def __init__(self, players, surfaces, values):
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.values.flags.writeable = False
+        self.rows = {key: i for i, key in enumerate(zip(players, surfaces))}
+        self.players = sorted(set(players))
+        # Content hash of the indexed stats, for keying cached predictions
+        digest = hashlib.sha1(self.values.tobytes())
+        digest.update('\n'.join(f'{player}\t{surface}' for player, surface in self.rows).encode('utf-8'))
+        self.version = digest.hexdigest()
+
+    @classmethod
+    def from_frame(cls, stats_df):
+        return cls(stats_df['player'].tolist(), stats_df['surface'].tolist(), stats_df[INDEX_STATS].to_numpy())
+
+    @classmethod
+    def load(cls, path='player_avg_stats.csv'):
+        """
+        Load the stats from the binary copy next to the CSV when it was made
+        from this exact CSV (fast, no pandas), otherwise parse the CSV.
+        """
+        binary = binary_path(path)
+        if os.path.exists(binary):
+            with np.load(binary, allow_pickle=False) as data:
+                if not os.path.exists(path) or str(data['source_digest']) == file_digest(path):
+                    return cls(data['players'].tolist(), data['surfaces'].tolist(), data['values'])
+        import pandas as pd
+        return cls.from_frame(pd.read_csv(path))
+
+    def save(self, path, source_path=None):
+        """
+        Write the index as a small .npz (names as fixed-width unicode, stats
+        as float64) that load() reads without pandas. `source_path` is the
+        CSV it was built from; its hash marks the binary as up to date.
+        """
+        keys = list(self.rows)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, players=np.array([player for player, _ in keys]),
+                 surfaces=np.array([surface for _, surface in keys]), values=self.values,
+                 source_digest=np.array('' if source_path is None else file_digest(source_path)))
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def lookup(self, player, surface):
+        """The player's average stats on `surface` as a read-only row; KeyError if there are none."""
+        return self.values[self.rows[(player, surface)]]
+
+    def row_ids(self, players, surfaces):
+        """Row numbers for arrays of players and surfaces, -1 where there are no stats."""
+        rows = self.rows
+        return np.fromiter((rows.get(key, -1) for key in zip(players, surfaces)), dtype=np.intp,
+                           count=len(surfaces))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the binary copy of player_avg_stats.csv the apps load at startup.")
+    parser.add_argument('stats', nargs='?', default='player_avg_stats.csv')
+    args = parser.parse_args()
+
+    try:
+        index = PlayerStatsIndex.load(args.stats)
+    except FileNotFoundError:
+        print(f"❌ Error: '{args.stats}' not found.")
+        sys.exit(1)
+    index.save(binary_path(args.stats), args.stats)
+    print(f"✅ {args.stats} -> {binary_path(args.stats)} ({len(index)} player/surface rows)")
@@ -1,80 +1,137 @@
-import pandas as pd
-import numpy as np
 from sklearn.tree import DecisionTreeClassifier
 import joblib
-import glob
+import argparse
 import os
+import sys
+import time
 
 # Get the project root directory (two levels up from this script)
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, project_root)
+from src.utils.match_loader import load_matches
+from src.models.player_stats import update_player_stats
+from src.models.compiled_tree import compiled_path, export_tree
+from src.models.stats_index import PlayerStatsIndex, binary_path
+from src.models.features import attach_schema, h2h_training_set, h2h_variant, schema_columns
+from src.models.elo import ELO_PATH, EloRatings
+from src.models.rolling_stats import ROLLING_COLUMNS, rolling_stats
+from src.models.h2h_index import H2H_PATH, H2HIndex, pre_match_h2h
 
-print("--- Starting Head-to-Head AI Model Training ---")
 
-# Step 1: Load and Combine All Match Data
-print("Step 1: Loading all ATP match data...")
-data_dir = os.path.join(project_root, 'data', 'raw')
-all_files = glob.glob(os.path.join(data_dir, 'atp_matches_*.csv'))
-df = pd.concat((pd.read_csv(f) for f in all_files), ignore_index=True)
-print(f"✅ Loaded {len(df)} matches.")
+def add_elo(matches):
+    """
+    Replay every match through a fresh EloRatings and add each match's
+    pre-match ratings as columns. Saves the final state to ELO_PATH so the
+    ratings can be served and updated incrementally (src/models/elo.py).
+    """
+    elo = EloRatings()
+    start = time.perf_counter()
+    ratings = elo.update(matches)
+    seconds = time.perf_counter() - start
+    elo.save(ELO_PATH)
+    print(f"✅ Elo ratings over {elo.matches_processed} matches ({elo.matches_processed / seconds:,.0f} matches/sec).")
+    return matches.join(ratings)
 
-# Step 2: Clean and Prepare Data
-print("Step 2: Cleaning and preparing data...")
-cols_to_use = [
-    'surface', 'winner_name', 'loser_name', 'w_ace', 'l_ace', 
-    'w_df', 'l_df', 'w_1stIn', 'l_1stIn', 'w_svpt', 'l_svpt'
-]
-df_clean = df[cols_to_use].dropna()
 
-# Step 3: Create "Difference" Features for Head-to-Head Training
-print("Step 3: Engineering 'difference' features...")
-# For each stat, calculate the difference: winner's stat - loser's stat
-df_clean['ace_diff'] = df_clean['w_ace'] - df_clean['l_ace']
-df_clean['df_diff'] = df_clean['w_df'] - df_clean['l_df']
-df_clean['serve_pts_diff'] = df_clean['w_svpt'] - df_clean['l_svpt']
-df_clean['first_serve_in_diff'] = df_clean['w_1stIn'] - df_clean['l_1stIn']
+def add_h2h_records(matches):
+    """
+    Add each match's pre-match head-to-head wins of both players as columns,
+    and save the full head-to-head index to H2H_PATH for serving
+    (src/models/h2h_index.py).
+    """
+    start = time.perf_counter()
+    records = pre_match_h2h(matches)
+    index = H2HIndex.from_matches(matches)
+    seconds = time.perf_counter() - start
+    index.save(H2H_PATH)
+    print(f"✅ Head-to-head records over {index.matches} matches ({len(index.opponents) // 2} pairs) "
+          f"in {seconds:.2f}s.")
+    return matches.join(records)
 
-# Create a balanced dataset: one row for winner-loser, one for loser-winner
-# This teaches the model what both winning and losing stat differences look like.
-df_winner_first = df_clean.copy()
-df_winner_first['outcome'] = 1 # Winner is player 1, so the outcome is a win
 
-df_loser_first = df_clean.copy()
-df_loser_first['outcome'] = 0 # Loser is player 1, so the outcome is a loss
-# Invert the differences for the loser-first perspective
-df_loser_first['ace_diff'] = -df_loser_first['ace_diff']
-df_loser_first['df_diff'] = -df_loser_first['df_diff']
-df_loser_first['serve_pts_diff'] = -df_loser_first['serve_pts_diff']
-df_loser_first['first_serve_in_diff'] = -df_loser_first['first_serve_in_diff']
+def main(workers=None, elo=False, as_of=False, h2h_record=False):
+    print("--- Starting Head-to-Head AI Model Training ---")
 
-# Combine both perspectives
-h2h_df = pd.concat([df_winner_first, df_loser_first], ignore_index=True)
-h2h_df = pd.get_dummies(h2h_df, columns=['surface'], drop_first=True)
+    # Step 1: Load and Combine All Match Data
+    # Only the columns the model uses are read, and only tour-level singles files
+    print("Step 1: Loading all ATP match data...")
+    data_dir = os.path.join(project_root, 'data', 'raw')
+    cols_to_use = [
+        'surface', 'winner_name', 'loser_name', 'w_ace', 'l_ace', 
+        'w_df', 'l_df', 'w_1stIn', 'l_1stIn', 'w_svpt', 'l_svpt'
+    ]
 
-# Step 4: Pre-calculate and Save Player Average Stats
-# This is a crucial step for our prediction program to work quickly.
-print("Step 4: Calculating and saving average stats for all players...")
-# Re-structure the original data to be player-focused
-winners_df = df_clean[['surface', 'winner_name', 'w_ace', 'w_df', 'w_1stIn', 'w_svpt']].rename(columns={'winner_name': 'player', 'w_ace': 'aces', 'w_df': 'dfs', 'w_1stIn': 'first_in', 'w_svpt': 'serve_pts'})
-losers_df = df_clean[['surface', 'loser_name', 'l_ace', 'l_df', 'l_1stIn', 'l_svpt']].rename(columns={'loser_name': 'player', 'l_ace': 'aces', 'l_df': 'dfs', 'l_1stIn': 'first_in', 'l_svpt': 'serve_pts'})
-player_df = pd.concat([winners_df, losers_df])
-# Group by player and surface to get their average stats
-player_avg_stats = player_df.groupby(['player', 'surface']).mean().reset_index()
-# Save to root directory
-output_path = os.path.join(project_root, 'player_avg_stats.csv')
-player_avg_stats.to_csv(output_path, index=False)
+    # Step 2: Clean and Prepare Data
+    # Rows with missing stats are dropped per file, inside the loader
+    print("Step 2: Cleaning and preparing data...")
+    # With --elo, --as-of or --h2h-record, the features come from the matches
+    # before each one (including those without stats), so every match is loaded
+    # and rows are only dropped once the pre-match values are attached
+    schema = h2h_variant(as_of=as_of, elo=elo, record=h2h_record)
+    if elo or as_of or h2h_record:
+        columns = cols_to_use + [c for c in ROLLING_COLUMNS if c not in cols_to_use]
+        df_clean = load_matches(data_dir, columns=columns, workers=workers)
+        if elo:
+            df_clean = add_elo(df_clean)
+        if as_of:
+            df_clean = df_clean.join(rolling_stats(df_clean))
+        if h2h_record:
+            df_clean = add_h2h_records(df_clean)
+        df_clean = df_clean.dropna(subset=schema_columns(schema))
+    else:
+        df_clean = load_matches(data_dir, columns=cols_to_use, dropna=True, workers=workers)
+    print(f"✅ Loaded {len(df_clean)} matches with stats.")
 
-# Step 5: Train and Save the Head-to-Head Model
-print("Step 5: Training and saving the new H2H model...")
-features = ['ace_diff', 'df_diff', 'serve_pts_diff', 'first_serve_in_diff', 'surface_Hard', 'surface_Grass']
-X = h2h_df[features]
-y = h2h_df['outcome']
+    # Step 3: Create "Difference" Features for Head-to-Head Training
+    print("Step 3: Engineering 'difference' features...")
+    # For each stat, the difference winner's stat - loser's stat, once from the
+    # winner's side (outcome 1) and once mirrored from the loser's (outcome 0).
+    # This teaches the model what both winning and losing stat differences look like.
+    # With --as-of they are differences of both players' career averages going
+    # into the match; with --elo the pre-match rating differences, and with
+    # --h2h-record the pre-match head-to-head difference, are extra features
+    X, y = h2h_training_set(df_clean, schema)
 
-h2h_model = DecisionTreeClassifier(max_depth=5, random_state=42)
-h2h_model.fit(X, y)
+    # Step 4: Pre-calculate and Save Player Average Stats
+    # This is a crucial step for our prediction program to work quickly.
+    # Per-season sums are cached, so only new or changed season files are re-read.
+    print("Step 4: Calculating and saving average stats for all players...")
+    player_avg_stats = update_player_stats(data_dir, workers=workers)
+    # Save to root directory
+    output_path = os.path.join(project_root, 'player_avg_stats.csv')
+    player_avg_stats.to_csv(output_path, index=False)
+    # Plus a binary copy the prediction apps load at startup without pandas
+    PlayerStatsIndex.from_frame(player_avg_stats).save(binary_path(output_path), output_path)
 
-# Save to root directory
-model_path = os.path.join(project_root, 'h2h_model.joblib')
-joblib.dump(h2h_model, model_path)
-print("\n🎉 SUCCESS! Head-to-head model and player stats are saved.")
+    # Step 5: Train and Save the Head-to-Head Model
+    print("Step 5: Training and saving the new H2H model...")
+    h2h_model = DecisionTreeClassifier(max_depth=5, random_state=42)
+    h2h_model.fit(X, y)
+    # The feature schema (columns, definitions and hash) is saved with the model
+    # so the prediction apps can check they build the same inputs
+    attach_schema(h2h_model, schema)
 
+    # Save to root directory; the --elo, --as-of and --h2h-record variants get their own
+    # files (e.g. h2h_asof_model.joblib), so the prediction apps keep the plain model
+    model_path = os.path.join(project_root, f"{schema['name']}_model.joblib")
+    joblib.dump(h2h_model, model_path)
+    # Plus an array-only copy the prediction apps can load without scikit-learn
+    export_tree(h2h_model, compiled_path(model_path), model_path)
+    print("\n🎉 SUCCESS! Head-to-head model and player stats are saved.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes used to parse the match files (default: all cores)")
+    parser.add_argument('--elo', action='store_true',
+                        help="also train on pre-match Elo differences (saved as h2h_elo_model.joblib)")
+    parser.add_argument('--as-of', action='store_true',
+                        help="train on career averages going into each match, not the match's own stats "
+                             "(saved as h2h_asof_model.joblib)")
+    parser.add_argument('--h2h-record', action='store_true',
+                        help="also train on the players' head-to-head record before each match "
+                             "(saved as h2h_record_model.joblib)")
+    args = parser.parse_args()
+    main(workers=args.workers, elo=args.elo, as_of=args.as_of, h2h_record=args.h2h_record)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+# What the old per-row parser in examples.py returned for values it couldn't read
+MISSING_DATE = np.datetime64('1900-01-01', 'D')
+
+
+def _parse_unique(values, missing):
+    numbers = pd.to_numeric(pd.Series(values, copy=False), errors='coerce')
+    numbers = numbers.to_numpy(dtype='float64', na_value=np.nan)
+    valid = np.isfinite(numbers) & (numbers == np.floor(numbers)) & (numbers >= 10101) & (numbers <= 99991231)
+    whole = np.where(valid, numbers, 19000101).astype('int64')
+    year, month, day = whole // 10000, whole // 100 % 100, whole % 100
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    month = np.where(valid, month, 1)
+    day = np.where(valid, day, 1)
+    first = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    dates = first.astype('datetime64[D]') + (day - 1)
+    # a day past the end of its month rolls into the next one
+    valid &= dates.astype('datetime64[M]') == first
+    return np.where(valid, dates, missing)
+
+
+def parse_yyyymmdd(values, missing=MISSING_DATE):
+    """
+    Parse YYYYMMDD dates (tourney_date, ranking_date) into a datetime64[D]
+    array without a Python loop. Accepts ints, floats, strings or nullable
+    integer columns; missing, non-numeric and impossible dates (e.g.
+    20230231) become `missing`.
+
+    Match and ranking files repeat the same few thousand dates millions of
+    times, so only the distinct values are parsed and the result is
+    gathered back by code.
+    """
+    missing = np.datetime64(missing, 'D')
+    codes, uniques = pd.factorize(pd.Series(values, copy=False))
+    parsed = np.append(_parse_unique(np.asarray(uniques), missing), missing)
+    return parsed[codes]  # code -1 (missing) picks the trailing sentinel
+
+
+def day_numbers(values, missing=MISSING_DATE):
+    """YYYYMMDD dates as int32 days since 1970-01-01, for compact storage and arithmetic."""
+    return parse_yyyymmdd(values, missing).astype('int32')
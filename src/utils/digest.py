@@ -0,0 +1,13 @@
+import hashlib
+
+# Standard library only: the stats index and compiled trees check their
+# source files with this at app startup, before pandas is imported.
+
+
+def file_digest(path):
+    """SHA-1 of a file's contents, read in chunks."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
@@ -1,55 +1,201 @@
 import os
+import json
+import time
+import argparse
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://raw.githubusercontent.com/JeffSackmann/tennis_atp/master/"
+CHUNK_SIZE = 1 << 16  # 64 KiB per write keeps memory flat regardless of file size
+DEFAULT_WORKERS = 8
+MANIFEST_NAME = '.manifest.json'
+
+# One entry per requested file; 'status' is 'downloaded', 'resumed',
+# 'not_modified', 'skipped' or 'failed'
+DownloadResult = namedtuple('DownloadResult', ['filename', 'status', 'nbytes', 'seconds'])
+
+
+def tennis_data_files(years=range(1968, 2026), decades=("70", "80", "90", "00", "10", "20")):
+    """List the ATP match, ranking and player files we keep in data/raw."""
+    files = [f"atp_matches_{year}.csv" for year in years]
+    files += [f"atp_rankings_{decade}s.csv" for decade in decades]
+    files += ["atp_players.csv", "atp_rankings_current.csv"]
+    return files
+
+
+def make_session(pool_size):
+    """A requests session whose connection pool can serve every worker at once."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def load_manifest(path):
+    """Read the ETag/Last-Modified validators recorded by previous runs."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    """Write the manifest through a temp file so a killed run can't corrupt it."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def download_file(session, url, save_path, entry=None, refresh=False, on_start=None, timeout=10):
+    """
+    Stream a single file to disk in chunks instead of buffering the whole body.
 
-def fetch_tennis_data():
+    The body is written to `<save_path>.part` and renamed into place only once
+    complete. `entry` holds the validators from the manifest: with `refresh` an
+    existing file is revalidated with a conditional request, and a leftover
+    .part file is resumed with a byte range if the server still has the same
+    version (otherwise it is deleted and the file fetched whole).
+    `on_start(validators)` is called before the first byte is written.
+    Returns (status, nbytes, seconds, validators).
+    """
+    start = time.perf_counter()
+    entry = entry or {}
+    part_path = save_path + '.part'
+    headers = {}
+    offset = 0
+    partial = entry.get('partial')
+    if partial and os.path.exists(part_path):
+        validator = partial.get('etag') or partial.get('last_modified')
+        offset = os.path.getsize(part_path)
+        if offset and validator:
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = validator
+        else:
+            offset = 0
+    elif refresh and os.path.exists(save_path):
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as r:
+        if r.status_code == 304:
+            return 'not_modified', 0, time.perf_counter() - start, entry
+        resumed = offset and r.status_code == 206 and r.headers.get('Content-Range', '').startswith(f"bytes {offset}-")
+        if offset and not resumed and r.status_code in (206, 416):
+            # Our partial file is no longer a prefix of what the server has, or
+            # the server sent some other range: start over once without one
+            os.remove(part_path)
+            return download_file(session, url, save_path, refresh=refresh, on_start=on_start, timeout=timeout)
+        if resumed:
+            status, mode = 'resumed', 'ab'
+        elif r.status_code == 200:
+            status, mode = 'downloaded', 'wb'
+        else:
+            return 'failed', 0, time.perf_counter() - start, entry
+
+        validators = {
+            'etag': r.headers.get('ETag'),
+            'last_modified': r.headers.get('Last-Modified'),
+        }
+        if on_start is not None:
+            on_start(validators)
+        nbytes = 0
+        with open(part_path, mode) as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                nbytes += len(chunk)
+    os.replace(part_path, save_path)
+    return status, nbytes, time.perf_counter() - start, validators
+
+
+def fetch_tennis_data(target_dir=None, base_url=BASE_URL, files=None, max_workers=DEFAULT_WORKERS,
+                      refresh=False):
     """
     Automated data acquisition for ATP matches and rankings.
     Ensures the project remains lightweight by fetching data only when needed.
+
+    Files are fetched concurrently over a pooled session, at most `max_workers`
+    at a time. `base_url` can point at any server exposing the same file names
+    (e.g. a local http.server for testing). By default files already on disk
+    are skipped; with `refresh` they are revalidated against the validators in
+    data/raw/.manifest.json so only changed files are transferred. Interrupted
+    downloads are resumed either way. Returns a list of DownloadResult.
     """
-    # Get the project root directory (two levels up from this script)
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(os.path.dirname(script_dir))
-    
-    base_url = "https://raw.githubusercontent.com/JeffSackmann/tennis_atp/master/"
-    
-    # Define which categories of files we want to fetch
-    file_categories = [
-        "atp_matches_{year}.csv",
-        "atp_rankings_{decade}s.csv",
-        "atp_players.csv",
-        "atp_rankings_current.csv"
-    ]
-    
-    years = range(1968, 2026)
-    decades = ["70", "80", "90", "00", "10", "20"]
-    
+    if target_dir is None:
+        # Get the project root directory (two levels up from this script)
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        project_root = os.path.dirname(os.path.dirname(script_dir))
+        target_dir = os.path.join(project_root, 'data', 'raw')
+    if files is None:
+        files = tennis_data_files()
+
     # Create the data directory if it doesn't exist
-    target_dir = os.path.join(project_root, 'data', 'raw')
     os.makedirs(target_dir, exist_ok=True)
+    manifest_path = os.path.join(target_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    manifest_lock = threading.Lock()
 
-    def download(filename):
+    def record(filename, entry):
+        with manifest_lock:
+            manifest[filename] = entry
+            save_manifest(manifest_path, manifest)
+
+    def download(session, filename):
         save_path = os.path.join(target_dir, filename)
-        if os.path.exists(save_path):
-            return # Skip if already there
-            
-        print(f"Downloading {filename}...")
+        entry = manifest.get(filename, {})
+        if os.path.exists(save_path) and not refresh and 'partial' not in entry:
+            return DownloadResult(filename, 'skipped', 0, 0.0)  # Skip if already there
+
+        def on_start(validators):
+            # Remember which version the .part file belongs to, so it can be resumed
+            record(filename, dict(entry, partial=validators))
+
         try:
-            r = requests.get(f"{base_url}{filename}", timeout=10)
-            if r.status_code == 200:
-                with open(save_path, 'wb') as f:
-                    f.write(r.content)
-            else:
-                print(f"Failed: {filename}")
-        except Exception as e:
-            print(f"Error: {e}")
-
-    # Download everything
-    for year in years:
-        download(f"atp_matches_{year}.csv")
-    for decade in decades:
-        download(f"atp_rankings_{decade}s.csv")
-    download("atp_players.csv")
-    download("atp_rankings_current.csv")
+            status, nbytes, seconds, validators = download_file(
+                session, f"{base_url}{filename}", save_path, entry, refresh, on_start)
+        except (requests.RequestException, OSError) as e:
+            print(f"Error: {filename}: {e}")
+            return DownloadResult(filename, 'failed', 0, 0.0)
+        if status in ('downloaded', 'resumed'):
+            record(filename, validators)
+            rate = nbytes / seconds / 1e6 if seconds > 0 else float('inf')
+            print(f"{status.title()} {filename} ({nbytes / 1e6:.2f} MB in {seconds:.2f}s, {rate:.2f} MB/s)")
+        elif status == 'failed':
+            print(f"Failed: {filename}")
+        return DownloadResult(filename, status, nbytes, seconds)
+
+    # Download everything, keeping at most max_workers requests in flight
+    results = []
+    start = time.perf_counter()
+    with make_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(download, session, filename) for filename in files]
+        for future in as_completed(futures):
+            results.append(future.result())
+    elapsed = time.perf_counter() - start
+
+    total_bytes = sum(r.nbytes for r in results)
+    fetched = sum(r.status in ('downloaded', 'resumed') for r in results)
+    unchanged = sum(r.status in ('not_modified', 'skipped') for r in results)
+    failed = sum(r.status == 'failed' for r in results)
+    rate = total_bytes / elapsed / 1e6 if elapsed > 0 else 0.0
+    print(f"Fetched {fetched} files ({total_bytes / 1e6:.1f} MB) in {elapsed:.1f}s "
+          f"at {rate:.2f} MB/s, {unchanged} unchanged, {failed} failed.")
+    return results
+
 
 if __name__ == "__main__":
-    fetch_tennis_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Download ATP match and ranking data into data/raw.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="maximum concurrent downloads")
+    parser.add_argument('--base-url', default=BASE_URL, help="server to fetch the files from")
+    parser.add_argument('--refresh', action='store_true',
+                        help="revalidate files already on disk and fetch only those that changed")
+    args = parser.parse_args()
+    fetch_tennis_data(base_url=args.base_url, max_workers=args.workers, refresh=args.refresh)
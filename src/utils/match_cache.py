@@ -0,0 +1,267 @@
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Get the project root directory (two levels up from this script)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(script_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+from src.utils.digest import file_digest
+from src.utils.match_schema import apply_schema, cast_series
+
+DATA_DIR = os.path.join(project_root, 'data', 'raw')
+CACHE_DIR = os.path.join(project_root, 'data', 'cache')
+# Python types of the values in an object column that the cache can restore,
+# by the tag stored next to each distinct value of a 'mixed' column
+VALUE_TYPES = [str, int, float, bool]
+
+
+def _write_json(path, obj):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+def source_digest(path, cache_dir=CACHE_DIR):
+    """
+    The content hash of a source file, memoised on (size, mtime) so an
+    unchanged CSV is not re-hashed on every load.
+    """
+    st = os.stat(path)
+    memo_path = os.path.join(cache_dir, os.path.basename(path) + '.json')
+    try:
+        with open(memo_path) as f:
+            memo = json.load(f)
+        if memo['size'] == st.st_size and memo['mtime_ns'] == st.st_mtime_ns:
+            return memo['digest']
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    digest = file_digest(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_json(memo_path, {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'digest': digest})
+    return digest
+
+
+def cache_path(path, read_options=None, cache_dir=CACHE_DIR):
+    """Directory holding the columnar copy of `path` for its current contents."""
+    key = source_digest(path, cache_dir)[:16]
+    if read_options:
+        # Parsing options change the result, so they are part of the key too
+        key += '-' + hashlib.sha1(repr(sorted(read_options.items())).encode()).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{key}")
+
+
+def _value_types(uniques):
+    """Index into VALUE_TYPES of each distinct value of an object column, or None if one can't be restored."""
+    tags = np.empty(len(uniques), dtype=np.int8)
+    for i, value in enumerate(uniques):
+        if isinstance(value, (bool, np.bool_)):
+            tags[i] = 3
+        elif isinstance(value, str):
+            tags[i] = 0
+        elif isinstance(value, (int, np.integer)):
+            tags[i] = 1
+        elif isinstance(value, (float, np.floating)):
+            tags[i] = 2
+        else:
+            return None
+    return tags
+
+
+def write_cache(df, target):
+    """
+    Store a DataFrame as a handful of .npy blocks. Numeric columns of the same
+    dtype are stacked into one 2-D array; text columns are dictionary-encoded
+    as int32 codes plus a single unicode array of distinct values, so loading
+    needs no text parsing and only a few file reads per source CSV.
+
+    Object columns mixing numbers and text (as read_csv returns when a file
+    switches types part-way) also store each distinct value's type, so they
+    come back as read. Returns False, without writing anything, if a column
+    can't be stored faithfully (e.g. datetimes or categoricals from
+    read_csv options); the caller then keeps reading the CSV.
+    """
+    columns = []
+    blocks = {}
+    codes, values, types, offsets = [], [], [], [0]
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            block = blocks.setdefault(series.dtype.str, [])
+            columns.append([name, series.dtype.str, len(block)])
+            block.append(series.to_numpy())
+        elif series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+            column_codes, uniques = pd.factorize(series)
+            tags = _value_types(np.asarray(uniques, dtype=object))
+            if tags is None:
+                return False
+            columns.append([name, 'mixed' if tags.any() else 'text', len(codes)])
+            codes.append(column_codes.astype(np.int32))
+            values.append(np.asarray(uniques, dtype=str))
+            types.append(tags)
+            offsets.append(offsets[-1] + len(uniques))
+        else:
+            return False
+    tmp_dir = f"{target}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    for dtype, block in blocks.items():
+        np.save(os.path.join(tmp_dir, f"{_block_name(dtype)}.npy"), np.stack(block))
+    if codes:
+        np.save(os.path.join(tmp_dir, 'codes.npy'), np.stack(codes))
+        np.save(os.path.join(tmp_dir, 'values.npy'), np.concatenate(values))
+        np.save(os.path.join(tmp_dir, 'types.npy'), np.concatenate(types))
+    meta = {'columns': columns, 'offsets': offsets, 'rows': len(df)}
+    _write_json(os.path.join(tmp_dir, 'meta.json'), meta)
+    try:
+        os.replace(tmp_dir, target)
+    except OSError:
+        # Another process built the same cache entry first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return True
+
+
+def _block_name(dtype):
+    return 'block_' + dtype.replace('<', 'le_').replace('>', 'be_').replace('|', '')
+
+
+def read_cache(target, columns=None, where=None, dtypes=None):
+    """
+    Load a DataFrame written by write_cache. Only the requested `columns` are
+    read from the memory-mapped blocks, and `where` ({column: allowed values})
+    selects rows before any column is materialised. Requested columns missing
+    from the file come back as all-NaN. Columns named in `dtypes` are cast on
+    the way out; text columns declared 'category' are built straight from the
+    stored codes.
+    """
+    dtypes = dtypes or {}
+    with open(os.path.join(target, 'meta.json')) as f:
+        meta = json.load(f)
+    layout = {name: (kind, index) for name, kind, index in meta['columns']}
+    if columns is None:
+        columns = list(layout)
+    blocks = {}
+
+    def block(kind):
+        name = 'codes' if kind in ('text', 'mixed') else _block_name(kind)
+        if name not in blocks:
+            blocks[name] = np.load(os.path.join(target, f"{name}.npy"), mmap_mode='r')
+        return blocks[name]
+
+    def dictionary(kind, index):
+        if 'values' not in blocks:
+            blocks['values'] = np.load(os.path.join(target, 'values.npy'), mmap_mode='r')
+        start, stop = meta['offsets'][index], meta['offsets'][index + 1]
+        values = np.asarray(blocks['values'][start:stop], dtype=object)
+        if kind == 'mixed':
+            # Numbers were stored as their str(); turn them back into what was read
+            if 'types' not in blocks:
+                blocks['types'] = np.load(os.path.join(target, 'types.npy'), mmap_mode='r')
+            for i, tag in zip(range(len(values)), blocks['types'][start:stop].tolist()):
+                if tag:
+                    values[i] = values[i] == 'True' if tag == 3 else VALUE_TYPES[tag](values[i])
+        return values
+
+    rows = slice(None)
+    for name, allowed in (where or {}).items():
+        if name not in layout:
+            rows = np.zeros(meta['rows'], dtype=bool)
+            continue
+        kind, index = layout[name]
+        if kind in ('text', 'mixed'):
+            allowed = set(allowed)
+            allowed_codes = np.flatnonzero([value in allowed for value in dictionary(kind, index)])
+            mask = np.isin(block(kind)[index], allowed_codes)
+        else:
+            mask = np.isin(block(kind)[index], list(allowed))
+        rows = mask if isinstance(rows, slice) else rows & mask
+    if not isinstance(rows, slice):
+        rows = np.flatnonzero(rows)
+
+    data = {}
+    for name in columns:
+        if name not in layout:
+            column = np.full(meta['rows'], np.nan)[rows]
+        elif layout[name][0] in ('text', 'mixed'):
+            kind, index = layout[name]
+            column_codes = np.asarray(block(kind)[index][rows])
+            values = dictionary(kind, index)
+            if dtypes.get(name) == 'category':
+                data[name] = pd.Categorical.from_codes(column_codes, categories=values)
+                continue
+            column = values.take(column_codes, mode='clip') if len(values) \
+                else np.empty(len(column_codes), dtype=object)
+            column[column_codes < 0] = np.nan
+        else:
+            kind, index = layout[name]
+            column = np.array(block(kind)[index][rows])
+        data[name] = cast_series(pd.Series(column), dtypes[name]) if name in dtypes else column
+    return pd.DataFrame(data, columns=columns)
+
+
+def select(df, columns=None, where=None):
+    """In-memory equivalent of read_cache's projection and row filter."""
+    for name, allowed in (where or {}).items():
+        df = df[df[name].isin(list(allowed))] if name in df.columns else df.iloc[:0]
+    if columns is not None:
+        df = df.reindex(columns=columns)
+    return df.reset_index(drop=True)
+
+
+def read_csv_cached(path, cache_dir=CACHE_DIR, columns=None, where=None, dtypes=None, **read_options):
+    """
+    Drop-in replacement for pd.read_csv(path, **read_options) that parses the
+    CSV once and afterwards reads the typed columnar copy from `cache_dir`.
+    `columns`, `where` and `dtypes` (e.g. match_schema.MATCH_SCHEMA) are
+    passed on to read_cache.
+    """
+    target = cache_path(path, read_options, cache_dir)
+    if os.path.isdir(target):
+        return read_cache(target, columns, where, dtypes)
+    # Parsed exactly as pd.read_csv would, so the cached copy matches it
+    df = pd.read_csv(path, **read_options)
+    write_cache(df, target)
+    remove_stale(path, cache_dir)
+    df = select(df, columns, where)
+    return apply_schema(df, dtypes) if dtypes else df
+
+
+def remove_stale(path, cache_dir=CACHE_DIR):
+    """Drop cache entries built from older versions of `path`."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    current = f"{stem}-{source_digest(path, cache_dir)[:16]}"
+    for entry in glob.glob(os.path.join(cache_dir, f"{stem}-*")):
+        name = os.path.basename(entry)
+        if os.path.isdir(entry) and not name.startswith(current) and not name.endswith('.tmp'):
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def build_cache(data_dir=DATA_DIR, cache_dir=CACHE_DIR, pattern='atp_*.csv'):
+    """One-time conversion of every CSV in data_dir into the columnar cache."""
+    all_files = sorted(glob.glob(os.path.join(data_dir, pattern)))
+    start = time.perf_counter()
+    for filename in all_files:
+        read_csv_cached(filename, cache_dir)
+    print(f"✅ Cached {len(all_files)} files in {time.perf_counter() - start:.1f}s.")
+    return all_files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the ATP CSVs into the columnar cache.")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+    if not glob.glob(os.path.join(args.data_dir, 'atp_*.csv')):
+        print(f"❌ No ATP CSV files found in {args.data_dir}. Run 'src/utils/download_data.py' first.")
+        sys.exit(1)
+    build_cache(args.data_dir, args.cache_dir)
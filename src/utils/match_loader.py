@@ -0,0 +1,136 @@
+import os
+import re
+import glob
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.utils.dates import parse_yyyymmdd
+from src.utils.match_cache import CACHE_DIR, DATA_DIR, read_csv_cached, select
+from src.utils.match_schema import MATCH_SCHEMA, apply_schema, share_categories
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# File families in data/raw: tour-level main draws, qualifying + challengers,
+# futures and tour-level doubles (see tennis_atp-master/README.md)
+FAMILIES = ('tour', 'qual_chall', 'futures', 'doubles')
+MATCH_FILE_RE = re.compile(r'atp_matches_(?:(qual_chall|futures|doubles)_)?(\d{4})\.csv$')
+
+
+def _read_file(args):
+    filename, cache_dir, columns, where, dropna, dtypes, parse_dates = args
+    if cache_dir is None:
+        wanted = None if columns is None else set(columns) | set(where or {})
+        df = pd.read_csv(filename, low_memory=False,
+                         usecols=None if wanted is None else (lambda name: name in wanted))
+        df = select(df, columns, where)
+        if dtypes:
+            df = apply_schema(df, dtypes)
+    else:
+        df = read_csv_cached(filename, cache_dir, columns=columns, where=where, dtypes=dtypes)
+    if dropna:
+        df = df.dropna()
+    if parse_dates and 'tourney_date' in df.columns:
+        df['tourney_date'] = parse_yyyymmdd(df['tourney_date'])
+    # Summarise each column here, in the worker, so the parent can pick a
+    # schema without scanning every frame again
+    counts = df.count()
+    summary = {name: (df[name].dtype, counts[name], len(df)) for name in df.columns}
+    return df, summary
+
+
+def unify_dtypes(summaries):
+    """
+    Pick one dtype per column across all yearly frames. A column is numeric
+    only if every file that has values for it parsed it as numeric; numeric
+    columns that are missing anywhere become float64 so NaN fits. Text
+    columns keep their dtype if all files agree, otherwise become object.
+    Columns that are entirely empty in a file don't vote on the type.
+    """
+    votes = {}
+    for summary in summaries:
+        for name, (dtype, count, rows) in summary.items():
+            vote = votes.setdefault(name, {'text': set(), 'float': False, 'files': 0})
+            vote['files'] += 1
+            if count < rows or pd.api.types.is_float_dtype(dtype):
+                vote['float'] = True
+            if count and not pd.api.types.is_numeric_dtype(dtype):
+                vote['text'].add(dtype)
+    schema = {}
+    for name, vote in votes.items():
+        if vote['text']:
+            schema[name] = vote['text'].pop() if len(vote['text']) == 1 else object
+        elif vote['float'] or vote['files'] < len(summaries):
+            schema[name] = 'float64'
+        else:
+            schema[name] = 'int64'
+    return schema
+
+
+def concat_frames(results, dtypes=None):
+    """
+    Concatenate (frame, summary) pairs after casting them to a single schema.
+    Columns declared in `dtypes` keep their declared type, with categories
+    shared across files; the rest are unified by unify_dtypes.
+    """
+    if not results:
+        return pd.DataFrame()
+    dtypes = dtypes or {}
+    summaries = [{name: info for name, info in summary.items() if name not in dtypes}
+                 for _, summary in results]
+    schema = unify_dtypes(summaries)
+    frames = []
+    for df in share_categories([df for df, _ in results], dtypes):
+        casts = {name: schema[name] for name in df.columns
+                 if name in schema and df[name].dtype != schema[name]}
+        frames.append(df.astype(casts) if casts else df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def match_files(data_dir=DATA_DIR, families=('tour',), years=None):
+    """The match files of the given families, optionally limited to a (first, last) year range."""
+    unknown = set(families) - set(FAMILIES)
+    if unknown:
+        raise ValueError(f"Unknown match file families: {sorted(unknown)}; expected some of {FAMILIES}")
+    selected = []
+    for filename in sorted(glob.glob(os.path.join(data_dir, 'atp_matches_*.csv'))):
+        match = MATCH_FILE_RE.search(os.path.basename(filename))
+        if match is None or (match.group(1) or 'tour') not in families:
+            continue
+        year = int(match.group(2))
+        if years is not None and not years[0] <= year <= years[1]:
+            continue
+        selected.append(filename)
+    return selected
+
+
+def load_matches(data_dir=DATA_DIR, columns=None, levels=None, years=None, families=('tour',),
+                 dropna=False, workers=None, cache_dir=CACHE_DIR, dtypes=MATCH_SCHEMA, parse_dates=False):
+    """
+    Load match files from `data_dir` into one DataFrame, reading only what the
+    caller needs:
+
+    - `columns`: the columns to return (all of them by default)
+    - `levels`: tourney_level codes to keep, e.g. ('G', 'M')
+    - `years`: inclusive (first, last) season range; other files are never opened
+    - `families`: which of FAMILIES to read; tour-level singles by default
+    - `dropna`: drop rows with a missing value in any returned column
+    - `parse_dates`: turn the YYYYMMDD tourney_date into datetime64 (missing
+      or malformed dates become 1900-01-01, see dates.parse_yyyymmdd)
+
+    Files are parsed across a pool of `workers` processes (all cores by
+    default, 1 = serial) and read through the columnar cache unless
+    `cache_dir` is None. Columns get the compact types of `dtypes`
+    (match_schema.MATCH_SCHEMA); pass None for pandas' default inference.
+    """
+    all_files = match_files(data_dir, families, years)
+    where = None if levels is None else {'tourney_level': tuple(levels)}
+    columns = None if columns is None else list(columns)
+    workers = min(workers or DEFAULT_WORKERS, len(all_files)) or 1
+    jobs = [(filename, cache_dir, columns, where, dropna, dtypes, parse_dates) for filename in all_files]
+    if workers == 1:
+        results = [_read_file(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_read_file, jobs))
+    return concat_frames(results, dtypes)
@@ -0,0 +1,150 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Get the project root directory (two levels up from this script)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(script_dir))
+
+DICTIONARY_PATH = os.path.join(project_root, 'tennis_atp-master', 'matches_data_dictionary.txt')
+
+# dtype for each column of the data dictionary, by name pattern (first match
+# wins). Counts use nullable small ints so missing stats don't force float64,
+# and low-cardinality text becomes categorical.
+TYPE_RULES = [
+    (r'^(winner|loser)_id$', 'Int32'),
+    (r'^(w|l)_', 'Int16'),            # per-match serve stats, e.g. w_ace, l_svpt
+    (r'_rank_points$', 'Int32'),
+    (r'_(rank|seed|ht)$', 'Int16'),
+    (r'^(draw_size|match_num|minutes)$', 'Int16'),
+    (r'^best_of$', 'Int8'),
+    (r'^tourney_date$', 'Int32'),     # YYYYMMDD
+    (r'_age$', 'float32'),
+    (r'.', 'category'),
+]
+
+# Columns that hold the same kind of value share one set of categories, so a
+# player's name has the same code whether they won or lost (interned names)
+SHARED_CATEGORIES = {
+    'winner_name': 'player_name', 'loser_name': 'player_name',
+    'winner_ioc': 'ioc', 'loser_ioc': 'ioc',
+    'winner_hand': 'hand', 'loser_hand': 'hand',
+    'winner_entry': 'entry', 'loser_entry': 'entry',
+}
+
+
+def dictionary_columns(path=DICTIONARY_PATH):
+    """The singles match columns, in file order, as listed in the data dictionary."""
+    columns = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('* _doubles_'):
+                break
+            # Column names sit alone on their line; descriptions start with '-'
+            if re.fullmatch(r'[A-Za-z][A-Za-z0-9_]*', line):
+                columns.append(line)
+    return columns
+
+
+def match_schema(path=DICTIONARY_PATH):
+    """Map every column of the data dictionary to its compact dtype."""
+    schema = {}
+    for name in dictionary_columns(path):
+        schema[name] = next(dtype for pattern, dtype in TYPE_RULES if re.search(pattern, name))
+    return schema
+
+
+MATCH_SCHEMA = match_schema()
+
+
+# Nullable int dtypes, narrowest first; cast_series widens along these when
+# a file holds values outside the schema's type (e.g. match_num > 32767)
+WIDER_INTS = {'i': ['Int8', 'Int16', 'Int32', 'Int64'], 'u': ['UInt8', 'UInt16', 'UInt32', 'UInt64']}
+
+
+def fitting_int(target, low, high):
+    """`target` (a nullable int dtype) or the narrowest wider one holding low..high; None if none does."""
+    names = WIDER_INTS[target.kind]
+    for name in names[names.index(target.name):]:
+        dtype = pd.api.types.pandas_dtype(name)
+        info = np.iinfo(dtype.numpy_dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return None
+
+
+def cast_series(series, dtype):
+    """
+    Cast to `dtype`, coercing stray non-numeric or fractional values to
+    missing/rounded ints. A nullable int column with values outside
+    `dtype`'s range gets the narrowest wider nullable int instead (values
+    beyond the widest become missing), so one odd file can't fail a load.
+    """
+    if dtype == 'category':
+        return series.astype('category')
+    target = pd.api.types.pandas_dtype(dtype)
+    if not (isinstance(target, pd.api.extensions.ExtensionDtype) and target.kind in 'iu'):
+        try:
+            return series.astype(dtype)
+        except (TypeError, ValueError):
+            return pd.to_numeric(series, errors='coerce').astype(dtype)
+    values = series.to_numpy()
+    if values.dtype.kind not in 'fiu':
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    # Build the nullable array from data + mask directly; much cheaper than astype
+    mask = np.isnan(values) if values.dtype.kind == 'f' else np.zeros(len(values), dtype=bool)
+    filled = np.round(np.where(mask, 0, values))
+    widest = np.iinfo(pd.api.types.pandas_dtype(WIDER_INTS[target.kind][-1]).numpy_dtype)
+    beyond = (filled < widest.min) | (filled > widest.max)
+    if beyond.any():
+        mask, filled = mask | beyond, np.where(beyond, 0, filled)
+    fits = fitting_int(target, filled.min(initial=0), filled.max(initial=0))
+    array = pd.arrays.IntegerArray(filled.astype(fits.numpy_dtype), mask)
+    return pd.Series(array, index=series.index, name=series.name)
+
+
+def apply_schema(df, schema=MATCH_SCHEMA):
+    """Cast the columns of `df` that appear in `schema`; other columns are left alone."""
+    casts = {name: dtype for name, dtype in schema.items()
+             if name in df.columns and df[name].dtype != dtype}
+    if not casts:
+        return df
+    df = df.copy()
+    for name, dtype in casts.items():
+        df[name] = cast_series(df[name], dtype)
+    return df
+
+
+def share_categories(frames, schema=MATCH_SCHEMA):
+    """
+    Give every categorical column the same categories in all `frames`
+    (and across the column groups in SHARED_CATEGORIES), so they can be
+    concatenated without falling back to object dtype.
+    """
+    groups = {}
+    for name, dtype in schema.items():
+        if dtype == 'category':
+            groups.setdefault(SHARED_CATEGORIES.get(name, name), []).append(name)
+    frames = [df.copy(deep=False) for df in frames]
+    for columns in groups.values():
+        present = [(df, name) for df in frames for name in columns
+                   if name in df.columns and isinstance(df[name].dtype, pd.CategoricalDtype)]
+        if not present:
+            continue
+        categories = pd.Index(np.unique(np.concatenate(
+            [np.asarray(df[name].cat.categories, dtype=object) for df, name in present])))
+        for df, name in present:
+            column = df[name].array
+            # Map each frame's codes onto the shared categories (-1 stays missing)
+            recode = np.append(categories.get_indexer(column.categories), -1)
+            codes = recode[column.codes]
+            df[name] = pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(categories))
+    return frames
+
+
+def memory_per_match(df):
+    """Bytes of RAM per row, counting the contents of object columns."""
+    return df.memory_usage(deep=True).sum() / max(len(df), 1)
@@ -0,0 +1,99 @@
+import bisect
+import unicodedata
+
+import numpy as np
+
+
+# Every ASCII character that isn't a letter or digit becomes a space
+ASCII_SEPARATORS = str.maketrans({chr(c): ' ' for c in range(128) if not chr(c).isalnum()})
+
+
+def fold(name):
+    """Case-, accent- and punctuation-insensitive form of a name: 'Jo-Wilfried Tsonga' -> 'jo wilfried tsonga'."""
+    name = str(name)
+    if name.isascii():
+        return ' '.join(name.translate(ASCII_SEPARATORS).lower().split())
+    decomposed = unicodedata.normalize('NFKD', name)
+    letters = (c if c.isalnum() else ' ' for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(''.join(letters).casefold().split())
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Type-ahead and typo-tolerant lookup over player names.
+
+    Prefix search is a bisect into a sorted list of folded keys; every name
+    is listed once per word, so 'alca' finds 'Carlos Alcaraz' as well as
+    'carlos al' does. Fuzzy search scores names by the trigrams they share
+    with the query (Dice coefficient), counted with one np.bincount over the
+    matching posting lists. Both return the top k in well under a
+    millisecond for tens of thousands of names.
+    """
+
+    def __init__(self, names):
+        self.names = sorted(set(names))
+        self._exact = {}
+        entries = []
+        postings = {}
+        self._trigram_counts = np.empty(len(self.names), dtype=np.float64)
+        for i, name in enumerate(self.names):
+            key = fold(name)
+            self._exact.setdefault(key, []).append(i)
+            words = key.split()
+            entries.extend((' '.join(words[start:]), i) for start in range(len(words)))
+            grams = trigrams(key)
+            self._trigram_counts[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._ids = [i for _, i in entries]
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, query):
+        """The one name `query` spells, ignoring case, accents and punctuation; None if none or ambiguous."""
+        ids = self._exact.get(fold(query), ())
+        return self.names[ids[0]] if len(ids) == 1 else None
+
+    def prefix(self, query, k=10):
+        """Up to k names with a word sequence starting with `query`, in alphabetical order of the match."""
+        key = fold(query)
+        if not key:
+            return []
+        found = {}
+        start = bisect.bisect_left(self._keys, key)
+        for position in range(start, len(self._keys)):
+            if len(found) == k or not self._keys[position].startswith(key):
+                break
+            found.setdefault(self._ids[position], None)
+        return [self.names[i] for i in found]
+
+    def fuzzy(self, query, k=10, min_score=0.3):
+        """Up to k names most similar to `query` by shared trigrams, best first, none scoring below `min_score`."""
+        query_grams = trigrams(fold(query))
+        lists = [self._postings[gram] for gram in query_grams if gram in self._postings]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.names))
+        score = 2 * shared / (len(query_grams) + self._trigram_counts)
+        top = np.flatnonzero(score >= min_score)
+        if len(top) > k:
+            top = top[np.argpartition(score[top], -k)[-k:]]
+        top = top[np.lexsort((top, -score[top]))]
+        return [self.names[i] for i in top]
+
+    def search(self, query, k=10):
+        """Type-ahead: prefix matches first, then the closest fuzzy matches, k names in all."""
+        found = self.prefix(query, k)
+        if len(found) < k:
+            seen = set(found)
+            found += [name for name in self.fuzzy(query, k + len(found)) if name not in seen][:k - len(found)]
+        return found
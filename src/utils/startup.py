@@ -0,0 +1,38 @@
+import os
+import threading
+
+# Kept to the standard library on purpose: the apps import this before
+# anything heavy, so their first prompt or window isn't held up by it.
+
+
+class BackgroundLoad:
+    """
+    Start `load(*args)` on a daemon thread straight away, so an app can show
+    its prompt or window while the model and stats load. result() waits for
+    the load to finish and returns its value, or re-raises its exception.
+    """
+
+    def __init__(self, load, *args):
+        self._value = self._error = None
+        self._thread = threading.Thread(target=self._run, args=(load, args), daemon=True)
+        self._thread.start()
+
+    def _run(self, load, args):
+        try:
+            self._value = load(*args)
+        except BaseException as e:  # handed to whoever calls result()
+            self._error = e
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def result(self):
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+def missing_files(*paths):
+    """The paths that don't exist; an app can report them before it starts loading."""
+    return [path for path in paths if not os.path.exists(path)]
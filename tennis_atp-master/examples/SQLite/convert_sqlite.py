@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+'''
+    File name: convert_sqlite.py
+    Description: bulk-loads the ATP player, match and ranking CSVs into a typed SQLite database.
+                 Replaces convert_sqlite.sh. Run it again after new files arrive: files that are
+                 already loaded are skipped and files whose contents changed are replaced.
+    Python Version: 3
+'''
+import os
+import re
+import sys
+import csv
+import glob
+import time
+import sqlite3
+import hashlib
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from src.utils.match_schema import MATCH_SCHEMA
+
+BATCH_SIZE = 50000
+
+# singles match files only; doubles files have a different layout
+MATCH_FILE_RE = re.compile(r'atp_matches_(?:(?:qual_chall|futures)_)?\d{4}\.csv$')
+RANKING_FILE_RE = re.compile(r'atp_rankings_(?:\d\ds|current)\.csv$')
+
+
+def sql_type(dtype):
+    if dtype.lower().startswith('int'):
+        return 'INTEGER'
+    if dtype.startswith('float'):
+        return 'REAL'
+    return 'TEXT'
+
+
+MATCH_COLUMNS = list(MATCH_SCHEMA)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_file (id INTEGER PRIMARY KEY, name TEXT UNIQUE, digest TEXT, rows INTEGER);
+CREATE TABLE IF NOT EXISTS player (id INTEGER PRIMARY KEY, firstName TEXT, lastName TEXT, hand TEXT,
+                                   birth INTEGER, country TEXT, height INTEGER);
+CREATE TABLE IF NOT EXISTS matches (file_id INTEGER, %s);
+CREATE TABLE IF NOT EXISTS ranking (file_id INTEGER, date INTEGER, pos INTEGER, player_id INTEGER, pts INTEGER);
+""" % ', '.join(f'{name} {sql_type(dtype)}' for name, dtype in MATCH_SCHEMA.items())
+
+# composite indexes for the usual lookups: a player's matches or rankings over time,
+# head-to-heads in either direction, the top of the rankings on a date
+INDEXES = """
+CREATE INDEX IF NOT EXISTS matchWinnerDate ON matches (winner_id, tourney_date);
+CREATE INDEX IF NOT EXISTS matchLoserDate ON matches (loser_id, tourney_date);
+CREATE INDEX IF NOT EXISTS matchH2H ON matches (winner_id, loser_id);
+CREATE INDEX IF NOT EXISTS matchH2HReverse ON matches (loser_id, winner_id);
+CREATE INDEX IF NOT EXISTS matchFile ON matches (file_id);
+CREATE INDEX IF NOT EXISTS rankPlayerDate ON ranking (player_id, date);
+CREATE INDEX IF NOT EXISTS rankDatePos ON ranking (date, pos);
+CREATE INDEX IF NOT EXISTS rankFile ON ranking (file_id);
+CREATE INDEX IF NOT EXISTS playerCountry ON player (country);
+"""
+
+
+def connect(database):
+    conn = sqlite3.connect(database, isolation_level=None)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = OFF')       # the load can simply be re-run if it crashes
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute('PRAGMA cache_size = -262144')    # 256 MB page cache
+    conn.execute('PRAGMA mmap_size = 1073741824')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def read_rows(path, width):
+    """CSV rows with empty fields as NULL; SQLite's column affinity does the numeric conversion."""
+    with open(path, newline='', encoding='ISO-8859-1') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if not row or not row[0][:1].isdigit():
+                continue  # header line (newer files have one, older ones don't)
+            row = row[:width] + [''] * (width - len(row))
+            yield [value if value != '' else None for value in row]
+
+
+def batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_file(conn, path, table, columns):
+    """Load one CSV in a single transaction, replacing an older version of the same file."""
+    name = os.path.basename(path)
+    digest = file_digest(path)
+    known = conn.execute('SELECT id, digest FROM source_file WHERE name = ?', (name,)).fetchone()
+    if known is not None and known[1] == digest:
+        return 0
+    conn.execute('BEGIN')
+    if known is not None:
+        conn.execute(f'DELETE FROM {table} WHERE file_id = ?', (known[0],))
+        file_id = known[0]
+    else:
+        file_id = conn.execute('INSERT INTO source_file (name, digest, rows) VALUES (?, ?, 0)',
+                               (name, digest)).lastrowid
+    placeholders = ', '.join('?' * (len(columns) + 1))
+    insert = f'INSERT INTO {table} (file_id, {", ".join(columns)}) VALUES ({placeholders})'
+    rows = 0
+    for batch in batches(read_rows(path, len(columns))):
+        conn.executemany(insert, ([file_id] + row for row in batch))
+        rows += len(batch)
+    conn.execute('UPDATE source_file SET digest = ?, rows = ? WHERE id = ?', (digest, rows, file_id))
+    conn.execute('COMMIT')
+    return rows
+
+
+def load_players(conn, path):
+    name = os.path.basename(path)
+    digest = file_digest(path)
+    known = conn.execute('SELECT digest FROM source_file WHERE name = ?', (name,)).fetchone()
+    if known is not None and known[0] == digest:
+        return 0
+    conn.execute('BEGIN')
+    rows = 0
+    for batch in batches(read_rows(path, 7)):
+        conn.executemany('INSERT OR REPLACE INTO player VALUES (?, ?, ?, ?, ?, ?, ?)', batch)
+        rows += len(batch)
+    conn.execute('INSERT OR REPLACE INTO source_file (name, digest, rows) VALUES (?, ?, ?)', (name, digest, rows))
+    conn.execute('COMMIT')
+    return rows
+
+
+def load_all(database, data_dir):
+    conn = connect(database)
+    loaded = {}
+    start = time.perf_counter()
+    players = os.path.join(data_dir, 'atp_players.csv')
+    if os.path.exists(players):
+        loaded['player'] = load_players(conn, players)
+    print("Players Imported")
+
+    loaded['matches'] = 0
+    for path in sorted(glob.glob(os.path.join(data_dir, 'atp_matches_*.csv'))):
+        if MATCH_FILE_RE.search(path):
+            loaded['matches'] += load_file(conn, path, 'matches', MATCH_COLUMNS)
+    print("Matches Imported")
+
+    loaded['ranking'] = 0
+    for path in sorted(glob.glob(os.path.join(data_dir, 'atp_rankings_*.csv'))):
+        if RANKING_FILE_RE.search(path):
+            loaded['ranking'] += load_file(conn, path, 'ranking', ['date', 'pos', 'player_id', 'pts'])
+    print("Rankings Imported")
+    load_seconds = time.perf_counter() - start
+
+    print("Creating Index")
+    start = time.perf_counter()
+    conn.executescript(INDEXES)
+    conn.execute('ANALYZE')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    index_seconds = time.perf_counter() - start
+
+    total = sum(loaded.values())
+    print(f"\nLoaded {total} new rows ({', '.join(f'{t}: {n}' for t, n in loaded.items())}) "
+          f"in {load_seconds:.1f}s ({total / max(load_seconds, 1e-9):,.0f} rows/s), indexes in {index_seconds:.1f}s")
+    return conn
+
+
+def time_queries(conn, repeat=20):
+    """Time a few representative queries against the loaded database."""
+    # the pair of players who met most often, and that player's last season
+    pair = conn.execute('SELECT winner_id, loser_id, COUNT(*) AS n FROM matches GROUP BY winner_id, loser_id '
+                        'ORDER BY n DESC LIMIT 1').fetchone()
+    if pair is None:
+        return
+    a, b = pair[0], pair[1]
+    year = conn.execute('SELECT MAX(tourney_date) / 10000 FROM matches WHERE winner_id = ?', (a,)).fetchone()[0]
+    season = (year * 10000 + 101, year * 10000 + 1231)
+    queries = [
+        ("head-to-head of two players",
+         'SELECT tourney_date, winner_id, score FROM matches WHERE winner_id = ? AND loser_id = ? '
+         'UNION ALL SELECT tourney_date, winner_id, score FROM matches WHERE winner_id = ? AND loser_id = ?',
+         (a, b, b, a)),
+        ("player's matches in one season",
+         'SELECT * FROM matches WHERE winner_id = ? AND tourney_date BETWEEN ? AND ? '
+         'UNION ALL SELECT * FROM matches WHERE loser_id = ? AND tourney_date BETWEEN ? AND ?',
+         (a, *season, a, *season)),
+        ("player's ranking history",
+         'SELECT date, pos, pts FROM ranking WHERE player_id = ? ORDER BY date', (a,)),
+        ("top 10 on the latest ranking date",
+         'SELECT pos, player_id FROM ranking WHERE date = (SELECT MAX(date) FROM ranking) AND pos <= 10 '
+         'ORDER BY pos', ()),
+        ("players who reached number 1",
+         'SELECT lastName FROM player JOIN ranking ON player.id = ranking.player_id WHERE pos == 1 '
+         'GROUP BY lastName', ()),
+    ]
+    print("\nQuery timings (best of %d):" % repeat)
+    for label, sql, params in queries:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = conn.execute(sql, params).fetchall()
+            best = min(best, time.perf_counter() - start)
+        print(f"  {label:<36} {best * 1000:8.2f} ms  ({len(rows)} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the ATP CSV files into a SQLite database.")
+    parser.add_argument('database', nargs='?', default='atpdatabase.db')
+    parser.add_argument('--data-dir', default='.', help="directory with the atp_*.csv files")
+    parser.add_argument('--no-timings', action='store_true', help="skip the query timings")
+    args = parser.parse_args()
+
+    print(f"Creating {args.database}")
+    conn = load_all(args.database, args.data_dir)
+    if not args.no_timings:
+        time_queries(conn)
+    conn.close()
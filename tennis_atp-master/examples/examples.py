@@ -21,20 +21,22 @@ import pandas as pd
 import math
 from pandas.core.categorical import Categorical
 from spyderlib.widgets.externalshell import namespacebrowser
+import os
+
+#the read* helpers load the match and ranking files through the project's columnar cache,
+#with the compact column types from matches_data_dictionary.txt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.utils.match_cache import read_csv_cached
+from src.utils.match_schema import MATCH_SCHEMA, share_categories
+from src.utils.dates import parse_yyyymmdd
+from src.models.h2h_index import H2HIndex
 
 
 
 #util functions
 def parse(t):
-    ret = []
-    for ts in t:
-        try:
-            string = str(ts)
-            tsdt = datetime.date(int(string[:4]), int(string[4:6]), int(string[6:]))
-        except TypeError:
-            tsdt = datetime.date(1900,1,1)
-        ret.append(tsdt)
-    return ret
+    """YYYYMMDD values to datetime64[D]; missing or malformed dates become 1900-01-01"""
+    return parse_yyyymmdd(t)
 
 def readATPMatches(dirname):
     """Reads ATP matches but does not parse time into datetime object"""
@@ -42,11 +44,12 @@ def readATPMatches(dirname):
     matches = pd.DataFrame()
     container = list()
     for filen in allFiles:
-        df = pd.read_csv(filen,
-                         index_col=None,
-                         header=0)
+        df = read_csv_cached(filen,
+                             index_col=None,
+                             header=0,
+                             dtypes=MATCH_SCHEMA)
         container.append(df)
-    matches = pd.concat(container)
+    matches = pd.concat(share_categories(container))
     return matches
 
 def readATPMatchesParseTime(dirname):
@@ -55,14 +58,14 @@ def readATPMatchesParseTime(dirname):
     matches = pd.DataFrame()
     container = list()
     for filen in allFiles:
-        df = pd.read_csv(filen,
-                         index_col=None,
-                         header=0,
-                         parse_dates=[5],
-                         encoding = "ISO-8859-1",
-                         date_parser=lambda t:parse(t))
+        df = read_csv_cached(filen,
+                             index_col=None,
+                             header=0,
+                             encoding = "ISO-8859-1",
+                             dtypes=MATCH_SCHEMA)
+        df['tourney_date'] = parse(df['tourney_date'])
         container.append(df)
-    matches = pd.concat(container)
+    matches = pd.concat(share_categories(container))
     return matches
 
 def readFMatches(dirname):
@@ -71,11 +74,12 @@ def readFMatches(dirname):
     matches = pd.DataFrame()
     container = list()
     for filen in allFiles:
-        df = pd.read_csv(filen,
-                         index_col=None,
-                         header=0)
+        df = read_csv_cached(filen,
+                             index_col=None,
+                             header=0,
+                             dtypes=MATCH_SCHEMA)
         container.append(df)
-    matches = pd.concat(container)
+    matches = pd.concat(share_categories(container))
     return matches
 
 def readFMatchesParseTime(dirname):
@@ -84,14 +88,14 @@ def readFMatchesParseTime(dirname):
     matches = pd.DataFrame()
     container = list()
     for filen in allFiles:
-        df = pd.read_csv(filen,
-                         index_col=None,
-                         header=0,
-                         parse_dates=[5],
-                         encoding = "ISO-8859-1",
-                         date_parser=lambda t:parse(t))
+        df = read_csv_cached(filen,
+                             index_col=None,
+                             header=0,
+                             encoding = "ISO-8859-1",
+                             dtypes=MATCH_SCHEMA)
+        df['tourney_date'] = parse(df['tourney_date'])
         container.append(df)
-    matches = pd.concat(container)
+    matches = pd.concat(share_categories(container))
     return matches
 
 def readChall_QATPMatchesParseTime(dirname):
@@ -100,14 +104,14 @@ def readChall_QATPMatchesParseTime(dirname):
     matches = pd.DataFrame()
     container = list()
     for filen in allFiles:
-        df = pd.read_csv(filen,
-                         index_col=None,
-                         header=0,
-                         parse_dates=[5],
-                         encoding = "ISO-8859-1",
-                         date_parser=lambda t:parse(t))
+        df = read_csv_cached(filen,
+                             index_col=None,
+                             header=0,
+                             encoding = "ISO-8859-1",
+                             dtypes=MATCH_SCHEMA)
+        df['tourney_date'] = parse(df['tourney_date'])
         container.append(df)
-    matches = pd.concat(container)
+    matches = pd.concat(share_categories(container))
     return matches
 
 def readChall_QATPMatches(dirname):
@@ -116,11 +120,12 @@ def readChall_QATPMatches(dirname):
     matches = pd.DataFrame()
     container = list()
     for filen in allFiles:
-        df = pd.read_csv(filen,
-                         index_col=None,
-                         header=0)
+        df = read_csv_cached(filen,
+                             index_col=None,
+                             header=0,
+                             dtypes=MATCH_SCHEMA)
         container.append(df)
-    matches = pd.concat(container)
+    matches = pd.concat(share_categories(container))
     return matches
 
 def readAllRankings(dirname):
@@ -130,12 +135,11 @@ def readAllRankings(dirname):
     ranks = pd.DataFrame()
     container = list()
     for filen in allFiles:
-        df = pd.read_csv(filen,
-                         index_col=None,
-                         header=None,
-                         parse_dates=[0],
-                         encoding = "ISO-8859-1",
-                         date_parser=lambda t:parse(t))
+        df = read_csv_cached(filen,
+                             index_col=None,
+                             header=None,
+                             encoding = "ISO-8859-1")
+        df[0] = parse(df[0])
         container.append(df)
     ranks = pd.concat(container)
     return ranks
@@ -196,30 +200,12 @@ def numberOfSetsLongerThan(matches,sets,minutes):
     matches = matches.sort(['minutes'], ascending=False)
     print(matches[['minutes','score','tourney_name','tourney_date','round','winner_name', 'loser_name']].to_csv(sys.stdout,index=False))    
     
-def geth2hforplayer(matches,name):
-    """get all head-to-heads of the player"""
-    matches = matches[(matches['winner_name'] == name) | (matches['loser_name'] == name)]
-    h2hs = {}
-    for index, match in matches.iterrows():
-        if (match['winner_name'] == name):
-            if (match['loser_name'] not in h2hs):
-                h2hs[match['loser_name']] = {}
-                h2hs[match['loser_name']]['l'] = 0
-                h2hs[match['loser_name']]['w'] = 1
-            else:
-                h2hs[match['loser_name']]['w'] = h2hs[match['loser_name']]['w']+1
-        elif (match['loser_name'] == name):
-            if (match['winner_name'] not in h2hs):
-                h2hs[match['winner_name']] = {}
-                h2hs[match['winner_name']]['w'] = 0
-                h2hs[match['winner_name']]['l'] = 1
-            else:
-                h2hs[match['winner_name']]['l'] = h2hs[match['winner_name']]['l']+1
-
-    #create list
-    h2hlist = []
-    for k, v in h2hs.items():
-        h2hlist.append([k, v['w'],v['l']])
+def geth2hforplayer(matches,name,h2hindex=None):
+    """get all head-to-heads of the player as [opponent, wins, losses] sorted by wins and then losses.
+    pass an H2HIndex built once from the same matches when calling this for many players"""
+    if h2hindex is None:
+        h2hindex = H2HIndex.from_matches(matches)
+    h2hlist = [list(h2h) for h2h in h2hindex.opponents_of(name)]
     #sort by wins and then by losses + print
     #filter by h2hs with more than 6 wins:
     #h2hlist = [i for i in h2hlist if i[1] > 6]
@@ -490,7 +476,7 @@ def rankofQhigherthanlastSeed(matches):
 def avglastseedrank(matches):
     """calculates the average of the last seed rank per tournament category"""
     #only matches from 2013 and 2014
-    matches = matches[(matches['tourney_date'] > datetime.date(2012,12,29)) & (matches['tourney_date'] < datetime.date(2015,1,1))]
+    matches = matches[(matches['tourney_date'] > pd.Timestamp(2012,12,29)) & (matches['tourney_date'] < pd.Timestamp(2015,1,1))]
     
     #atp 500
     #if draw size = 32, then 8 seeds
@@ -634,9 +620,8 @@ def getLastSeedRankForGroupedTourneys(groupedmatches):
     rankingdf = pd.DataFrame()
     playersdf = pd.DataFrame()
     
-    rankingdf = pd.read_csv(ranking10s,index_col=None,header=None,
-                         parse_dates=[0],
-                         date_parser=lambda t:parse(t))
+    rankingdf = pd.read_csv(ranking10s,index_col=None,header=None)
+    rankingdf[0] = parse(rankingdf[0])
     rankingdf.columns = ['date', 'rank', 'id','points']
     playersdf = pd.read_csv(playersDB,index_col=None,header=None)
     playersdf.columns = ['id', 'fname', 'lname','hand','dob','country']
@@ -665,14 +650,14 @@ def getLastSeedRankForGroupedTourneys(groupedmatches):
             if (len(tempmatches) == 1):
                 #rank = tempmatches.iloc[[0]]['loser_rank'].values[0]
                 playername = tempmatches.iloc[[0]]['loser_name'].values[0]
-                tdate = tempmatches.iloc[[0]]['tourney_date'].values[0]
+                tdate = tempmatches.iloc[0]['tourney_date']
                 #try previous mondays and if found we are fine.
                 rank = getRankForPreviousMonday(tdate,playername)
             elif (len(tempmatches) < 1):
                 tempmatches = tmatches[(tmatches['winner_seed'] == maxseed)]
                 #rank = tempmatches.iloc[[0]]['winner_rank'].values[0]
                 playername = tempmatches.iloc[[0]]['winner_name'].values[0]
-                tdate = tempmatches.iloc[[0]]['tourney_date'].values[0]
+                tdate = tempmatches.iloc[0]['tourney_date']
                 #try previous mondays
                 rank = getRankForPreviousMonday(tdate,playername)
             print(rank)
@@ -751,7 +736,7 @@ def getBestQGrandSlamPlayer(qmatches,rankings):
         #u_set contains all names of participating players
         u_set = w_set.union(l_set)      
         #get ranking date
-        tdate = tmatches.iloc[[0]]['tourney_date'].values[0]
+        tdate = tmatches.iloc[0]['tourney_date']
         #q deadline is 4 weeks earlier
         #deadline_date = tdate -  datetime.timedelta(days = 28)
         #alternatively take 6 weeks earlier deadline (= md deadline)
@@ -805,7 +790,7 @@ def getworstlda(matches):
     joinedrankingsdf = pd.merge(rankings,playersdf, on='id')
     joinedrankingsdf["fullname"] = joinedrankingsdf["fname"] + ' ' + joinedrankingsdf["lname"]
     
-    matches = matches[((matches['tourney_level'] == 'A') & (matches['tourney_date'] > datetime.date(2007,1,1)) & ((matches['draw_size'] == 32) | (matches['draw_size'] == 28)))]
+    matches = matches[((matches['tourney_level'] == 'A') & (matches['tourney_date'] > pd.Timestamp(2007,1,1)) & ((matches['draw_size'] == 32) | (matches['draw_size'] == 28)))]
     
     tgroup = matches.groupby('tourney_id')
     res = {}
@@ -818,7 +803,7 @@ def getworstlda(matches):
         #u_set contains all names of participating players
         u_set = w_set.union(l_set)
         #get ranking date
-        tdate = tmatches.iloc[[0]]['tourney_date'].values[0]
+        tdate = tmatches.iloc[0]['tourney_date']
         deadline_date = tdate -  datetime.timedelta(days = 42)
         #print(deadline_date.weekday())
         if (deadline_date.weekday() == 6):
@@ -1166,7 +1151,7 @@ def bestNonChampion(players,ranks):
     ranks = ranks[(ranks['rank'] < 41)]
     join = pd.merge(ranks,players, left_on='player_id', right_on='id')
     join["fullname"] = join["fname"] + ' ' + join["lname"]
-    join = join[(join['ranking_date'] > datetime.date(1991, 1, 1))]
+    join = join[(join['ranking_date'] > pd.Timestamp(1991, 1, 1))]
     
     #join['tournament_wins'] = join.apply(lambda x: len(matches[(matches['tourney_date'] < x['ranking_date']) & (matches['winner_name'] == x['fullname'])]), axis=1)
     join = join.groupby('fullname').apply(get_date_wins) #groupby to increase speed compared to previous line
@@ -1307,7 +1292,7 @@ def losetonadalafterwin(atpmatches):
                   
 
     
-    atpmatches = atpmatches[(atpmatches['tourney_date'] > datetime.date(1995,1,1))]
+    atpmatches = atpmatches[(atpmatches['tourney_date'] > pd.Timestamp(1995,1,1))]
     w_set = set(atpmatches['winner_name'])
     l_set = set(atpmatches['loser_name'])
     namelist = w_set.union(l_set)  
@@ -1611,7 +1596,7 @@ def playernames(group):
 
 def bestNeverQFWin(matches, rankings,activeplayers):
     """finds players who never won a QF (+ streaks)"""
-    #matches = matches[matches['tourney_date'] >  datetime.date(2012,12,29)]
+    #matches = matches[matches['tourney_date'] >  pd.Timestamp(2012,12,29)]
     qfmatches = matches[(matches['round']=='QF')]
     qfmatches = qfmatches.sort_values(by='tourney_date')
     qfgmatches = qfmatches.groupby('winner_name').first().reset_index()
@@ -1729,7 +1714,7 @@ def setstats(atpmatches):
     """for a player calculates specific set statistics"""
     name='Gael Monfils'
     matches=atpmatches[(atpmatches['winner_name'] == name) | (atpmatches['loser_name'] == name)]
-    matches=matches[matches['tourney_date'] >  datetime.date(2014,12,28)]
+    matches=matches[matches['tourney_date'] >  pd.Timestamp(2014,12,28)]
     #setfilter
     matches = matches[(matches['score'].str.count('-') == 3) | (matches['score'].str.count('-') == 2)]
     #norets
@@ -1802,17 +1787,20 @@ def analyzeSets(row):
 def geth2hforplayerswrapper(atpmatches,qmatches):
     """helper function"""
     #geth2hforplayer(atpmatches,"Roger Federer")
-    atpmatches = atpmatches.append(qmatches)
+    atpmatches = pd.concat([atpmatches, qmatches])
+    #index all head-to-heads once instead of filtering the matches for every player
+    h2hindex = H2HIndex.from_matches(atpmatches)
     names = atpmatches[atpmatches['winner_rank'] < 100]
     names = names.winner_name.unique()
     for name in names:
-        geth2hforplayer(atpmatches,name)
+        geth2hforplayer(atpmatches,name,h2hindex)
         
-def getwnonh2hs(atpmatches,qmatches,rankings):
-    """calculates head to heads"""
+def getwnonh2hs(atpmatches,qmatches,rankings,eachpaironce=False):
+    """calculates head to heads. prints every top-n pair that never met from both sides,
+    or only once (in ranking order) with eachpaironce=True"""
     #todo: could be extended to older players and also show career-overlap (e.g. were 10y together on tour)s
     #make full matches df
-    atpmatches = atpmatches.append(qmatches)
+    atpmatches = pd.concat([atpmatches, qmatches])
     
     global joinedrankingsdf
     #join rankings with playernames
@@ -1828,31 +1816,26 @@ def getwnonh2hs(atpmatches,qmatches,rankings):
     
     #get newest top-n rankings
     joinedrankingsdf = joinedrankingsdf[(joinedrankingsdf.date == joinedrankingsdf.date.max()) & (joinedrankingsdf['rank'] < 51)]
-    
-    #for each player in the rankings calculate the h2hs and then compare players in the h2h list with top-n players...
-    playernames = joinedrankingsdf['fullname']
-    playernameslist = playernames.tolist()
-    
-    #dfs for calculating match-number of players
-    wins = atpmatches.groupby('winner_name').count()
-    losses = atpmatches.groupby('loser_name').count()
-    
-    for player in playernames:
-        h2hlist = geth2hforplayer(atpmatches,player)
-        h2hnames = [row[0] for row in h2hlist]
-        noh2hs = [x for x in playernameslist if x not in h2hnames]
-        
-        player1WL = losses[losses.index == player]['score'].values[0]+wins[wins.index == player]['score'].values[0]
-
-        #show rank for player in iteration and show string
-        for noh2h in noh2hs:
-            player2WL = losses[losses.index == noh2h]['score'].values[0]+wins[wins.index == noh2h]['score'].values[0]
-            if (noh2h != player):
-                print(player + ';' + str(joinedrankingsdf[(joinedrankingsdf['fullname'] == player)]['rank'].values[0]) + ';' + str(player1WL) + ';' + noh2h + ';' + str(joinedrankingsdf[(joinedrankingsdf['fullname'] == noh2h)]['rank'].values[0]) + ';' + str(player2WL))
+    ranks = dict(zip(joinedrankingsdf['fullname'], joinedrankingsdf['rank']))
+    
+    #match-number of players (matches with a score)
+    scored = atpmatches[atpmatches['score'].notna()]
+    played = pd.concat([scored['winner_name'], scored['loser_name']]).value_counts()
+    
+    #index the h2hs once, then look up every pair of top-n players that never met
+    playernameslist = joinedrankingsdf['fullname'].tolist()
+    h2hindex = H2HIndex.from_matches(atpmatches)
+    noh2hs = h2hindex.never_met(playernameslist)
+    if not eachpaironce:
+        #both sides of each pair, grouped by player in ranking order
+        unmet = set(noh2hs) | set((b, a) for a, b in noh2hs)
+        noh2hs = [(player, noh2h) for player in playernameslist for noh2h in playernameslist if (player, noh2h) in unmet]
+    for player, noh2h in noh2hs:
+        print(player + ';' + str(ranks[player]) + ';' + str(played.get(player, 0)) + ';' + noh2h + ';' + str(ranks[noh2h]) + ';' + str(played.get(noh2h, 0)))
 
 def getTop100ChallengerPlayersPerWeek(qmatches):
     """finds top 100 challenger players per week"""
-    matches = qmatches[(qmatches['tourney_level'] == 'C') & (qmatches['round'] == 'R32') & (qmatches['tourney_date'] > datetime.date(2000,1,1))]
+    matches = qmatches[(qmatches['tourney_level'] == 'C') & (qmatches['round'] == 'R32') & (qmatches['tourney_date'] > pd.Timestamp(2000,1,1))]
     matches['top100'] = matches.apply(top100, axis=1)
     matches['count'] = matches.groupby(['tourney_date'])['top100'].transform(lambda x: x.sum())
     matches['tcount'] = matches.groupby(['tourney_date'])['tourney_name'].transform(lambda x: x.nunique())
@@ -1874,7 +1857,7 @@ def top100(row):
 
 def showTourneysOfDate(qmatches,year,month,day):
     """for a date shows the tournaments which were played at this date"""
-    matches = qmatches[(qmatches['tourney_level'] == 'S') & (qmatches['round'] == 'R32') & (qmatches['tourney_date'] == datetime.date(year,month,day))]
+    matches = qmatches[(qmatches['tourney_level'] == 'S') & (qmatches['round'] == 'R32') & (qmatches['tourney_date'] == pd.Timestamp(year,month,day))]
     matches = matches[(matches['loser_rank'] < 151) | (matches['winner_rank'] < 151)]
     print(matches[['tourney_id', 'winner_name', 'winner_rank','loser_name','loser_rank']].drop_duplicates().to_csv(sys.stdout,index=False))
     print(matches[['tourney_date', 'tourney_name','tourney_id']].drop_duplicates().to_csv(sys.stdout,index=False))
@@ -1898,7 +1881,7 @@ def lowestRankedTitlists(matches):
     
 def gamesconcededpertitle(matches):
     """calculates how many games a player lost per title"""
-    matches=matches[matches['tourney_date'] > datetime.date(2000,1,1)]
+    matches=matches[matches['tourney_date'] > pd.Timestamp(2000,1,1)]
     matches = matches[(matches['tourney_level'] == 'S')]
     matches['wcnt'] = matches.groupby(['tourney_id','winner_name'])['winner_name'].transform('count')
     matches = matches[matches['wcnt'] == 5]
@@ -2004,7 +1987,7 @@ def mostPlayersInTop100OfCountry(rankings):
     playersdf.columns = ['id', 'fname', 'lname','hand','dob','country']
 
     joinedrankingsdf = pd.merge(rankings,playersdf, on='id')
-    joinedrankingsdf=joinedrankingsdf[(joinedrankingsdf['date'] > datetime.date(2005,1,1)) & (joinedrankingsdf['rank'] < 101)]
+    joinedrankingsdf=joinedrankingsdf[(joinedrankingsdf['date'] > pd.Timestamp(2005,1,1)) & (joinedrankingsdf['rank'] < 101)]
     joinedrankingsdf["fullname"] = joinedrankingsdf["fname"] + ' ' + joinedrankingsdf["lname"]
     joinedrankingsdf['namerank'] = joinedrankingsdf['fullname']+ "," + joinedrankingsdf['rank'].map(str) 
     #joinedrankingsdf["namerank"] = str(joinedrankingsdf["fullname"]) + ',' + str(joinedrankingsdf["rank"])
@@ -2086,7 +2069,7 @@ def findLLwhoWOdinQ(atpmatches,qmatches):
     
 def highestRanked500finalist(atpmatches):
     """finds highest ranked ATP 500 finalists"""
-    matches = atpmatches[(atpmatches['tourney_date'] > datetime.date(2008,12,20))]
+    matches = atpmatches[(atpmatches['tourney_date'] > pd.Timestamp(2008,12,20))]
     
     
     #atp 500
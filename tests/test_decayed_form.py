@@ -0,0 +1,74 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.models.decayed_form import FORM_STATS, DecayedForm
+
+
+def synthetic_matches(weeks=60, per_week=24, players=30, seed=0):
+    """One tournament a week from 1969 on, with some stats missing, shuffled."""
+    rng = np.random.default_rng(seed)
+    names = [f"Player {i}" for i in range(players)]
+    rows = []
+    for week in range(weeks):
+        date = int((np.datetime64('1969-06-02') + 7 * week).astype(object).strftime('%Y%m%d'))
+        for match_num in range(per_week):
+            winner, loser = rng.choice(players, 2, replace=False)
+            rows.append((f"{date // 10000}-{week:03d}", date, match_num % 12, ['Hard', 'Clay'][week % 2],
+                         names[winner], names[loser]))
+    matches = pd.DataFrame(rows, columns=['tourney_id', 'tourney_date', 'match_num', 'surface',
+                                          'winner_name', 'loser_name'])
+    for columns in FORM_STATS.values():
+        for column in columns:
+            values = rng.integers(0, 80, len(matches)).astype(float)
+            values[rng.random(len(matches)) < 0.1] = np.nan
+            matches[column] = values
+    return matches.sample(frac=1, random_state=seed)
+
+
+def assert_same_form(a, b):
+    order = [b.rows[key] for key in a.keys]
+    np.testing.assert_allclose(a.averages(), b.averages()[order], rtol=1e-12)
+    np.testing.assert_allclose(a.recent_matches(), b.recent_matches()[order], rtol=1e-12)
+    assert a.last_date == b.last_date
+
+
+def test_late_results_are_applied_as_in_a_full_build(tmp_path):
+    matches = synthetic_matches()
+    full = DecayedForm()
+    full.update(matches)
+
+    late = np.random.default_rng(1).random(len(matches)) < 0.05
+    form = DecayedForm()
+    assert form.update(matches[~late]) == (~late).sum()
+    form.save(str(tmp_path / 'form.npz'))
+    form = DecayedForm.load(str(tmp_path / 'form.npz'))
+    assert form.update(matches) == late.sum()
+    assert_same_form(full, form)
+
+
+def test_update_skips_matches_already_applied():
+    matches = synthetic_matches()
+    form = DecayedForm()
+    form.update(matches)
+    sums = form.sums.copy()
+    assert form.update(matches) == 0
+    np.testing.assert_array_equal(form.sums, sums)
+
+
+def test_state_without_applied_keys_loads_but_cannot_update(tmp_path):
+    path = str(tmp_path / 'form.npz')
+    form = DecayedForm()
+    form.update(synthetic_matches(weeks=2))
+    form.save(path)
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files if name != 'applied'}
+    np.savez(path, **arrays)
+    old = DecayedForm.load(path)
+    assert_same_form(form, old)
+    with pytest.raises(ValueError, match='rebuild'):
+        old.update(synthetic_matches(weeks=3))
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.models.elo import SURFACES, EloRatings
+
+
+def synthetic_matches(weeks=60, per_week=24, players=40, seed=0):
+    """One tournament a week, shuffled, with repeated match_nums across rounds like the real files."""
+    rng = np.random.default_rng(seed)
+    names = [f"Player {i}" for i in range(players)]
+    rows = []
+    for week in range(weeks):
+        date = int((np.datetime64('2015-01-05') + 7 * week).astype(object).strftime('%Y%m%d'))
+        surface = SURFACES[week % 3]
+        for match_num in range(per_week):
+            winner, loser = rng.choice(players, 2, replace=False)
+            rows.append((f"{date // 10000}-{week:03d}", date, rng.choice(['R32', 'R16', 'QF']), match_num % 12,
+                         surface, names[winner], names[loser]))
+    matches = pd.DataFrame(rows, columns=['tourney_id', 'tourney_date', 'round', 'match_num', 'surface',
+                                          'winner_name', 'loser_name'])
+    return matches.sample(frac=1, random_state=seed)
+
+
+def assert_same_ratings(a, b):
+    order = [b.ids[name] for name in a.players]
+    np.testing.assert_array_equal(a.ratings, b.ratings[order])
+    np.testing.assert_array_equal(a.surface_ratings, b.surface_ratings[order])
+    np.testing.assert_array_equal(a.played, b.played[order])
+
+
+def test_incremental_update_matches_full_build(tmp_path):
+    matches = synthetic_matches()
+    full = EloRatings()
+    full_pre = full.update(matches)
+
+    cutoff = np.sort(matches['tourney_date'].unique())[30]
+    elo = EloRatings()
+    first_pre = elo.update(matches[matches['tourney_date'] <= cutoff])
+    elo.save(str(tmp_path / 'elo.npz'))
+    elo = EloRatings.load(str(tmp_path / 'elo.npz'))
+    rest_pre = elo.update(matches)
+
+    assert_same_ratings(full, elo)
+    assert elo.matches_processed == full.matches_processed == len(matches)
+    pd.testing.assert_frame_equal(rest_pre.fillna(first_pre), full_pre)
+
+
+def test_update_skips_matches_already_applied():
+    matches = synthetic_matches()
+    elo = EloRatings()
+    elo.update(matches)
+    ratings = elo.ratings.copy()
+    assert elo.update(matches).isna().all().all()
+    np.testing.assert_array_equal(elo.ratings, ratings)
+    assert elo.matches_processed == len(matches)
+
+
+def test_late_result_raises_before_applying_anything():
+    matches = synthetic_matches()
+    late = matches.index[matches['tourney_date'] == matches['tourney_date'].min()][:1]
+    elo = EloRatings()
+    elo.update(matches.drop(late))
+    ratings, processed = elo.ratings.copy(), elo.matches_processed
+    with pytest.raises(ValueError, match='rebuild'):
+        elo.update(matches)
+    np.testing.assert_array_equal(elo.ratings, ratings)
+    assert elo.matches_processed == processed
+
+
+def test_load_refuses_state_without_applied_keys(tmp_path):
+    path = str(tmp_path / 'elo.npz')
+    elo = EloRatings()
+    elo.update(synthetic_matches(weeks=2))
+    elo.save(path)
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files if name != 'applied'}
+    np.savez(path, **arrays)
+    with pytest.raises(ValueError, match='rebuild'):
+        EloRatings.load(path)
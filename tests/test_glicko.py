@@ -0,0 +1,79 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.models.glicko import Glicko2, rating_period
+
+
+def synthetic_matches(weeks=60, per_week=24, players=40, seed=0):
+    """One tournament a week from 1968 on (before the 1970 epoch), shuffled."""
+    rng = np.random.default_rng(seed)
+    names = [f"Player {i}" for i in range(players)]
+    rows = []
+    for week in range(weeks):
+        date = int((np.datetime64('1968-12-02') + 7 * week).astype(object).strftime('%Y%m%d'))
+        for match_num in range(per_week):
+            winner, loser = rng.choice(players, 2, replace=False)
+            rows.append((f"{date // 10000}-{week:03d}", date, match_num % 12, names[winner], names[loser]))
+    matches = pd.DataFrame(rows, columns=['tourney_id', 'tourney_date', 'match_num', 'winner_name', 'loser_name'])
+    return matches.sample(frac=1, random_state=seed)
+
+
+def test_incremental_update_matches_full_build(tmp_path):
+    matches = synthetic_matches()
+    full = Glicko2()
+    full_pre = full.update(matches)
+
+    cutoff = np.sort(rating_period(matches['tourney_date']))[len(matches) // 2]
+    glicko = Glicko2()
+    first_pre = glicko.update(matches[rating_period(matches['tourney_date']) <= cutoff])
+    glicko.save(str(tmp_path / 'glicko.npz'))
+    glicko = Glicko2.load(str(tmp_path / 'glicko.npz'))
+    rest_pre = glicko.update(matches)
+
+    order = [glicko.ids[name] for name in full.players]
+    for state in ('mu', 'phi', 'sigma', 'last_played'):
+        np.testing.assert_array_equal(getattr(full, state), getattr(glicko, state)[order])
+    assert glicko.matches_processed == full.matches_processed == len(matches)
+    pd.testing.assert_frame_equal(rest_pre.fillna(first_pre), full_pre)
+    dates = matches['tourney_date'].to_numpy()
+    np.testing.assert_allclose(glicko.as_of(matches['winner_name'], dates),
+                               full.as_of(matches['winner_name'], dates))
+
+
+def test_update_skips_matches_already_applied():
+    matches = synthetic_matches()
+    glicko = Glicko2()
+    glicko.update(matches)
+    mu = glicko.mu.copy()
+    assert glicko.update(matches).isna().all().all()
+    np.testing.assert_array_equal(glicko.mu, mu)
+    assert glicko.matches_processed == len(matches)
+
+
+def test_late_result_raises_before_applying_anything():
+    matches = synthetic_matches()
+    late = matches.index[matches['tourney_date'] == matches['tourney_date'].min()][:1]
+    glicko = Glicko2()
+    glicko.update(matches.drop(late))
+    mu, processed = glicko.mu.copy(), glicko.matches_processed
+    with pytest.raises(ValueError, match='rebuild'):
+        glicko.update(matches)
+    np.testing.assert_array_equal(glicko.mu, mu)
+    assert glicko.matches_processed == processed
+
+
+def test_load_refuses_state_without_applied_keys(tmp_path):
+    path = str(tmp_path / 'glicko.npz')
+    glicko = Glicko2()
+    glicko.update(synthetic_matches(weeks=2))
+    glicko.save(path)
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files if name != 'applied'}
+    np.savez(path, **arrays)
+    with pytest.raises(ValueError, match='rebuild'):
+        Glicko2.load(path)
@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.models.elo import chronological
+from src.models.h2h_index import RECORD_COLUMNS, H2HIndex, pre_match_h2h
+
+
+def synthetic_matches(rows=500, players=6, seed=0):
+    """A small shuffled frame: few players so most pairs meet many times, a few names missing."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Player {i}" for i in range(players)], dtype=object)
+    week = rng.integers(0, 30, rows)
+    pairs = np.array([rng.choice(players, 2, replace=False) for _ in range(rows)])
+    matches = pd.DataFrame({
+        'tourney_id': [f"2020-{w:02d}" for w in week],
+        'tourney_date': [int((np.datetime64('2020-01-06') + 7 * w).astype(object).strftime('%Y%m%d')) for w in week],
+        'round': rng.choice(['R16', 'QF', 'SF', 'F'], rows),
+        'match_num': rng.integers(0, 8, rows),
+        'surface': rng.choice(['Hard', 'Clay', 'Grass'], rows),
+        'winner_name': names[pairs[:, 0]],
+        'loser_name': names[pairs[:, 1]],
+    })
+    matches.loc[rng.random(rows) < 0.03, 'winner_name'] = None
+    matches.index = rng.permutation(rows) * 10
+    return matches
+
+
+def test_pre_match_h2h_matches_a_brute_force_replay():
+    matches = synthetic_matches()
+    order = np.empty(len(matches), dtype=np.int64)
+    order[chronological(matches)] = np.arange(len(matches))
+    rows = list(matches.itertuples(index=False))
+    expected = np.full((len(matches), len(RECORD_COLUMNS)), np.nan)
+    for i, match in enumerate(rows):
+        if pd.isna(match.winner_name) or pd.isna(match.loser_name):
+            continue
+        earlier = [other for j, other in enumerate(rows) if order[j] < order[i]]
+        expected[i] = [sum(o.winner_name == match.winner_name and o.loser_name == match.loser_name for o in earlier),
+                       sum(o.winner_name == match.loser_name and o.loser_name == match.winner_name for o in earlier)]
+    pd.testing.assert_frame_equal(pre_match_h2h(matches),
+                                  pd.DataFrame(expected, index=matches.index, columns=RECORD_COLUMNS))
+
+
+def test_index_records_count_every_match():
+    matches = synthetic_matches().dropna(subset=['winner_name', 'loser_name'])
+    index = H2HIndex.from_matches(matches)
+    for player in index.players:
+        for opponent in index.players:
+            for surface in (None, 'Clay'):
+                played = matches if surface is None else matches[matches['surface'] == surface]
+                wins = ((played['winner_name'] == player) & (played['loser_name'] == opponent)).sum()
+                losses = ((played['winner_name'] == opponent) & (played['loser_name'] == player)).sum()
+                assert index.record(player, opponent, surface) == (wins, losses)
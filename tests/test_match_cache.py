@@ -0,0 +1,64 @@
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.utils.match_cache import read_csv_cached
+
+
+def write_matches(path, rows=300000):
+    """A CSV whose seed and tourney_id columns switch from numbers to text past read_csv's first chunk."""
+    seeds = (np.arange(rows) % 33).astype(object)
+    seeds[-100:] = 'Q'
+    ids = (np.arange(rows) // 32 + 1000).astype(object)
+    ids[-100:] = '2015-M020'
+    pd.DataFrame({'tourney_id': ids, 'winner_seed': seeds, 'winner_name': [f"Player {i % 500}" for i in range(rows)],
+                  'minutes': np.where(np.arange(rows) % 7 == 0, np.nan, 90.0), 'match_num': np.arange(rows)}) \
+        .to_csv(path, index=False)
+
+
+def read_csv(path, **read_options):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', pd.errors.DtypeWarning)
+        return pd.read_csv(path, **read_options)
+
+
+def test_cache_round_trip_matches_read_csv(tmp_path):
+    path = str(tmp_path / 'atp_matches_2015.csv')
+    write_matches(path)
+    expected = read_csv(path)
+    assert {type(v) for v in expected['winner_seed']} == {int, str}
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', pd.errors.DtypeWarning)
+        first = read_csv_cached(path, str(tmp_path / 'cache'))
+    cached = read_csv_cached(path, str(tmp_path / 'cache'))
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(cached, expected)
+    assert [type(v) for v in cached['winner_seed']] == [type(v) for v in expected['winner_seed']]
+
+
+def test_cache_filters_mixed_columns_like_read_csv(tmp_path):
+    path = str(tmp_path / 'atp_matches_2015.csv')
+    write_matches(path)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', pd.errors.DtypeWarning)
+        read_csv_cached(path, str(tmp_path / 'cache'), columns=['winner_seed'])
+    expected = read_csv(path)
+    expected = expected[expected['winner_seed'].isin([1, 'Q'])][['winner_seed', 'match_num']].reset_index(drop=True)
+    cached = read_csv_cached(path, str(tmp_path / 'cache'), columns=['winner_seed', 'match_num'],
+                             where={'winner_seed': [1, 'Q']})
+    pd.testing.assert_frame_equal(cached, expected)
+
+
+def test_uncacheable_columns_fall_back_to_csv(tmp_path):
+    path = str(tmp_path / 'atp_matches_2015.csv')
+    pd.DataFrame({'tourney_date': ['2015-01-05', '2015-01-12'], 'match_num': [1, 2]}).to_csv(path, index=False)
+    cache_dir = tmp_path / 'cache'
+    for _ in range(2):
+        result = read_csv_cached(path, str(cache_dir), parse_dates=['tourney_date'])
+        pd.testing.assert_frame_equal(result, pd.read_csv(path, parse_dates=['tourney_date']))
+    assert not [entry for entry in os.listdir(cache_dir) if not entry.endswith('.json')]
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.utils.match_schema import MATCH_SCHEMA, apply_schema, cast_series
+
+
+def test_cast_series_keeps_schema_dtype_when_values_fit():
+    result = cast_series(pd.Series([1.0, 2.0, np.nan]), 'Int16')
+    assert result.dtype == 'Int16'
+    assert result.tolist() == [1, 2, pd.NA]
+
+
+def test_cast_series_widens_out_of_range_ints():
+    # Older files have match_num values past Int16's 32767
+    result = cast_series(pd.Series([1, 40000, np.nan]), 'Int16')
+    assert result.dtype == 'Int32'
+    assert result.tolist() == [1, 40000, pd.NA]
+
+
+def test_cast_series_widens_out_of_range_text():
+    result = cast_series(pd.Series(['5', 'NR', None, '70000'], dtype=object), 'Int16')
+    assert result.dtype == 'Int32'
+    assert result.tolist() == [5, pd.NA, pd.NA, 70000]
+
+
+def test_cast_series_beyond_int64_becomes_missing():
+    result = cast_series(pd.Series([3e19, 1.0]), 'Int16')
+    assert result.tolist() == [pd.NA, 1]
+
+
+def test_apply_schema_loads_frame_with_out_of_range_match_num():
+    df = pd.DataFrame({'match_num': [1, 2, 50000], 'w_ace': [3.0, np.nan, 7.0]})
+    result = apply_schema(df, MATCH_SCHEMA)
+    assert MATCH_SCHEMA['match_num'] == 'Int16'
+    assert result['match_num'].dtype == 'Int32'
+    assert result['match_num'].tolist() == [1, 2, 50000]
+    assert result['w_ace'].dtype == 'Int16'
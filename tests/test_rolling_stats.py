@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.models.elo import chronological
+from src.models.player_stats import STATS
+from src.models.rolling_stats import rolling_columns, rolling_stats
+from src.utils.dates import day_numbers
+
+LAST_N, WEEKS = 3, 4
+
+
+def synthetic_matches(rows=400, players=8, seed=0):
+    """A small shuffled frame: few players so histories are long, two tournaments a week, some gaps."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Player {i}" for i in range(players)], dtype=object)
+    week = rng.integers(0, 40, rows)
+    dates = (np.datetime64('2019-12-30') + 7 * week).astype(object)
+    pairs = np.array([rng.choice(players, 2, replace=False) for _ in range(rows)])
+    matches = pd.DataFrame({
+        'tourney_id': [f"2020-{w:02d}{t}" for w, t in zip(week, rng.integers(0, 2, rows))],
+        'tourney_date': [int(date.strftime('%Y%m%d')) for date in dates],
+        'round': rng.choice(['R16', 'QF', 'SF', 'F'], rows),
+        'match_num': rng.integers(0, 5, rows),
+        'surface': rng.choice(np.array(['Hard', 'Clay', None], dtype=object), rows, p=[0.5, 0.4, 0.1]),
+        'winner_name': names[pairs[:, 0]],
+        'loser_name': names[pairs[:, 1]],
+    })
+    matches.loc[rng.random(rows) < 0.03, 'loser_name'] = None
+    for columns in STATS.values():
+        for column in columns:
+            values = rng.integers(0, 20, rows).astype(float)
+            values[rng.random(rows) < 0.2] = np.nan
+            matches[column] = values
+    matches.index = rng.permutation(rows) * 10
+    return matches
+
+
+def replay(matches):
+    """
+    Each match's rolling stats the slow way: every earlier match of the same
+    player and surface. A side without a player, or a match without a
+    surface, gets NaN.
+    """
+    order = np.empty(len(matches), dtype=np.int64)
+    order[chronological(matches)] = np.arange(len(matches))
+    days = day_numbers(matches['tourney_date']).astype(np.int64)
+    rows = list(matches.itertuples(index=False))
+    out = np.full((len(matches), len(rolling_columns(LAST_N, WEEKS))), np.nan)
+    width = out.shape[1] // 2
+    for i, match in enumerate(rows):
+        for side, player in enumerate((match.winner_name, match.loser_name)):
+            if pd.isna(player) or pd.isna(match.surface):
+                continue
+            cells = []
+            history = sorted((order[j], j) for j, other in enumerate(rows)
+                             if other.surface == match.surface and order[j] < order[i]
+                             and player in (other.winner_name, other.loser_name))
+            history = [j for _, j in history]
+            windows = [history, history[-LAST_N:], [j for j in history if days[i] - days[j] < 7 * WEEKS]]
+            for window in windows:
+                cells.append(len(window))
+                for w, l in STATS.values():
+                    values = [matches[w].iloc[j] if rows[j].winner_name == player else matches[l].iloc[j]
+                              for j in window]
+                    values = [value for value in values if not np.isnan(value)]
+                    cells.append(np.mean(values) if values else np.nan)
+            out[i, side * width:(side + 1) * width] = cells
+    return pd.DataFrame(out, index=matches.index, columns=rolling_columns(LAST_N, WEEKS))
+
+
+def test_rolling_stats_match_a_brute_force_replay():
+    matches = synthetic_matches()
+    pd.testing.assert_frame_equal(rolling_stats(matches, LAST_N, WEEKS), replay(matches), rtol=1e-12)
+
+
+def test_rolling_stats_of_an_empty_frame():
+    result = rolling_stats(synthetic_matches().iloc[:0], LAST_N, WEEKS)
+    assert list(result.columns) == rolling_columns(LAST_N, WEEKS) and len(result) == 0
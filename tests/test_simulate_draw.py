@@ -0,0 +1,39 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.models.simulate_draw import bracket_matrix, simulate_draw, simulate_shard
+
+
+def reach_odds(probabilities, slots, sims=200000, seed=0):
+    counts = simulate_shard((bracket_matrix(probabilities), np.array(slots), sims, np.random.SeedSequence(seed)))
+    return counts[:, :len(probabilities)] / sims
+
+
+def test_bracket_matrix_is_antisymmetric():
+    probabilities = np.random.default_rng(0).random((8, 8))
+    matrix = bracket_matrix(probabilities)[:8, :8]
+    np.testing.assert_allclose(matrix + matrix.T, 1.0)
+
+
+def test_reversed_bracket_gives_the_same_odds():
+    # A model far from antisymmetric: P[a, b] + P[b, a] is anywhere in [0, 2]
+    probabilities = np.random.default_rng(1).random((16, 16))
+    slots = np.random.default_rng(2).permutation(16)
+    forward = reach_odds(probabilities, slots, seed=3)
+    backward = reach_odds(probabilities, slots[::-1], seed=4)
+    np.testing.assert_allclose(forward, backward, atol=0.01)
+
+
+def test_byes_lose_to_everyone():
+    probabilities = np.full((2, 2), 0.5)
+    odds = reach_odds(probabilities, [0, 2, 1, 2], sims=1000)
+    np.testing.assert_array_equal(odds[1], [1.0, 1.0])
+
+
+def test_simulate_draw_needs_a_simulation():
+    with pytest.raises(ValueError):
+        simulate_draw(['A', 'B'], 'Hard', sims=0)